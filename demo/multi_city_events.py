@@ -14,6 +14,7 @@ from datetime import datetime as dt
 import pandas as pd
 
 from solvis import *
+from solvis.geometry import circle_polygons
 
 lock = threading.Lock()
 
@@ -41,14 +42,20 @@ def pre_process(sol, cities, site_keys, radii):
     for sk in site_keys:
         locations[sk] = dict(info=cities[sk])
 
-    for site_key, location in locations.items():
-        location['radius'] = {}
-        for radius in radii:
-            location['radius'][radius] = {}
-            polygon = circle_polygon(radius_m=radius, lat=location['info'][1], lon=location['info'][2])
-            rupts = sol.get_ruptures_intersecting(polygon)
-            # print(f"city: {site_key}, radius: {radius} , Pop: {location['info'][3]}, ruptures: {len(rupts)}")
-            location['radius'][radius]['ruptures'] = rupts
+    # build all the city x radius polygons in one batch
+    keys = list(itertools.product(locations.keys(), radii))
+    polygons = circle_polygons(
+        lats=[locations[sk]['info'][1] for sk, _ in keys],
+        lons=[locations[sk]['info'][2] for sk, _ in keys],
+        radii=[radius for _, radius in keys],
+    )
+
+    for (site_key, radius), polygon in zip(keys, polygons):
+        location = locations[site_key]
+        location.setdefault('radius', {})[radius] = {}
+        rupts = sol.get_ruptures_intersecting(polygon)
+        # print(f"city: {site_key}, radius: {radius} , Pop: {location['info'][3]}, ruptures: {len(rupts)}")
+        location['radius'][radius]['ruptures'] = rupts
     return locations
 
 
@@ -10,6 +10,37 @@ Classes:
  CompositeSolution: the container class for complete model and logic tree.
 """
 
-from . import utils
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
 from ._version import __version__
-from .solution import CompositeSolution, FaultSystemSolution, InversionSolution
+
+if TYPE_CHECKING:
+    from . import filter, geometry, solution, utils
+    from .solution import CompositeSolution, FaultSystemSolution, InversionSolution
+
+# Public names are resolved lazily on first access (PEP 562), so that `import solvis`
+# does not pay for importing geopandas, pandera, nzshm_model etc. until they are needed.
+_LAZY_ATTRIBUTES = {
+    "CompositeSolution": ".solution",
+    "FaultSystemSolution": ".solution",
+    "InversionSolution": ".solution",
+}
+_LAZY_SUBMODULES = ["config", "filter", "geometry", "solution", "utils"]
+
+__all__ = ["__version__", *_LAZY_ATTRIBUTES, *_LAZY_SUBMODULES]
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name], __name__), name)
+    elif name in _LAZY_SUBMODULES:
+        value = importlib.import_module(f".{name}", __name__)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value  # cache, so __getattr__ is not called again
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
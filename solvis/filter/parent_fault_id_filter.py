@@ -35,6 +35,7 @@ from .chainable_set_base import ChainableSetBase
 
 if TYPE_CHECKING:
     from solvis import InversionSolution
+    from solvis.solution.named_fault import NamedFaultGrouping
 
 
 class ParentFaultMapping(NamedTuple):
@@ -125,13 +126,17 @@ class FilterParentFaultIds(ChainableSetBase):
         return list(self)
 
     def for_named_fault_names(
-        self, named_fault_names: Iterable[str], join_prior: Union[SetOperationEnum, str] = 'intersection'
+        self,
+        named_fault_names: Iterable[str],
+        join_prior: Union[SetOperationEnum, str] = 'intersection',
+        grouping: 'NamedFaultGrouping' = None,
     ) -> ChainableSetBase:
         """Find parent fault ids for the given parent fault names.
 
         Args:
             named_fault_name: one or more valid named fault names.
             join_prior: How to join this methods' result with the prior chain (if any) (default = 'intersection').
+            grouping: a registered named fault scheme name, or a compiled index (default: the CFM 1.0A grouping).
 
         Returns:
             A chainable set of fault_ids matching the filter.
@@ -139,10 +144,8 @@ class FilterParentFaultIds(ChainableSetBase):
         Raises:
             ValueError: If any `named_fault_names` value is not valid.
         """
-        pids: Iterable[int] = []
-        for nf_name in named_fault_names:
-            pids += named_fault.named_fault_table().loc[nf_name].parent_fault_ids
-        return self.new_chainable_set(set(pids), self._solution, join_prior=join_prior)
+        pids = named_fault.named_fault_index(grouping).parent_fault_ids(named_fault_names)
+        return self.new_chainable_set(set(pids.tolist()), self._solution, join_prior=join_prior)
 
     def for_parent_fault_names(
         self, parent_fault_names: Iterable[str], join_prior: Union[SetOperationEnum, str] = 'intersection'
@@ -198,8 +201,7 @@ class FilterParentFaultIds(ChainableSetBase):
         Returns:
             A chainable set of parent fault_ids matching the filter.
         """
-        # df0 = self._solution.solution_file.rupture_sections
-        df0 = self._solution.model.fault_sections_with_rupture_rates
-        ids = df0[df0['Rupture Index'].isin(list(rupture_ids))].ParentID.unique().tolist()
+        view = self._solution.model.rupture_section_view.for_rupture_ids(rupture_ids)
+        ids = view.to_frame(['ParentID'])['ParentID'].unique().tolist()
         result = set([int(id) for id in ids])
         return self.new_chainable_set(result, self._solution, join_prior=join_prior)
@@ -44,6 +44,7 @@ if TYPE_CHECKING:
     import pandas as pd
 
     from solvis import InversionSolution
+    from solvis.solution.named_fault import NamedFaultGrouping
 
 
 class FilterRuptureIds(ChainableSetBase):
@@ -152,6 +153,7 @@ class FilterRuptureIds(ChainableSetBase):
         named_fault_names: Iterable[str],
         join_type: Union[SetOperationEnum, str] = 'union',
         join_prior: Union[SetOperationEnum, str] = 'intersection',
+        grouping: 'NamedFaultGrouping' = None,
     ) -> ChainableSetBase:
         """Filter rupture ids based on named fault names.
 
@@ -168,6 +170,7 @@ class FilterRuptureIds(ChainableSetBase):
             join_prior (Union[SetOperationEnum, str], optional): The type of set operation to use when
                 combining the filtered rupture ids with any existing filters. It can be either 'intersection'
                 or 'difference'.
+            grouping: a registered named fault scheme name, or a compiled index (default: the CFM 1.0A grouping).
 
         Returns:
             ChainableSetBase: A chainable set containing the filtered rupture ids.
@@ -180,7 +183,7 @@ class FilterRuptureIds(ChainableSetBase):
 
         rupture_id_sets: List[Set[int]] = []
         for named_fault_name in named_fault_names:
-            parent_fault_ids = named_fault.named_fault_table().loc[named_fault_name].parent_fault_ids
+            parent_fault_ids = named_fault.named_fault_index(grouping).parent_fault_ids([named_fault_name]).tolist()
             rupture_ids = self.for_parent_fault_ids(parent_fault_ids, join_prior=join_prior).chained_set
             rupture_id_sets.append(rupture_ids)
 
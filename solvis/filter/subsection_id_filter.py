@@ -28,6 +28,7 @@ from .parent_fault_id_filter import FilterParentFaultIds
 
 if TYPE_CHECKING:
     from solvis import InversionSolution
+    from solvis.solution.named_fault import NamedFaultGrouping
 
 
 class FilterSubsectionIds(ChainableSetBase):
@@ -66,11 +67,13 @@ class FilterSubsectionIds(ChainableSetBase):
         self,
         named_fault_names: Iterable[str],
         join_prior: Union[SetOperationEnum, str] = 'intersection',
+        grouping: 'NamedFaultGrouping' = None,
     ) -> ChainableSetBase:
         """Find subsection ids that occur on any of the given named_fault names.
 
         Args:
             named_fault_names: A list of one or more `named_fault` names.
+            grouping: a registered named fault scheme name, or a compiled index (default: the CFM 1.0A grouping).
 
         Returns:
             The subsection_ids matching the filter.
@@ -78,9 +81,7 @@ class FilterSubsectionIds(ChainableSetBase):
         Raises:
             ValueError: If any `named_fault_names` argument is not valid.
         """
-        parent_fault_ids: Iterable[int] = []
-        for nf_name in named_fault_names:
-            parent_fault_ids += named_fault.named_fault_table().loc[nf_name].parent_fault_ids
+        parent_fault_ids = named_fault.named_fault_index(grouping).parent_fault_ids(named_fault_names).tolist()
         return self.for_parent_fault_ids(parent_fault_ids, join_prior=join_prior)
 
     def for_parent_fault_names(
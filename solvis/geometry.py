@@ -2,31 +2,55 @@
 Functions for working with fault system geometries.
 
 These functions require [Shapely](https://shapely.readthedocs.io/en/stable/index.html) to be installed.
+
+The [`section_distance`][solvis.geometry.section_distance] function also uses the optional dependency
+[PyVista](https://docs.pyvista.org), which is imported on first use.
 """
 
 import logging
 import math
-from functools import partial
+from functools import lru_cache, partial
+from types import ModuleType
 from typing import Tuple, Union
 
 import numpy as np
+import numpy.typing as npt
+import shapely
 from pyproj import Transformer
 from shapely import get_coordinates
 from shapely.geometry import LineString, Point, Polygon
 from shapely.geometry.base import BaseGeometry
 from shapely.ops import transform
 
-try:
-    import pyvista as pv
-except ImportError:
-    print("WARNING: geometry.section_distance() uses the optional dependency pyvista.")
+EARTH_RADIUS_MEAN = 6371.0072
 
+AZIMUTHAL_EARTH_RADIUS_M = 6371000
+"""The spherical earth radius (metres) used for local azimuthal equidistant (AEQD) projections."""
 
-EARTH_RADIUS_MEAN = 6371.0072
+WGS84_PROJECTION = "+proj=longlat +datum=WGS84 +no_defs"
 
 log = logging.getLogger(__name__)
 
 
+@lru_cache
+def _pyvista() -> ModuleType:
+    """Import the optional pyvista dependency on first use.
+
+    Importing pyvista initialises VTK, which is slow, so it is deferred until needed.
+
+    Raises:
+        ImportError: If pyvista is not installed.
+    """
+    try:
+        import pyvista
+    except ImportError as err:  # pragma: no cover
+        raise ImportError(
+            "geometry.section_distance() uses the optional dependency pyvista, "
+            "install it with `pip install solvis[vtk]`."
+        ) from err
+    return pyvista
+
+
 def reverse_geom(geom: BaseGeometry) -> BaseGeometry:
     """Reverse the order of the points of a geometry object.
 
@@ -340,27 +364,86 @@ def circle_polygon(radius_m: float, lat: float, lon: float) -> Polygon:
         65
         ```
     """
-    local_azimuthal_projection = "+proj=aeqd +R=6371000 +units=m +lat_0={} +lon_0={}".format(lat, lon)
-    wgs84_projection = "+proj=longlat +datum=WGS84 +no_defs"
+    return circle_polygons(lat, lon, radius_m)[0]
+
+
+@lru_cache
+def _unit_circle_coordinates() -> np.ndarray:
+    """Get the exterior coordinates of a unit circle buffer, using shapely.buffer defaults."""
+    return np.asarray(Point(0.0, 0.0).buffer(1.0).exterior.coords)
+
 
-    transformer = Transformer.from_crs(wgs84_projection, local_azimuthal_projection)
-    point_transformed = transformer.transform(lon, lat)
+def circle_polygons(
+    lats: npt.ArrayLike, lons: npt.ArrayLike, radii: npt.ArrayLike
+) -> npt.NDArray[np.object_]:  # numpy array of Polygon
+    """Create many circular `Polygon`s at the given radii in metres around the `lat, lon` coordinates.
 
-    buffer = Point(point_transformed).buffer(radius_m)
+    This is the batched form of [`circle_polygon`][solvis.geometry.circle_polygon]. The arguments are
+    broadcast against each other, so a scalar radius may be used with arrays of coordinates, or a
+    single location with an array of radii.
 
-    # Get polygon with lat lon coordinates
-    transformer2 = Transformer.from_crs(local_azimuthal_projection, wgs84_projection)
-    lons, lats = transformer2.transform(*buffer.exterior.xy)
+    The circle is built in an azimuthal equidistant projection (AEQD) centred on each location,
+    then projected back to geodetic coordinates. As the AEQD projection uses a spherical earth, the
+    inverse projection is evaluated directly with numpy for all circles at once, which is equivalent
+    to using a `pyproj.Transformer` per location but avoids constructing one for each.
+
+    Args:
+        lats: the latitudes in degrees.
+        lons: the longitudes in degrees.
+        radii: the radii in metres.
+
+    Returns:
+        A numpy array of `Polygon`s, with longitudes in the range [0, 360).
+
+    Examples:
+        ```py
+        >>> from solvis.geometry import circle_polygons
+        >>> polygons = circle_polygons([-41.3, -43.53], [174.78, 172.63], 5e4)
+        >>> len(polygons)
+        2
+        ```
+    """
+    lat, lon, radius = (np.asarray(a, dtype=float).ravel() for a in np.broadcast_arrays(lats, lons, radii))
+
+    ring = _unit_circle_coordinates()
+    x = radius[:, np.newaxis] * ring[np.newaxis, :, 0]
+    y = radius[:, np.newaxis] * ring[np.newaxis, :, 1]
+
+    # inverse spherical AEQD: the great circle distance and azimuth of each point from the centre.
+    distance = np.hypot(x, y) / AZIMUTHAL_EARTH_RADIUS_M
+    azimuth = np.arctan2(x, y)
+    lat1 = np.radians(lat)[:, np.newaxis]
+    lon1 = np.radians(lon)[:, np.newaxis]
+    sin_lat1, cos_lat1 = np.sin(lat1), np.cos(lat1)
+    sin_d, cos_d = np.sin(distance), np.cos(distance)
+    lat2 = np.arcsin(sin_lat1 * cos_d + cos_lat1 * sin_d * np.cos(azimuth))
+    lon2 = lon1 + np.arctan2(np.sin(azimuth) * sin_d * cos_lat1, cos_d - sin_lat1 * np.sin(lat2))
 
     # Add 360 to all negative longitudes
-    points = []
-    for i in range(len(lons)):
-        lon = lons[i]
-        if lon < 0:
-            lon += 360
-        points.append(Point(lon, lats[i]))
+    lons_out = np.degrees(lon2)
+    lons_out = (lons_out + 180.0) % 360.0 - 180.0
+    lons_out = np.where(lons_out < 0, lons_out + 360.0, lons_out)
+
+    return shapely.polygons(np.stack([lons_out, np.degrees(lat2)], axis=-1))
 
-    return Polygon(points)
+
+@lru_cache(maxsize=1024)
+def azimuthal_transformer(lat: float, lon: float) -> Transformer:
+    """Get a cached transformer from WGS84 to a local azimuthal equidistant projection.
+
+    Building a `pyproj.Transformer` takes several milliseconds, so transformers are cached per projection.
+
+    Args:
+        lat: the latitude in degrees of the projection origin.
+        lon: the longitude in degrees of the projection origin.
+
+    Returns:
+        A transformer from WGS84 `(lon, lat)` to AEQD `(x, y)` in metres relative to the origin.
+    """
+    local_azimuthal_projection = "+proj=aeqd +R={} +units=m +lat_0={} +lon_0={}".format(
+        AZIMUTHAL_EARTH_RADIUS_M, lat, lon
+    )
+    return Transformer.from_crs(WGS84_PROJECTION, local_azimuthal_projection)
 
 
 def section_distance(
@@ -387,7 +470,10 @@ def section_distance(
 
     Raises:
         ValueError: The `surface_geometry` was of an unsupported type.
+        ImportError: The optional pyvista dependency is not installed.
     """
+    pv = _pyvista()
+
     # print(f'trace coords: {surface_geometry.exterior.coords.xy}')
     if isinstance(surface_geometry, Polygon):
         trace = transformer.transform(*surface_geometry.exterior.coords.xy)
@@ -15,7 +15,7 @@ from nzshm_common.location.location import location_by_id
 from solvis import CompositeSolution, FaultSystemSolution
 from solvis.geometry import circle_polygon
 from solvis.get_secret import get_secret
-from solvis.solution.inversion_solution import BranchInversionSolution, InversionSolution
+from solvis.solution.fault_system_solution import BranchArchive, FaultSystemSolutionBuilder
 from solvis.utils import export_geojson
 
 # Get API key from AWS secrets manager
@@ -110,7 +110,18 @@ def fetch_toshi_files(work_folder, file_ids):
     return file_map
 
 
-def build_fault_system_solution(work_folder, fault_system, model_version=nzshm_model.CURRENT_VERSION):
+def branch_archives(fslt, filemap):
+    for fslt_branch in fslt.branches:
+        inversion_solution_id = FaultSystemSolution.get_branch_inversion_solution_id(fslt_branch)
+        yield BranchArchive(
+            archive_path=filemap[inversion_solution_id]['filepath'],
+            branch=fslt_branch,
+            fault_system=fslt.short_name,
+            rupture_set_id=filemap[inversion_solution_id]['rupt_set_id'],
+        )
+
+
+def build_fault_system_solution(work_folder, fault_system, model_version=nzshm_model.CURRENT_VERSION, workers=None):
     current_model = nzshm_model.get_model_version(model_version)
     slt = current_model.source_logic_tree()
     branch = None
@@ -125,23 +136,12 @@ def build_fault_system_solution(work_folder, fault_system, model_version=nzshm_m
     file_ids = [FaultSystemSolution.get_branch_inversion_solution_id(b) for b in branch.branches]
     filemap = fetch_toshi_files(work_folder, file_ids)
 
-    # prepare BranchSolutions
-    click.echo("load branch solutions...")
-    solutions = []
-    for fslt_branch in branch.branches:
-        solutions.append(
-            BranchInversionSolution.new_branch_solution(
-                InversionSolution.from_archive(filemap[fslt_branch.inversion_solution_id]['filepath']),
-                branch=fslt_branch,
-                fault_system=branch.short_name,
-                rupture_set_id=filemap[fslt_branch.inversion_solution_id]['rupt_set_id'],
-            )
-        )
-
     # build time ....
     click.echo("build fault_system_solution ...")
     tic = time.perf_counter()
-    fault_system_solution = FaultSystemSolution.from_branch_solutions(solutions)
+    fault_system_solution = (
+        FaultSystemSolutionBuilder().add_branch_archives(branch_archives(branch, filemap), max_workers=workers).build()
+    )
     toc = time.perf_counter()
     click.echo(f"time to build fault_system_solution: {toc - tic} seconds")
 
@@ -153,20 +153,10 @@ def build_fault_system_solution(work_folder, fault_system, model_version=nzshm_m
     fault_system_solution.to_archive(str(fname), filemap[file_ids[0]]['filepath'])  # , compat=False)
 
 
-def build_composite_all(work_folder, archive_name, model_version=nzshm_model.CURRENT_VERSION):
+def build_composite_all(work_folder, archive_name, model_version=nzshm_model.CURRENT_VERSION, workers=None):
     current_model = nzshm_model.get_model_version(model_version)
     slt = current_model.source_logic_tree()
 
-    def branch_solutions(fslt, filemap):
-        for fslt_branch in fslt.branches:
-            inversion_solution_id = FaultSystemSolution.get_branch_inversion_solution_id(fslt_branch)
-            yield BranchInversionSolution.new_branch_solution(
-                InversionSolution.from_archive(filemap[inversion_solution_id]['filepath']),
-                branch=fslt_branch,
-                fault_system=fslt.short_name,
-                rupture_set_id=filemap[inversion_solution_id]['rupt_set_id'],
-            )
-
     composite = CompositeSolution(slt)  # create the new composite solutoin
     tic = time.perf_counter()
 
@@ -175,9 +165,13 @@ def build_composite_all(work_folder, archive_name, model_version=nzshm_model.CUR
             file_ids = [FaultSystemSolution.get_branch_inversion_solution_id(b) for b in fault_system_lt.branches]
             filemap = fetch_toshi_files(work_folder, file_ids)
 
-            # prepare BranchSolutions
-            click.echo(f"load branch solutions... {fault_system_lt.short_name}")
-            fss = FaultSystemSolution.from_branch_solutions(branch_solutions(fault_system_lt, filemap))
+            # build from the branch archives
+            click.echo(f"build fault_system_solution... {fault_system_lt.short_name}")
+            fss = (
+                FaultSystemSolutionBuilder()
+                .add_branch_archives(branch_archives(fault_system_lt, filemap), max_workers=workers)
+                .build()
+            )
 
             # ensure fast indices
             fss.enable_fast_indices()
@@ -234,12 +228,17 @@ def cli(ctx, work_folder, fault_system):
     help="An OpenSHA solution archive name (default: CompositeSolution.zip)",
 )
 @click.option('--model_id', '-m', default="NSHM_v1.0.4", help=MODEL_ID_HELP)
+@click.option(
+    '--workers', '-j', default=None, type=int, help="Processes reading branch rates (default: the number of CPUs)"
+)
 @click.pass_context
-def build(ctx, archive_name, model_id):
+def build(ctx, archive_name, model_id, workers):
     if ctx.obj['fault_system'] == 'ALL':
-        solution = build_composite_all(ctx.obj['work_folder'], archive_name, model_id)
+        solution = build_composite_all(ctx.obj['work_folder'], archive_name, model_id, workers)
     else:
-        solution = build_fault_system_solution(ctx.obj['work_folder'], ctx.obj['fault_system'], model_id)  # noqa: F841
+        solution = build_fault_system_solution(  # noqa: F841
+            ctx.obj['work_folder'], ctx.obj['fault_system'], model_id, workers
+        )
 
 
 @cli.command('ls')
@@ -10,6 +10,7 @@ Classes:
  FaultSystemSolution: a aggregation of multiple InversionSolutions sharing the same rupture set.
  CompositeSolution: the container class for complete model and logic tree.
  SolutionParticipation: a helper class to calculate rupture participation for parts of the fault system.
+ BranchParticipation: a helper class to calculate the participation of every branch of a FaultSystemSolution.
 
 Modules:
  typing: defines class interfaces using `typing.Protocol`
@@ -23,10 +24,55 @@ Example:
     ```
 """
 
-from .composite_solution import CompositeSolution
-from .fault_system_solution import FaultSystemSolution
-from .inversion_solution import InversionSolution, InversionSolutionFile, data_to_zip_direct
-from .solution_participation import SolutionParticipation
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:
+    from . import named_fault, solution_surfaces_builder, typing
+    from .composite_solution import CompositeSolution
+    from .fault_system_solution import FaultSystemSolution
+    from .inversion_solution import InversionSolution, InversionSolutionFile, data_to_zip_direct
+    from .solution_participation import BranchParticipation, SolutionParticipation
+
+# Public names are resolved lazily on first access (PEP 562), e.g. `nzshm_model` is only
+# imported when the logic tree features of `CompositeSolution` are used.
+_LAZY_ATTRIBUTES = {
+    "CompositeSolution": ".composite_solution",
+    "FaultSystemSolution": ".fault_system_solution",
+    "InversionSolution": ".inversion_solution",
+    "InversionSolutionFile": ".inversion_solution",
+    "data_to_zip_direct": ".inversion_solution",
+    "SolutionParticipation": ".solution_participation",
+    "BranchParticipation": ".solution_participation",
+}
+_LAZY_SUBMODULES = [
+    "composite_solution",
+    "dataframe_models",
+    "fault_system_solution",
+    "inversion_solution",
+    "named_fault",
+    "solution_participation",
+    "solution_surfaces_builder",
+    "typing",
+]
+
+__all__ = [*_LAZY_ATTRIBUTES, *_LAZY_SUBMODULES]
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name], __name__), name)
+    elif name in _LAZY_SUBMODULES:
+        value = importlib.import_module(f".{name}", __name__)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value  # cache, so __getattr__ is not called again
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
+
 
 """
 Notes:
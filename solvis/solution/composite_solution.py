@@ -6,20 +6,221 @@ Classes:
 
 import io
 import logging
+import os
+import tempfile
+import time
 import zipfile
+from collections.abc import MutableMapping
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Iterable, Optional, Union
+from typing import TYPE_CHECKING, BinaryIO, Callable, Dict, Iterable, Iterator, Optional, Union, cast
 
 import geopandas as gpd
+import numpy as np
 import pandas as pd
-from nzshm_model import logic_tree
 
-from solvis.solution.inversion_solution.inversion_solution_file import data_to_zip_direct
+from solvis.solution.inversion_solution.inversion_solution_file import data_to_zip_direct, zip_member_data_offset
 
 from .fault_system_solution import FaultSystemSolution
 
+if TYPE_CHECKING:
+    from nzshm_model import logic_tree
+
 log = logging.getLogger(__name__)
 
+SolutionLoader = Callable[[], FaultSystemSolution]
+
+
+class _ArchiveMemberIO(io.RawIOBase):
+    """A read-only, seekable window onto a byte range of a file.
+
+    Used to open a nested zip archive that is STORED (uncompressed) in an outer archive
+    directly from its offset, without copying the member into memory first.
+    """
+
+    def __init__(self, path: Union[Path, str], offset: int, size: int):
+        self._file = open(path, 'rb')
+        self._offset = offset
+        self._size = size
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self._size + offset
+        else:  # pragma: no cover
+            raise ValueError(f"invalid whence ({whence})")
+        if position < 0:
+            raise ValueError(f"negative seek position {position}")
+        self._position = position
+        return position
+
+    def readinto(self, buffer) -> int:
+        count = min(len(buffer), self._size - self._position)
+        if count <= 0:
+            return 0
+        self._file.seek(self._offset + self._position)
+        count = self._file.readinto(memoryview(buffer)[:count])
+        self._position += count
+        return count
+
+    def close(self) -> None:
+        self._file.close()
+        super().close()
+
+
+def _stored_member_offset(archive_path: Union[Path, str], info: zipfile.ZipInfo) -> int:
+    """Return the offset of the data of a zip archive member, from its local file header."""
+    with open(archive_path, 'rb') as archive:
+        return zip_member_data_offset(archive, info)
+
+
+def _nested_archive_loader(archive_path: Union[Path, str], info: zipfile.ZipInfo) -> SolutionLoader:
+    """Return a function loading the FaultSystemSolution nested in `archive_path` as member `info`."""
+
+    def load() -> FaultSystemSolution:
+        tic = time.perf_counter()
+        buffer: BinaryIO
+        if info.compress_type == zipfile.ZIP_STORED and not info.flag_bits & 0x1:
+            # read directly from the outer archive
+            offset = _stored_member_offset(archive_path, info)
+            buffer = io.BufferedReader(_ArchiveMemberIO(archive_path, offset, info.compress_size))
+        else:
+            # compressed members must be inflated, but only this one
+            with zipfile.ZipFile(archive_path) as archive:
+                buffer = io.BytesIO(archive.read(info))
+        solution = FaultSystemSolution.from_archive(buffer)
+        toc = time.perf_counter()
+        log.debug('loaded %s from %s in %2.3f seconds' % (info.filename, archive_path, toc - tic))
+        return solution
+
+    return load
+
+
+# the tables parsed by `_warm`, and the path attribute of their archive member
+_WARM_TABLES = {
+    'aggregate_rates': 'AGGREGATE_RATES_PATH',
+    'composite_rates': 'COMPOSITE_RATES_PATH',
+    'ruptures': 'RUPTS_PATH',
+    'fast_indices': 'FAST_INDICES_PATH',
+    'fault_sections': 'FAULTS_PATH',
+}
+
+
+def _warm(solution: FaultSystemSolution) -> FaultSystemSolution:
+    """Parse and cache the archive tables of a FaultSystemSolution.
+
+    Tables are read one at a time, since they share the solution's archive buffer. Tables that are not in
+    the archive (e.g. `fast_indices`) are left to be built on demand.
+    """
+    solution_file = solution.solution_file
+    members = set(solution_file.archive.namelist())
+    for table, path_attribute in _WARM_TABLES.items():
+        if getattr(solution_file, path_attribute) in members:
+            getattr(solution_file, table)
+    return solution
+
+
+def _concat_fault_systems(frames: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate per fault system dataframes, keyed by a categorical `fault_system` column."""
+    lengths = [len(frame) for frame in frames.values()]
+    df = pd.concat(frames.values(), ignore_index=True)
+    codes = np.repeat(np.arange(len(frames), dtype='int8'), lengths)
+    fault_system = pd.Series(
+        pd.Categorical.from_codes(codes, dtype=pd.CategoricalDtype(list(frames.keys()))),  # type: ignore[arg-type]
+        index=df.index,
+    )
+    if 'fault_system' in df.columns:
+        df['fault_system'] = fault_system
+    else:
+        df.insert(0, 'fault_system', fault_system)
+    return df
+
+
+def _id_offsets(max_ids: Dict[str, int]) -> pd.Series:
+    """Return the offsets placing each fault system's ids (0 to max_id) end to end."""
+    sizes = np.array([int(max_id) + 1 for max_id in max_ids.values()], dtype='int64')
+    return pd.Series(np.cumsum(sizes) - sizes, index=pd.Index(list(max_ids.keys()), name='fault_system'))
+
+
+def _global_ids(fault_system: pd.Series, local_ids: pd.Series, offsets: pd.Series) -> np.ndarray:
+    """Map categorical fault system keys and local ids to global ids."""
+    fault_system_offsets = offsets.reindex(fault_system.cat.categories).to_numpy()
+    return fault_system_offsets[fault_system.cat.codes.to_numpy()] + local_ids.to_numpy(dtype='int64')
+
+
+class _FaultSystemSolutions(MutableMapping):
+    """A mapping of fault system codes to FaultSystemSolution instances.
+
+    Entries may be added as loader functions, which are called on first access.
+    """
+
+    def __init__(self) -> None:
+        self._items: Dict[str, Union[FaultSystemSolution, SolutionLoader]] = {}
+
+    def add_loader(self, fault_system: str, loader: SolutionLoader) -> None:
+        self._items[fault_system] = loader
+
+    def is_loaded(self, fault_system: str) -> bool:
+        return isinstance(self._items[fault_system], FaultSystemSolution)
+
+    def __getitem__(self, fault_system: str) -> FaultSystemSolution:
+        item = self._items[fault_system]
+        if not isinstance(item, FaultSystemSolution):
+            item = item()
+            self._items[fault_system] = item
+        return item
+
+    def __setitem__(self, fault_system: str, solution: FaultSystemSolution) -> None:
+        self._items[fault_system] = solution
+
+    def __delitem__(self, fault_system: str) -> None:
+        del self._items[fault_system]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._items)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def close(self) -> None:
+        """Close the nested archive files of the loaded entries that are read in place."""
+        for item in self._items.values():
+            if isinstance(item, FaultSystemSolution):
+                archive = item.solution_file._archive
+                if isinstance(archive, io.BufferedReader) and isinstance(archive.raw, _ArchiveMemberIO):
+                    archive.close()
+
+    def load(self, max_workers: Optional[int] = None, warm: bool = True) -> None:
+        """Load all pending entries concurrently in a thread pool, optionally warming their tables."""
+        pending = [key for key, item in self._items.items() if not isinstance(item, FaultSystemSolution)]
+
+        def load_one(fault_system: str) -> FaultSystemSolution:
+            solution = cast(SolutionLoader, self._items[fault_system])()
+            return _warm(solution) if warm else solution
+
+        if not pending:
+            return
+
+        tic = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max_workers or len(pending)) as executor:
+            for fault_system, solution in zip(pending, executor.map(load_one, pending)):
+                self._items[fault_system] = solution
+        toc = time.perf_counter()
+        log.debug('loaded fault systems %s in %2.3f seconds' % (pending, toc - tic))
+
 
 class CompositeSolution:
     """A container class collecting FaultSystemSolution instances and a source_logic_tree.
@@ -34,9 +235,16 @@ class CompositeSolution:
         to_archive:
     """
 
-    _solutions: Dict[str, FaultSystemSolution]
+    _solutions: _FaultSystemSolutions
     _source_logic_tree: 'logic_tree.SourceLogicTree'
     _archive_path: Optional[Path] = None
+    _rupture_rates: Optional[pd.DataFrame] = None
+    _composite_rates: Optional[pd.DataFrame] = None
+    _fault_sections_with_rupture_rates: Optional[pd.DataFrame] = None
+    _rupture_id_offsets: Optional[pd.Series] = None
+    _section_id_offsets: Optional[pd.Series] = None
+    _global_rupture_rates: Optional[pd.DataFrame] = None
+    _global_rupture_sections: Optional[pd.DataFrame] = None
 
     def __init__(self, source_logic_tree: 'logic_tree.SourceLogicTree'):
         """Instantiate a new instance.
@@ -45,7 +253,7 @@ class CompositeSolution:
             source_logic_tree: the logic tree instance.
         """
         self._source_logic_tree = source_logic_tree
-        self._solutions = {}
+        self._solutions = _FaultSystemSolutions()
         # print('__init__', self._solutions)
 
     def add_fault_system_solution(self, fault_system: str, fault_system_solution: FaultSystemSolution):
@@ -56,8 +264,18 @@ class CompositeSolution:
                 f"fault system with key: {fault_system} exists already. {self._solutions.keys()}"
             )  # pragma: no cover
         self._solutions[fault_system] = fault_system_solution
+        self._clear_cache()
         return self
 
+    def _clear_cache(self):
+        self._rupture_rates = None
+        self._composite_rates = None
+        self._fault_sections_with_rupture_rates = None
+        self._rupture_id_offsets = None
+        self._section_id_offsets = None
+        self._global_rupture_rates = None
+        self._global_rupture_sections = None
+
     def rupture_surface(self, fault_system: str, rupture_id: int) -> gpd.GeoDataFrame:
         return self._solutions[fault_system].rupture_surface(rupture_id)
 
@@ -92,14 +310,14 @@ class CompositeSolution:
                 rate_max,
                 rate_min,
                 rate_count,
-                rate_weighted_mean
+                rate_weighted_mean,
+                rate_p10, rate_p50, rate_p90 (if the fault system solutions have them)
         """
-        # if self._fs_with_rates is not None:
-        #     return self._fs_with_rates
-
-        all_rates = [sol.solution_file.rupture_rates for sol in self._solutions.values()]
-        all_rates_df = pd.concat(all_rates, ignore_index=True)
-        return all_rates_df
+        if self._rupture_rates is None:
+            self._rupture_rates = _concat_fault_systems(
+                {key: sol.solution_file.rupture_rates for key, sol in self._solutions.items()}
+            )
+        return self._rupture_rates
 
     @property
     def composite_rates(self) -> pd.DataFrame:
@@ -115,16 +333,15 @@ class CompositeSolution:
                 solution_id,
                 Annual Rate
         """
-        # if self._fs_with_rates is not None:
-        #     return self._fs_with_rates
-
-        all_rates = [sol.model.composite_rates for sol in self._solutions.values()]
-        all_rates_df = pd.concat(all_rates, ignore_index=True)
-        return all_rates_df
+        if self._composite_rates is None:
+            self._composite_rates = _concat_fault_systems(
+                {key: sol.model.composite_rates for key, sol in self._solutions.items()}
+            )
+        return self._composite_rates
 
     @property
     def fault_sections_with_rupture_rates(self) -> pd.DataFrame:
-        """Get a dataframe containing the fault sections for all fault_system_solutions.
+        """Get (and cache) a dataframe containing the fault sections for all fault_system_solutions.
 
         Returns:
             a `pandas.DataFrame` with columns: <br/>
@@ -133,53 +350,208 @@ class CompositeSolution:
                 rate_count,
                 rate_weighted_mean
         """
-        all = [
-            gpd.GeoDataFrame(sol.model.fault_sections_with_rupture_rates).to_crs("EPSG:4326")
-            for sol in self._solutions.values()
-        ]
-        print(all)
-        all_df = pd.concat(all, ignore_index=True)
-        return all_df
+        if self._fault_sections_with_rupture_rates is None:
+            self._fault_sections_with_rupture_rates = _concat_fault_systems(
+                {
+                    key: gpd.GeoDataFrame(sol.model.fault_sections_with_rupture_rates).to_crs("EPSG:4326")
+                    for key, sol in self._solutions.items()
+                }
+            )
+        return self._fault_sections_with_rupture_rates
+
+    @property
+    def rupture_id_offsets(self) -> pd.Series:
+        """Get (and cache) the offset of each fault system in the composite rupture id space.
+
+        A global rupture id is the fault system offset plus the local `Rupture Index`, so rupture ids are
+        unique across all the fault systems in the composite solution.
+
+        Returns:
+            a `pandas.Series` of offsets, indexed by fault system code.
+        """
+        if self._rupture_id_offsets is None:
+            self._rupture_id_offsets = _id_offsets(
+                {key: sol.solution_file.ruptures['Rupture Index'].max() for key, sol in self._solutions.items()}
+            )
+        return self._rupture_id_offsets
+
+    @property
+    def section_id_offsets(self) -> pd.Series:
+        """Get (and cache) the offset of each fault system in the composite fault section id space.
+
+        Returns:
+            a `pandas.Series` of offsets, indexed by fault system code.
+        """
+        if self._section_id_offsets is None:
+            self._section_id_offsets = _id_offsets(
+                {key: sol.solution_file.fault_sections.index.max() for key, sol in self._solutions.items()}
+            )
+        return self._section_id_offsets
+
+    def global_rupture_ids(self, fault_system: str, rupture_ids: Iterable[int]) -> np.ndarray:
+        """Convert the local rupture ids of a fault system to global rupture ids.
+
+        Args:
+            fault_system: a fault system code.
+            rupture_ids: rupture ids local to the fault system.
+
+        Returns:
+            an array of global rupture ids.
+        """
+        return np.asarray(rupture_ids, dtype='int64') + self.rupture_id_offsets[fault_system]
+
+    def local_rupture_ids(self, global_rupture_ids: Iterable[int]) -> pd.DataFrame:
+        """Convert global rupture ids to fault system codes and local rupture ids.
+
+        Args:
+            global_rupture_ids: global rupture ids.
+
+        Returns:
+            a `pandas.DataFrame` with columns: <br/>
+                fault_system,
+                Rupture Index
+
+        Raises:
+            ValueError: if an id is outside the global rupture id space.
+        """
+        offsets = self.rupture_id_offsets
+        ids = np.asarray(global_rupture_ids, dtype='int64')
+        total = 0
+        if not offsets.empty:
+            last = offsets.index[-1]
+            total = int(offsets[last] + self._solutions[last].solution_file.ruptures['Rupture Index'].max()) + 1
+        if ids.size and (ids.min() < 0 or ids.max() >= total):
+            raise ValueError(f"global rupture ids must be in the range [0, {total})")
+        codes = np.searchsorted(offsets.to_numpy(), ids, side='right') - 1
+        return pd.DataFrame(
+            {
+                'fault_system': pd.Categorical.from_codes(codes, categories=offsets.index),  # type: ignore[arg-type]
+                'Rupture Index': pd.array(ids - offsets.to_numpy()[codes], dtype='UInt32'),
+            }
+        )
+
+    @property
+    def global_rupture_rates(self) -> pd.DataFrame:
+        """Get (and cache) the rupture rates of all fault systems with their global rupture ids.
+
+        Returns:
+            a `pandas.DataFrame` with columns: </br>
+                Global Rupture Index,
+                fault_system,
+                Rupture Index,
+                ...
+                rate_weighted_mean
+        """
+        if self._global_rupture_rates is None:
+            df = self.rupture_rates.copy(deep=False)
+            df.insert(
+                0,
+                'Global Rupture Index',
+                _global_ids(df['fault_system'], df['Rupture Index'], self.rupture_id_offsets),
+            )
+            self._global_rupture_rates = df
+        return self._global_rupture_rates
+
+    @property
+    def global_rupture_sections(self) -> pd.DataFrame:
+        """Get (and cache) the rupture x section incidence of all fault systems, in global ids.
+
+        Returns:
+            a `pandas.DataFrame` with columns: </br>
+                global_rupture,
+                global_section,
+                fault_system,
+                rupture,
+                section
+        """
+        if self._global_rupture_sections is None:
+            df = _concat_fault_systems({key: sol.model.rupture_sections for key, sol in self._solutions.items()})
+            df.insert(0, 'global_rupture', _global_ids(df['fault_system'], df['rupture'], self.rupture_id_offsets))
+            df.insert(1, 'global_section', _global_ids(df['fault_system'], df['section'], self.section_id_offsets))
+            self._global_rupture_sections = df
+        return self._global_rupture_sections
 
     def to_archive(self, archive_path: Union[Path, str]):
         """Serialize a CompositeSolution instance to a zip archive.
 
+        The nested fault system solution archives are already compressed, so they are STORED. This lets
+        `from_archive` read each one in place.
+
+        The archive is written to a temporary file in the same folder, which then replaces `archive_path`,
+        so a composite solution may be written back to the archive it was loaded from.
+
         Args:
             archive_path: a valid target file path.
         """
-        with zipfile.ZipFile(archive_path, 'w', zipfile.ZIP_DEFLATED) as zout:
-            for key, fss in self._solutions.items():
-                fss_name = f"{key}_fault_system_solution.zip"
-                fss_file = fss.solution_file
-                if fss_file._archive:
-                    # serialise the 'in-memory' archive
-                    fss_file._archive.seek(0)
-                    data_to_zip_direct(zout, fss_file._archive.read(), fss_name)
-                else:  # pragma: no cover
-                    raise RuntimeError("_archive is not defined")
-        self._archive_path = Path(archive_path)
+        archive_path = Path(archive_path)
+        with tempfile.NamedTemporaryFile(
+            dir=archive_path.parent, prefix=f'.{archive_path.name}.', suffix='.tmp', delete=False
+        ) as temp_file:
+            temp_path = Path(temp_file.name)
+        try:
+            with zipfile.ZipFile(temp_path, 'w', zipfile.ZIP_DEFLATED) as zout:
+                # loads any pending fault systems, from the source archive, before it is replaced
+                for key, fss in self._solutions.items():
+                    fss_name = f"{key}_fault_system_solution.zip"
+                    fss_file = fss.solution_file
+                    if fss_file._archive is None:
+                        # e.g. a filtered solution, or one read from a path
+                        fss.to_archive(io.BytesIO())
+                    archive = cast(BinaryIO, fss_file._archive)
+                    archive.seek(0)
+                    data_to_zip_direct(zout, archive.read(), fss_name, zipfile.ZIP_STORED)
+            os.replace(temp_path, archive_path)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+        self._archive_path = archive_path
+
+    def close(self) -> None:
+        """Close the files held open by fault system solutions read in place from the archive.
+
+        Tables of those fault system solutions that are not loaded yet can no longer be read.
+        """
+        self._solutions.close()
+
+    def __enter__(self) -> 'CompositeSolution':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
 
     @staticmethod
-    def from_archive(archive_path: Path, source_logic_tree: 'logic_tree.SourceLogicTree') -> 'CompositeSolution':
+    def from_archive(
+        archive_path: Path,
+        source_logic_tree: 'logic_tree.SourceLogicTree',
+        preload: bool = False,
+        max_workers: Optional[int] = None,
+    ) -> 'CompositeSolution':
         """Deserialize a CompositeSolution instance from an archive path.
 
+        Each fault system solution is loaded on first access. Nested archives that are STORED
+        are read directly from their offset in `archive_path`.
+
+        With `preload`, all fault system solutions are loaded, and their tables parsed, concurrently.
+        This takes about as long as the slowest fault system, rather than the sum of them.
+
         Args:
             archive_path: a valid target file path.
             source_logic_tree: a source_logic_tree instance.
+            preload: if True, load all fault system solutions now, in a thread pool.
+            max_workers: the maximum number of preload threads (default: one per fault system).
         """
         new_solution = CompositeSolution(source_logic_tree)
 
-        for fault_system_lt in source_logic_tree.branch_sets:
-            if fault_system_lt.short_name in ['CRU', 'PUY', 'HIK']:
-                assert zipfile.Path(archive_path, at=f'{fault_system_lt.short_name}_fault_system_solution.zip').exists()
-                fss = FaultSystemSolution.from_archive(
-                    io.BytesIO(
-                        zipfile.Path(
-                            archive_path, at=f'{fault_system_lt.short_name}_fault_system_solution.zip'
-                        ).read_bytes()
+        with zipfile.ZipFile(archive_path) as archive:
+            for fault_system_lt in source_logic_tree.branch_sets:
+                if fault_system_lt.short_name in ['CRU', 'PUY', 'HIK']:
+                    info = archive.getinfo(f'{fault_system_lt.short_name}_fault_system_solution.zip')
+                    new_solution._solutions.add_loader(
+                        fault_system_lt.short_name, _nested_archive_loader(archive_path, info)
                     )
-                )
-                new_solution.add_fault_system_solution(fault_system_lt.short_name, fss)
+
+        if preload:
+            new_solution._solutions.load(max_workers)
 
         new_solution._archive_path = archive_path
         return new_solution
@@ -7,8 +7,9 @@
 - refactoring of column names is expected in a future release, but legacy column names will be supported.
 """
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
+import numpy as np
 import pandas as pd
 import pandera.pandas as pda
 from pandera.typing import Index, Series
@@ -154,9 +155,11 @@ class FaultSectionRuptureRateSchema(FaultSectionSchemaBase):
      fault_system: fault system short code eg 'CRU'
      rupture_id: the id of each rupture
      rate_count: count of aggregate ruptures with rate.
-     rate_max: max rate of aggregate ruptures with rate.
-     rate_min: min rate of aggregate ruptures with rate.
+     rate_max: max rate of aggregate ruptures with rate (i.e. over the branches with a rate).
+     rate_min: min rate of aggregate ruptures with rate (i.e. over the branches with a rate).
      rate_weighted_mean: rate weighted mean of aggregate ruptures with rate.
+     rate_p10: weighted 10th percentile of the branch rates, branches without a rate counting as zero
+         (optional, as are rate_p50 and rate_p90).
      magnitude: the rupture magnitude.
      mean_rake: the mean rake angle of the ruptures fault sections (degrees).
      area: rupture area (meters^2).
@@ -184,6 +187,9 @@ class FaultSectionRuptureRateSchema(FaultSectionSchemaBase):
     rate_max: Series[pd.Float32Dtype]
     rate_min: Series[pd.Float32Dtype]
     rate_weighted_mean: Series[pd.Float32Dtype]
+    rate_p10: Optional[Series[pd.Float32Dtype]]
+    rate_p50: Optional[Series[pd.Float32Dtype]]
+    rate_p90: Optional[Series[pd.Float32Dtype]]
     magnitude: Series[pd.Float32Dtype] = pda.Field(alias='Magnitude')
     mean_rake: Series[pd.Float32Dtype] = pda.Field(alias='Average Rake (degrees)')
     area: Series[pd.Float32Dtype] = pda.Field(alias='Area (m^2)')
@@ -210,6 +216,52 @@ class RuptureSectionSchema(pda.DataFrameModel):
     section_id: Series[pd.Int32Dtype] = pda.Field(alias='section')
 
 
+class RuptureSectionRateSchema(pda.DataFrameModel):
+    """A Dataframe schema for the compact `rupture_section_rates`.
+
+    Each permutation of rupture_id and section_id, with just the rupture rates and magnitude, in
+    compact numpy dtypes.
+
+    Attributes:
+     index: unique index.
+     rupture_id: the id of each rupture
+     section_id: the id of each fault_section
+     magnitude: the rupture magnitude.
+
+    Other (`float32`) columns are the rupture rate columns of the solution, e.g. `Annual Rate`. Aggregate
+    solutions also have a categorical `fault_system` column.
+    """
+
+    class Config:
+        strict = False
+
+    index: Index[np.int64]
+    rupture_id: Series[np.int32] = pda.Field(alias='Rupture Index')
+    section_id: Series[np.int32] = pda.Field(alias='section')
+    magnitude: Series[np.float32] = pda.Field(alias='Magnitude')
+
+
+class RuptureDistanceSchema(pda.DataFrameModel):
+    """A Dataframe schema for `rupture_distances`.
+
+    This is a sparse (long form) table of the sites x ruptures distance matrix.
+
+    Attributes:
+     index: unique index.
+     site: the position of the site in the sites argument.
+     rupture_id: the id of each rupture
+     distance: the minimum distance (km) from the site to the rupture sections.
+    """
+
+    class Config:
+        strict = True
+
+    index: Index[pd.Int64Dtype]
+    site: Series[pd.Int32Dtype]
+    rupture_id: Series[pd.UInt32Dtype] = pda.Field(alias='Rupture Index')
+    distance: Series[pd.Float32Dtype]
+
+
 class RuptureBaseSchema(pda.DataFrameModel):
     """A Dataframe schema base.
 
@@ -248,7 +300,12 @@ class RupturesWithRuptureRatesSchema(RuptureBaseSchema):
 
 
 class AggregateRupturesWithRuptureRatesSchema(RuptureBaseSchema):
-    """A Dataframe schema for `FaultSystemSolution.ruptures_with_rupture_rates`."""
+    """A Dataframe schema for `FaultSystemSolution.ruptures_with_rupture_rates`.
+
+    The weighted percentiles of branch rates (`rate_p10`, `rate_p50`, `rate_p90`) are optional, as
+    archives built before they were added do not have them. Branches without a rate for a rupture count as
+    rate zero in these, but not in `rate_min` and `rate_max`, which are over the branches with a rate.
+    """
 
     class Config:
         strict = True
@@ -265,6 +322,9 @@ class AggregateRupturesWithRuptureRatesSchema(RuptureBaseSchema):
     rate_max: Series[pd.Float32Dtype]
     rate_min: Series[pd.Float32Dtype]
     rate_weighted_mean: Series[pd.Float32Dtype]
+    rate_p10: Optional[Series[pd.Float32Dtype]]
+    rate_p50: Optional[Series[pd.Float32Dtype]]
+    rate_p90: Optional[Series[pd.Float32Dtype]]
 
 
 class RuptureSectionsWithRuptureRatesSchema(RuptureBaseSchema):
@@ -300,6 +360,9 @@ class AggregateRuptureSectionsWithRuptureRatesSchema(RuptureBaseSchema):
     rate_max: Series[pd.Float32Dtype]
     rate_min: Series[pd.Float32Dtype]
     rate_weighted_mean: Series[pd.Float32Dtype]
+    rate_p10: Optional[Series[pd.Float32Dtype]]
+    rate_p50: Optional[Series[pd.Float32Dtype]]
+    rate_p90: Optional[Series[pd.Float32Dtype]]
 
     # from RuptureSectionSchema
     section: Series[pd.Int32Dtype]
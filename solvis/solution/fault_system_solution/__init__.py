@@ -3,9 +3,14 @@ A package supporting aggregation of compatible InversionSolutions via the FaultS
 
 Modules:
  fault_system_solution: defines the aggregation class FaultSystemSolution.
+ fault_system_solution_builder: build, or update the branches of, a FaultSystemSolution from branch solutions.
  fault_system_solution_file: defines a class that manages all IO for a FaultSystemSolution archive.
+ fault_system_solution_file_view: defines a filtered view of a FaultSystemSolutionFile.
  fault_system_solution_model: defines a class providing anaysis of FaultSystemSolution.
+ rate_fractiles: weighted fractiles of rupture rates across logic tree branches.
 """
 
 from .fault_system_solution import FaultSystemSolution
+from .fault_system_solution_builder import BranchArchive, FaultSystemSolutionBuilder, update_branches
+from .fault_system_solution_file_view import FaultSystemSolutionFileView
 from .fault_system_solution_model import FaultSystemSolutionModel
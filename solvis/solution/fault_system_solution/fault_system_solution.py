@@ -17,12 +17,12 @@ Examples:
 
 import io
 import logging
+import os
 import zipfile
 from pathlib import Path
-from typing import TYPE_CHECKING, Iterable, Optional, Union, cast
+from typing import TYPE_CHECKING, BinaryIO, Iterable, Mapping, Optional, Sequence, Union, cast
 
 # import geopandas as gpd
-import nzshm_model as nm
 import pandas as pd
 
 from ..inversion_solution import InversionSolution
@@ -30,14 +30,13 @@ from ..inversion_solution import InversionSolution
 # from ..solution_surfaces_builder import SolutionSurfacesBuilder
 from ..typing import ModelLogicTreeBranch
 from .fault_system_solution_file import FaultSystemSolutionFile
+from .fault_system_solution_file_view import FaultSystemSolutionFileView
 from .fault_system_solution_model import FaultSystemSolutionModel
+from .rate_fractiles import AGGREGATE_FRACTILES, rupture_rate_fractiles
 
 log = logging.getLogger(__name__)
 
 if TYPE_CHECKING:
-    from pandera.typing import DataFrame
-
-    from ..dataframe_models import RuptureRateSchema
     from ..inversion_solution import BranchInversionSolution
 
 
@@ -52,9 +51,9 @@ class FaultSystemSolution(InversionSolution):
         self._solution_file: FaultSystemSolutionFile = solution_file or FaultSystemSolutionFile()
         self._model: FaultSystemSolutionModel = FaultSystemSolutionModel(self._solution_file)
 
-    def to_archive(self, archive_path, base_archive_path=None, compat=False):
+    def to_archive(self, archive_path, base_archive_path=None, compat=False, compresslevel=None):
         self.model.enable_fast_indices()
-        return self._solution_file.to_archive(archive_path, base_archive_path, compat)
+        return self._solution_file.to_archive(archive_path, base_archive_path, compat, compresslevel)
 
     @property
     def solution_file(self) -> FaultSystemSolutionFile:
@@ -65,11 +64,11 @@ class FaultSystemSolution(InversionSolution):
         return self._model
 
     @staticmethod
-    def from_archive(instance_or_path: Union[Path, str, io.BytesIO]) -> 'FaultSystemSolution':
+    def from_archive(instance_or_path: Union[Path, str, BinaryIO]) -> 'FaultSystemSolution':
         new_solution_file = FaultSystemSolutionFile()
 
         # TODO: sort out this weirdness
-        if isinstance(instance_or_path, io.BytesIO):
+        if not isinstance(instance_or_path, (str, os.PathLike)):
             with zipfile.ZipFile(instance_or_path, 'r') as zf:
                 assert 'composite_rates.csv' in zf.namelist()
                 assert 'aggregate_rates.csv' in zf.namelist()
@@ -85,60 +84,29 @@ class FaultSystemSolution(InversionSolution):
 
     @staticmethod
     def filter_solution(solution: 'InversionSolution', rupture_ids: Iterable) -> 'FaultSystemSolution':
-        # this method  is not actually used, and maybe deprecated in a future release
+        """
+        Filter the given solution by the specified rupture ids.
 
-        solution = cast(FaultSystemSolution, solution)
-        # model = solution.model
-        rr = solution.solution_file.ruptures
-        cr = solution.model.composite_rates
-        ar = solution.model.aggregate_rates
-        ri = solution.solution_file.indices.copy()
-        avs = solution.solution_file.average_slips.copy()
-
-        ruptures = rr[rr["Rupture Index"].isin(rupture_ids)].copy()
-        composite_rates = cr[cr["Rupture Index"].isin(rupture_ids)].copy()
-        aggregate_rates = ar[ar["Rupture Index"].isin(rupture_ids)].copy()
-        indices = ri[ri["Rupture Index"].isin(rupture_ids)].copy()
-        average_slips = avs[avs["Rupture Index"].isin(rupture_ids)].copy()
-
-        # all other solution properties are derived from those above
-        new_solution_file = FaultSystemSolutionFile()
-        new_solution_file.set_props(
-            composite_rates,
-            aggregate_rates,
-            ruptures,
-            indices,
-            solution.solution_file.fault_sections.copy(),
-            solution.solution_file.fault_regime,
-            average_slips,
-        )
+        The new solution is a view of the original: see
+        [`FaultSystemSolutionFileView`][solvis.solution.fault_system_solution.fault_system_solution_file_view].
+        Rupture tables are filtered on first access, other tables and the archive are shared with the
+        original solution.
 
-        # now copy data from the original archive
-        assert solution.solution_file._archive, "Assumed _archive is not available"
-
-        new_archive = io.BytesIO()
-        with zipfile.ZipFile(new_archive, 'w') as new_zip:
-            # write the core files
-            with zipfile.ZipFile(solution.solution_file._archive, 'r') as zf:
-                for item in zf.filelist:
-                    if item.filename in solution.solution_file.DATAFRAMES:
-                        log.debug(f'filter_solution() skipping copy of dataframe file: {item.filename}')
-                        continue
-                    if item.filename in solution.solution_file.OPENSHA_ONLY:  # drop bulky, opensha-only artefacts
-                        log.debug(f'filter_solution() skipping copy of opensha only file: {item.filename}')
-                        continue
-                    log.debug(f'filter_solution() copying {item.filename}')
-                    new_zip.writestr(item, zf.read(item.filename))
-
-            # write the modifies tables
-            new_solution_file._write_dataframes(new_zip, reindex=False)  # retain original rupture ids and structure
-        new_solution_file._archive = new_archive
-        new_solution_file._archive.seek(0)
-        return FaultSystemSolution(new_solution_file)
+        Args:
+            solution: The input fault system solution to be filtered.
+            rupture_ids: A collection of rupture ids to include in the filtered solution.
+
+        Returns:
+            A new FaultSystemSolution containing only the ruptures with the given ids.
+        """
+        solution = cast(FaultSystemSolution, solution)
+        return FaultSystemSolution(FaultSystemSolutionFileView(solution.solution_file, rupture_ids))
 
     @staticmethod
     def new_solution(solution: 'BranchInversionSolution', composite_rates_df: pd.DataFrame) -> 'FaultSystemSolution':
         # build a new fault system solution, taking solution template properties, and composite_rates_df
+        branch_weights = composite_rates_df.drop_duplicates(['fault_system', 'solution_id'])
+        total_weights = branch_weights.groupby('fault_system')['weight'].sum().to_dict()
         composite_rates_df = composite_rates_df[composite_rates_df["Annual Rate"] > 0]
         composite_rates_df.insert(
             0,
@@ -164,6 +132,11 @@ class FaultSystemSolution(InversionSolution):
             }
         )
         composite_rates_df = composite_rates_df.drop(columns="weighted_rate")
+        aggregate_rates_df = aggregate_rates_df.merge(
+            rupture_rate_fractiles(composite_rates_df, total_weights, AGGREGATE_FRACTILES),
+            on=['fault_system', 'Rupture Index'],
+            how='left',
+        )
 
         fss_file = FaultSystemSolutionFile()
 
@@ -192,6 +165,8 @@ class FaultSystemSolution(InversionSolution):
             This distinction may go away in future versions, simplifying this issue:
             https://github.com/GNS-Science/nzshm-model/issues/81
         """
+        import nzshm_model as nm  # deferred, as nzshm_model is only needed for logic tree features
+
         if isinstance(branch, nm.logic_tree.SourceBranch):
             # NZSHM Model 0.6: v2 branches take inversion ID from first InversionSource
             for source in branch.sources:
@@ -210,22 +185,47 @@ class FaultSystemSolution(InversionSolution):
 
     @staticmethod
     def from_branch_solutions(solutions: Iterable['BranchInversionSolution']) -> 'FaultSystemSolution':
+        """Build a new FaultSystemSolution from branch solutions sharing a rupture set.
 
-        # combine the rupture rates from all solutions
-        solution_frames = []
-        for branch_solution in solutions:
-            inversion_solution_id = FaultSystemSolution.get_branch_inversion_solution_id(branch_solution.branch)
+        The branches are folded in one at a time by a
+        [`FaultSystemSolutionBuilder`][solvis.solution.fault_system_solution.fault_system_solution_builder.FaultSystemSolutionBuilder],
+        so memory use does not grow with the number of branches.
+
+        Args:
+            solutions: the branch solutions.
 
-            solution_df: DataFrame[RuptureRateSchema] = branch_solution.solution_file.rupture_rates.copy()
-            solution_df.insert(
-                0, 'solution_id', inversion_solution_id
-            )  # CategoricalDtype(categories=['PUY'], ordered=False)
-            solution_df.insert(0, 'rupture_set_id', branch_solution.rupture_set_id)
-            solution_df.insert(0, 'weight', branch_solution.branch.weight)
-            solution_df.insert(0, 'fault_system', branch_solution.fault_system)
-            solution_frames.append(solution_df)
+        Returns:
+            a new FaultSystemSolution.
+        """
+        from .fault_system_solution_builder import FaultSystemSolutionBuilder
+
+        builder = FaultSystemSolutionBuilder()
+        for branch_solution in solutions:
+            builder.add_branch_solution(branch_solution)
+        return builder.build()
 
-        # more efficient to do this once, outside the loop
-        composite_rates_df: pd.DataFrame = pd.concat(solution_frames, verify_integrity=True, ignore_index=True)
+    @staticmethod
+    def update_branches(
+        solution: 'FaultSystemSolution',
+        add: Iterable['BranchInversionSolution'] = (),
+        remove: Iterable[str] = (),
+        weights: Optional[Mapping[str, float]] = None,
+        fractiles: Sequence[float] = AGGREGATE_FRACTILES,
+    ) -> 'FaultSystemSolution':
+        """Add, remove or reweight the branches of a FaultSystemSolution, without rebuilding it.
+
+        See [`update_branches`][solvis.solution.fault_system_solution.fault_system_solution_builder.update_branches].
+
+        Args:
+            solution: the solution to update.
+            add: new branch solutions to add.
+            remove: the solution ids of branches to remove.
+            weights: new weights, by branch solution id.
+            fractiles: the weighted fractiles of branch rates to add to the aggregate rates.
+
+        Returns:
+            a new FaultSystemSolution.
+        """
+        from .fault_system_solution_builder import update_branches
 
-        return FaultSystemSolution.new_solution(solution=branch_solution, composite_rates_df=composite_rates_df)
+        return update_branches(solution, add, remove, weights, fractiles)
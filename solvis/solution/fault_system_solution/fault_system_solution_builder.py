@@ -0,0 +1,627 @@
+"""
+This module provides the FaultSystemSolutionBuilder class.
+
+The builder folds branch solutions into a FaultSystemSolution one at a time. It keeps running
+min/max/count/weighted-sum arrays per rupture and spools the composite rates to a temporary file, so
+memory use does not grow with the number of branches.
+
+Rate fractiles need all the branch rates of a rupture at once. The spooled composite rates are read back once,
+their rows sorted into buckets (ranges of ruptures) in a temporary file, and the fractiles are computed a bucket
+at a time, holding at most `max_fractile_rows` rows in memory.
+
+Classes:
+    BranchArchive: a branch solution archive, with its logic tree branch attributes.
+    FaultSystemSolutionBuilder: build a FaultSystemSolution from branch solutions, one branch at a time.
+
+Functions:
+    update_branches: add, remove or reweight the branches of an existing FaultSystemSolution.
+
+Examples:
+    ```py
+    >>> builder = FaultSystemSolutionBuilder()
+    >>> for branch_solution in branch_solutions:
+    ...     builder.add_branch_solution(branch_solution)
+    >>> fss = builder.build()
+    ```
+
+    Building from branch archives, reading just the branch rates in a process pool:
+    ```py
+    >>> builder = FaultSystemSolutionBuilder()
+    >>> builder.add_branch_archives(
+    ...     BranchArchive(archive_path, branch, 'CRU', rupture_set_id) for archive_path, branch in branches
+    ... )
+    >>> fss = builder.build()
+    ```
+
+    Updating the branches of an existing solution, without rebuilding it:
+    ```py
+    >>> new_fss = update_branches(fss, add=[branch_solution], weights={solution_id: 0.25})
+    ```
+"""
+
+import io
+import logging
+import tempfile
+import time
+import zipfile
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from ..inversion_solution import InversionSolution, InversionSolutionFile
+from .fault_system_solution import FaultSystemSolution
+from .fault_system_solution_file import FaultSystemSolutionFile
+from .rate_fractiles import AGGREGATE_FRACTILES, fractile_column, rupture_rate_fractiles
+
+if TYPE_CHECKING:
+    from ..inversion_solution import BranchInversionSolution
+    from ..typing import ModelLogicTreeBranch
+
+log = logging.getLogger(__name__)
+
+AGGREGATE_KEY = ['fault_system', 'Rupture Index']
+
+MAX_FRACTILE_ROWS = 10_000_000
+SPOOL_CHUNK_ROWS = 1_000_000
+
+# a composite rates row in a fractile bucket file
+_FRACTILE_RECORD = np.dtype([('Rupture Index', 'int64'), ('weight', 'float64'), ('Annual Rate', 'float32')])
+
+
+class BranchArchive(NamedTuple):
+    """A branch solution archive, with its logic tree branch attributes.
+
+    Attributes:
+        archive_path: path to the branch InversionSolution archive.
+        branch: the logic tree branch (providing weight and inversion solution id).
+        fault_system: the fault system code (e.g `CRU`, 'HIK`).
+        rupture_set_id: id of the branch rupture set.
+    """
+
+    archive_path: Union[Path, str]
+    branch: 'ModelLogicTreeBranch'
+    fault_system: str
+    rupture_set_id: str
+
+
+def _read_rupture_rates(archive_path: Union[Path, str]) -> pd.DataFrame:
+    """Read just the rupture rates table of an InversionSolution archive."""
+    dtypes: defaultdict = defaultdict(lambda: 'Float32')
+    dtypes["Rupture Index"] = 'UInt32'
+    with zipfile.ZipFile(archive_path) as archive:
+        with archive.open(InversionSolutionFile.RATES_PATH) as data:
+            return pd.read_csv(data, dtype=dtypes)
+
+
+def _branch_composite_rates(
+    rupture_rates: pd.DataFrame, fault_system: str, weight: float, rupture_set_id: str, solution_id: str
+) -> pd.DataFrame:
+    """Get the composite rates of one branch: its non-zero rupture rates, with the branch attributes."""
+    rates = rupture_rates['Annual Rate'].to_numpy(dtype='float32', na_value=np.nan)
+    composite_rates_df = rupture_rates[rates > 0].copy()
+    composite_rates_df.insert(0, 'solution_id', solution_id)
+    composite_rates_df.insert(0, 'rupture_set_id', rupture_set_id)
+    composite_rates_df.insert(0, 'weight', weight)
+    composite_rates_df.insert(0, 'fault_system', fault_system)
+    return composite_rates_df
+
+
+class _RunningRates:
+    """Running aggregates of the branch rates of one fault system, indexed by rupture id."""
+
+    def __init__(self) -> None:
+        self.rate_min = np.empty(0, dtype='float32')
+        self.rate_max = np.empty(0, dtype='float32')
+        self.rate_count = np.empty(0, dtype='int64')
+        self.rate_weighted_sum = np.empty(0, dtype='float64')
+
+    def _grow(self, size: int) -> None:
+        extra = size - len(self.rate_count)
+        if extra <= 0:
+            return
+        self.rate_min = np.concatenate([self.rate_min, np.full(extra, np.inf, dtype='float32')])
+        self.rate_max = np.concatenate([self.rate_max, np.full(extra, -np.inf, dtype='float32')])
+        self.rate_count = np.concatenate([self.rate_count, np.zeros(extra, dtype='int64')])
+        self.rate_weighted_sum = np.concatenate([self.rate_weighted_sum, np.zeros(extra, dtype='float64')])
+
+    def add(self, rupture_ids: np.ndarray, rates: np.ndarray, weight: float) -> None:
+        if not len(rupture_ids):
+            return
+        self._grow(int(rupture_ids.max()) + 1)
+        np.minimum.at(self.rate_min, rupture_ids, rates)
+        np.maximum.at(self.rate_max, rupture_ids, rates)
+        np.add.at(self.rate_count, rupture_ids, 1)
+        np.add.at(self.rate_weighted_sum, rupture_ids, (rates * weight).astype('float32'))
+
+    def to_dataframe(self, fault_system: str) -> pd.DataFrame:
+        rupture_ids = np.flatnonzero(self.rate_count)
+        return pd.DataFrame(
+            {
+                'fault_system': fault_system,
+                'Rupture Index': pd.Series(rupture_ids, dtype='UInt32'),
+                'rate_count': pd.Series(self.rate_count[rupture_ids], dtype='Int64'),
+                'rate_max': pd.Series(self.rate_max[rupture_ids], dtype='Float32'),
+                'rate_min': pd.Series(self.rate_min[rupture_ids], dtype='Float32'),
+                'rate_weighted_mean': self.rate_weighted_sum[rupture_ids].astype('float32'),
+            }
+        )
+
+
+def _rupture_ranges(rate_count: np.ndarray, max_rows: int) -> List[Tuple[int, int]]:
+    """Split rupture ids into (start, stop) ranges with at most `max_rows` rates each (or a single rupture)."""
+    cumulative_count = np.cumsum(rate_count)
+    ranges: List[Tuple[int, int]] = []
+    start, rows = 0, 0
+    while len(cumulative_count) and rows < cumulative_count[-1]:
+        next_rupture = int(np.searchsorted(cumulative_count, rows, side='right'))
+        stop = max(int(np.searchsorted(cumulative_count, rows + max_rows, side='right')), next_rupture + 1)
+        ranges.append((start, stop))
+        start, rows = stop, cumulative_count[stop - 1]
+    return ranges
+
+
+class FaultSystemSolutionBuilder:
+    """Build a FaultSystemSolution from branch solutions sharing a rupture set, one branch at a time.
+
+    Rupture properties, indices, fault sections and average slips are taken from a template solution,
+    by default the first branch solution added.
+    """
+
+    def __init__(
+        self,
+        template: Optional['InversionSolution'] = None,
+        fractiles: Sequence[float] = AGGREGATE_FRACTILES,
+        max_fractile_rows: int = MAX_FRACTILE_ROWS,
+    ):
+        """Instantiate a new builder.
+
+        Args:
+            template: a solution providing the shared rupture set tables.
+            fractiles: the weighted fractiles of branch rates to add to the aggregate rates.
+            max_fractile_rows: the most composite rates rows held in memory to compute fractiles.
+        """
+        self._template = template
+        self._fractiles = tuple(fractiles)
+        self._max_fractile_rows = max_fractile_rows
+        self._aggregates: Dict[str, _RunningRates] = {}
+        self._total_weights: Dict[str, float] = defaultdict(float)
+        self._composite_rates_csv = tempfile.TemporaryFile()
+        self._branch_count = 0
+
+    @property
+    def branch_count(self) -> int:
+        """Get the number of branches added."""
+        return self._branch_count
+
+    def add_branch_solution(self, branch_solution: 'BranchInversionSolution') -> 'FaultSystemSolutionBuilder':
+        """Fold the rupture rates of a branch solution into the aggregates.
+
+        Args:
+            branch_solution: the branch solution to add.
+
+        Returns:
+            the builder instance.
+        """
+        if self._template is None:
+            self._template = branch_solution
+        return self.add_branch_rates(
+            branch_solution.solution_file.rupture_rates,
+            fault_system=str(branch_solution.fault_system),
+            weight=branch_solution.branch.weight,
+            rupture_set_id=str(branch_solution.rupture_set_id),
+            solution_id=FaultSystemSolution.get_branch_inversion_solution_id(branch_solution.branch),
+        )
+
+    def add_branch_rates(
+        self, rupture_rates: pd.DataFrame, fault_system: str, weight: float, rupture_set_id: str, solution_id: str
+    ) -> 'FaultSystemSolutionBuilder':
+        """Fold the rupture rates of one branch into the aggregates.
+
+        Args:
+            rupture_rates: a dataframe with `Rupture Index` and `Annual Rate` columns.
+            fault_system: the fault system code (e.g `CRU`, 'HIK`).
+            weight: the branch weight.
+            rupture_set_id: id of the branch rupture set.
+            solution_id: id of the branch inversion solution.
+
+        Returns:
+            the builder instance.
+        """
+        composite_rates_df = _branch_composite_rates(rupture_rates, fault_system, weight, rupture_set_id, solution_id)
+
+        # append this branch to the spooled composite rates
+        header = self._composite_rates_csv.tell() == 0
+        self._composite_rates_csv.write(composite_rates_df.to_csv(index=False, header=header).encode())
+
+        rupture_ids = composite_rates_df['Rupture Index'].to_numpy(dtype='int64')
+        rates = composite_rates_df['Annual Rate'].to_numpy(dtype='float32')
+        self._aggregates.setdefault(fault_system, _RunningRates()).add(rupture_ids, rates, weight)
+        self._total_weights[fault_system] += weight
+        self._branch_count += 1
+        return self
+
+    def add_branch_archives(
+        self, branch_archives: Iterable[BranchArchive], max_workers: Optional[int] = None
+    ) -> 'FaultSystemSolutionBuilder':
+        """Fold in the rupture rates of branch archives, reading them in a process pool.
+
+        Only the rates table of each archive is read; the rupture set tables are loaded once, from
+        the template (by default the first archive). Rates are folded in the order given.
+
+        Args:
+            branch_archives: the branch archives to add.
+            max_workers: the maximum number of worker processes (default: the number of CPUs).
+                With `max_workers=1` the archives are read in this process.
+
+        Returns:
+            the builder instance.
+        """
+        branch_archives = list(branch_archives)
+        if not branch_archives:
+            return self
+        if self._template is None:
+            self._template = InversionSolution.from_archive(branch_archives[0].archive_path)
+
+        tic = time.perf_counter()
+        archive_paths = [str(branch_archive.archive_path) for branch_archive in branch_archives]
+        if max_workers == 1:
+            all_rates: Iterable[pd.DataFrame] = map(_read_rupture_rates, archive_paths)
+            self._add_branch_archive_rates(branch_archives, all_rates)
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                self._add_branch_archive_rates(branch_archives, executor.map(_read_rupture_rates, archive_paths))
+        toc = time.perf_counter()
+        log.debug('add_branch_archives() %s branches in %2.3f seconds' % (len(branch_archives), toc - tic))
+        return self
+
+    def _add_branch_archive_rates(self, branch_archives: Iterable[BranchArchive], all_rates: Iterable[pd.DataFrame]):
+        for branch_archive, rupture_rates in zip(branch_archives, all_rates):
+            self.add_branch_rates(
+                rupture_rates,
+                fault_system=branch_archive.fault_system,
+                weight=branch_archive.branch.weight,
+                rupture_set_id=branch_archive.rupture_set_id,
+                solution_id=FaultSystemSolution.get_branch_inversion_solution_id(branch_archive.branch),
+            )
+
+    @property
+    def aggregate_rates(self) -> pd.DataFrame:
+        """Get the aggregate rates of the branches added so far.
+
+        The weighted fractiles are computed from the spooled composite rates, which are read back
+        for this, once, and bucketed by range of ruptures (see `max_fractile_rows`).
+
+        Returns:
+            a `pandas.DataFrame` with columns: <br/>
+                fault_system,
+                Rupture Index,
+                rate_count,
+                rate_max,
+                rate_min,
+                rate_weighted_mean,
+                and one column per fractile (e.g. rate_p10, rate_p50, rate_p90)
+        """
+        aggregate_rates = pd.concat(
+            [self._aggregates[fault_system].to_dataframe(fault_system) for fault_system in sorted(self._aggregates)],
+            ignore_index=True,
+        )
+        rupture_ranges = [
+            (fault_system, start, stop)
+            for fault_system in sorted(self._aggregates)
+            for start, stop in _rupture_ranges(self._aggregates[fault_system].rate_count, self._max_fractile_rows)
+        ]
+        if not self._fractiles or not rupture_ranges:
+            return aggregate_rates
+        return aggregate_rates.merge(self._fractile_rates(rupture_ranges), on=AGGREGATE_KEY, how='left')
+
+    def _fractile_rates(self, rupture_ranges: List[Tuple[str, int, int]]) -> pd.DataFrame:
+        """Get the rate fractiles of the spooled composite rates, bucketed by rupture range in one pass."""
+        first_buckets: Dict[str, int] = {}
+        range_starts: Dict[str, List[int]] = defaultdict(list)
+        for bucket, (fault_system, start, _) in enumerate(rupture_ranges):
+            first_buckets.setdefault(fault_system, bucket)
+            range_starts[fault_system].append(start)
+        segments: List[List[Tuple[int, int]]] = [[] for _ in rupture_ranges]
+
+        with tempfile.TemporaryFile() as buckets:
+            # write the rows of each spool chunk sorted by bucket, noting the (offset, count) of each bucket segment
+            for chunk in self._spooled_rate_chunks():
+                for key, rows in chunk.groupby('fault_system', sort=False):
+                    rupture_ids = rows['Rupture Index'].to_numpy()
+                    row_buckets = np.searchsorted(range_starts[str(key)], rupture_ids, side='right') - 1
+                    row_buckets += first_buckets[str(key)]
+                    order = np.argsort(row_buckets, kind='stable')
+                    records = np.empty(len(rows), dtype=_FRACTILE_RECORD)
+                    for column in _FRACTILE_RECORD.names or ():
+                        records[column] = rows[column].to_numpy()[order]
+                    offset = buckets.tell()
+                    buckets.write(records.tobytes())
+                    counts = np.bincount(row_buckets, minlength=len(rupture_ranges))
+                    ends = np.cumsum(counts)
+                    for index in np.flatnonzero(counts):
+                        segment_start = offset + int(ends[index] - counts[index]) * _FRACTILE_RECORD.itemsize
+                        segments[index].append((segment_start, int(counts[index])))
+
+            frames = []
+            for (fault_system, _, _), bucket_segments in zip(rupture_ranges, segments):
+                parts = []
+                for segment_start, count in bucket_segments:
+                    buckets.seek(segment_start)
+                    parts.append(np.frombuffer(buckets.read(count * _FRACTILE_RECORD.itemsize), _FRACTILE_RECORD))
+                records = np.concatenate(parts)
+                rates = pd.DataFrame({column: records[column] for column in _FRACTILE_RECORD.names or ()})
+                rates.insert(0, 'fault_system', fault_system)
+                frames.append(rupture_rate_fractiles(rates, self._total_weights, self._fractiles))
+        return pd.concat(frames, ignore_index=True)
+
+    def _spooled_rate_chunks(self) -> Iterator[pd.DataFrame]:
+        """Read back the spooled composite rates in chunks (just the columns needed for fractiles)."""
+        spool = self._composite_rates_csv
+        spool.seek(0)
+        try:
+            yield from pd.read_csv(
+                spool,
+                usecols=['fault_system', 'weight', 'Rupture Index', 'Annual Rate'],
+                dtype={'fault_system': str, 'weight': 'float64', 'Rupture Index': 'int64', 'Annual Rate': 'float32'},
+                chunksize=SPOOL_CHUNK_ROWS,
+            )
+        finally:
+            spool.seek(0, io.SEEK_END)
+
+    def build(self, archive_path: Optional[Union[Path, str]] = None) -> FaultSystemSolution:
+        """Build the FaultSystemSolution.
+
+        The composite rates are streamed from the spool into the new archive, and are
+        loaded from it on demand.
+
+        Args:
+            archive_path: an optional path to write the archive to (default: an in-memory buffer).
+
+        Returns:
+            the new FaultSystemSolution.
+        """
+        if self._template is None or not self._branch_count:
+            raise ValueError("at least one branch must be added before building a FaultSystemSolution")
+
+        tic = time.perf_counter()
+        template = self._template.solution_file
+        fss_file = FaultSystemSolutionFile()
+        fss_file.set_props(
+            None,
+            self.aggregate_rates,
+            template.ruptures,
+            template.indices,
+            template.fault_sections,
+            template.fault_regime,
+            template.average_slips,
+        )
+        fss_file._composite_rates_csv = self._composite_rates_csv
+        fss_file._archive_path = template.archive_path
+
+        new_fss = FaultSystemSolution(fss_file)
+        if archive_path is None:
+            new_fss.to_archive(io.BytesIO(), template.archive_path)
+        else:
+            new_fss.to_archive(archive_path, template.archive_path)
+            fss_file._archive = None  # read from the new archive, not the cached template archive
+        fss_file._composite_rates_csv = None
+        self._composite_rates_csv.close()
+
+        toc = time.perf_counter()
+        log.debug('build() %s branches in %2.3f seconds' % (self._branch_count, toc - tic))
+        return new_fss
+
+
+def _rate_deltas(composite_rates: pd.DataFrame, weight_delta: np.ndarray, count_delta: int, extremes: bool):
+    """Get the per-rupture aggregate changes contributed by some composite rates rows."""
+    rates = composite_rates['Annual Rate'].to_numpy(dtype='float64', na_value=np.nan)
+    return pd.DataFrame(
+        {
+            'fault_system': composite_rates['fault_system'].astype(str).to_numpy(),
+            'Rupture Index': composite_rates['Rupture Index'].to_numpy(dtype='int64'),
+            'weighted_sum': rates * weight_delta,
+            'count': count_delta,
+            'removed': count_delta < 0,
+            'rate': rates if extremes else np.nan,
+        }
+    )
+
+
+def _branch_total_weights(branches: pd.DataFrame) -> Dict[str, float]:
+    """Get the total weight of the branches, by fault system."""
+    total_weights = branches.groupby(branches['fault_system'].astype(str))['weight'].sum()
+    return {str(key): float(weight) for key, weight in total_weights.items()}
+
+
+def update_branches(
+    solution: FaultSystemSolution,
+    add: Iterable['BranchInversionSolution'] = (),
+    remove: Iterable[str] = (),
+    weights: Optional[Mapping[str, float]] = None,
+    fractiles: Sequence[float] = AGGREGATE_FRACTILES,
+) -> FaultSystemSolution:
+    """Add, remove or reweight the branches of a FaultSystemSolution.
+
+    The aggregate rates are updated from the changed branches alone: counts and weighted means are
+    adjusted by the branch deltas, and `rate_min`/`rate_max` are only recomputed for the ruptures of
+    removed branches (even where an added branch replaces the removed rate). Fractiles are recomputed for
+    the ruptures of changed branches, and for every rupture of a fault system whose total branch weight
+    changes (as branches without a rate count as rate zero). The composite rates are shared with `solution`
+    unless branches are removed or reweighted, and the new solution shares its rupture set tables and
+    archive, so nothing is written until `to_archive()` is called.
+
+    Args:
+        solution: the solution to update.
+        add: new branch solutions to add.
+        remove: the solution ids of branches to remove.
+        weights: new weights, by branch solution id.
+        fractiles: the weighted fractiles of branch rates to add to the aggregate rates. Fractiles that
+            `solution` does not have are computed for all ruptures.
+
+    Returns:
+        a new FaultSystemSolution.
+
+    Raises:
+        ValueError: if a removed or reweighted branch is not in the solution, or an added branch already is
+            (or is added twice).
+    """
+    tic = time.perf_counter()
+    solution_file = solution.solution_file
+    composite_rates = solution_file._load_composite_rates()
+    aggregate_rates = solution_file._load_aggregate_rates()
+    remove = set(remove)
+    weights = dict(weights or {})
+
+    # the branches with rates, and their weights
+    branches = composite_rates[['fault_system', 'solution_id', 'weight']].drop_duplicates(
+        ['fault_system', 'solution_id']
+    )
+    solution_ids = set(branches['solution_id'])
+    unknown = (remove | set(weights)) - solution_ids
+    if unknown:
+        raise ValueError(f"branch solutions not in the solution: {sorted(unknown)}")
+
+    add = list(add)
+    added_ids = [
+        FaultSystemSolution.get_branch_inversion_solution_id(branch_solution.branch) for branch_solution in add
+    ]
+    duplicated = {sid for sid, count in Counter(added_ids).items() if count > 1}
+    duplicated |= set(added_ids) & (solution_ids - remove)
+    if duplicated:
+        raise ValueError(f"branch solutions already in the solution: {sorted(duplicated)}")
+    added = [
+        _branch_composite_rates(
+            branch_solution.solution_file.rupture_rates,
+            fault_system=str(branch_solution.fault_system),
+            weight=branch_solution.branch.weight,
+            rupture_set_id=str(branch_solution.rupture_set_id),
+            solution_id=sid,
+        )
+        for branch_solution, sid in zip(add, added_ids)
+    ]
+
+    removed = composite_rates['solution_id'].isin(remove).to_numpy()
+    reweighted = composite_rates['solution_id'].isin(weights).to_numpy() & ~removed
+    old_weights = composite_rates['weight'].to_numpy(dtype='float64')
+    new_weights = np.where(
+        reweighted, composite_rates['solution_id'].map(weights).to_numpy(dtype='float64'), old_weights
+    )
+
+    deltas = pd.concat(
+        [
+            _rate_deltas(composite_rates[removed], -old_weights[removed], -1, extremes=False),
+            _rate_deltas(composite_rates[reweighted], (new_weights - old_weights)[reweighted], 0, extremes=False),
+        ]
+        + [_rate_deltas(df, df['weight'].to_numpy(dtype='float64'), 1, extremes=True) for df in added],
+        ignore_index=True,
+    )
+    deltas = deltas.groupby(AGGREGATE_KEY).agg(
+        weighted_sum=('weighted_sum', 'sum'),
+        count=('count', 'sum'),
+        removed=('removed', 'any'),
+        delta_min=('rate', 'min'),
+        delta_max=('rate', 'max'),
+    )
+
+    # the new composite rates: less removed branches, reweighted, plus added branches
+    if removed.any():
+        composite_rates = composite_rates[~removed]
+    if reweighted.any():
+        composite_rates = composite_rates.assign(
+            weight=pd.Series(new_weights[~removed], index=composite_rates.index, dtype=composite_rates['weight'].dtype)
+        )
+    if added:
+        composite_rates = pd.concat([composite_rates] + added, ignore_index=True)
+        if isinstance(solution_file.composite_rates['fault_system'].dtype, pd.CategoricalDtype):
+            composite_rates['fault_system'] = composite_rates['fault_system'].astype('category')
+
+    # apply the deltas to the aggregate rates
+    aggregates = aggregate_rates.astype({'fault_system': str, 'Rupture Index': 'int64'}).set_index(AGGREGATE_KEY)
+    aggregates = aggregates.join(deltas, how='outer')
+    rate_count = aggregates['rate_count'].fillna(0).astype('int64') + aggregates['count'].fillna(0).astype('int64')
+    weighted_sum = aggregates['rate_weighted_mean'].astype('float64').fillna(0) + aggregates['weighted_sum'].fillna(0)
+    old_min, old_max = aggregates['rate_min'].to_numpy('float64', na_value=np.nan), aggregates['rate_max'].to_numpy(
+        'float64', na_value=np.nan
+    )
+    rate_min = pd.Series(np.fmin(old_min, aggregates['delta_min'].to_numpy('float64')), index=aggregates.index)
+    rate_max = pd.Series(np.fmax(old_max, aggregates['delta_max'].to_numpy('float64')), index=aggregates.index)
+
+    composite_keys = pd.MultiIndex.from_arrays(
+        [composite_rates['fault_system'].astype(str), composite_rates['Rupture Index'].astype('int64')],
+        names=AGGREGATE_KEY,
+    )
+
+    # only the ruptures of removed branches need their extremes recomputed
+    removed_keys = deltas.index[deltas['removed']]
+    if len(removed_keys):
+        remaining_rates = pd.Series(composite_rates['Annual Rate'].to_numpy(dtype='float64'), index=composite_keys)
+        remaining_rates = remaining_rates[composite_keys.isin(removed_keys)]
+        extremes = remaining_rates.groupby(level=AGGREGATE_KEY).agg(['min', 'max'])
+        rate_min.loc[extremes.index] = extremes['min']
+        rate_max.loc[extremes.index] = extremes['max']
+
+    keep = (rate_count > 0).to_numpy()
+    aggregate_rates = pd.DataFrame(
+        {
+            'fault_system': aggregates.index.get_level_values('fault_system')[keep],
+            'Rupture Index': pd.Series(aggregates.index.get_level_values('Rupture Index')[keep], dtype='UInt32'),
+            'rate_count': pd.Series(rate_count[keep].to_numpy(), dtype='Int64'),
+            'rate_max': pd.Series(rate_max[keep].to_numpy(), dtype='Float32'),
+            'rate_min': pd.Series(rate_min[keep].to_numpy(), dtype='Float32'),
+            'rate_weighted_mean': weighted_sum[keep].to_numpy().astype('float32'),
+        }
+    )
+
+    if fractiles:
+        # the branch total weights are those of the branches with rates
+        old_total_weights = _branch_total_weights(branches)
+        branches = branches[~branches['solution_id'].isin(remove)]
+        branches = branches.assign(weight=branches['solution_id'].map(weights).fillna(branches['weight']))
+        branches = pd.concat([branches] + [df[['fault_system', 'solution_id', 'weight']].head(1) for df in added])
+        total_weights = _branch_total_weights(branches)
+
+        columns = [fractile_column(fractile) for fractile in fractiles]
+        if all(column in aggregates.columns for column in columns):
+            # recompute the ruptures of changed branches, and all ruptures of fault systems with a new total weight
+            changed = [
+                key for key in total_weights if not np.isclose(total_weights[key], old_total_weights.get(key, 0.0))
+            ]
+            changed_fault_system = composite_keys.get_level_values('fault_system').isin(changed)
+            recompute = composite_keys.isin(deltas.index) | changed_fault_system
+            fractile_values = aggregates[columns].astype('Float32')
+        else:
+            recompute = np.ones(len(composite_rates), dtype=bool)
+            fractile_values = pd.DataFrame(np.nan, index=aggregates.index, columns=columns, dtype='Float32')
+        if recompute.any():
+            fractile_rates = rupture_rate_fractiles(composite_rates[recompute], total_weights, fractiles)
+            fractile_rates = fractile_rates.astype({'Rupture Index': 'int64'}).set_index(AGGREGATE_KEY)
+            fractile_values.loc[fractile_rates.index, columns] = fractile_rates[columns]
+        for column in columns:
+            aggregate_rates[column] = pd.Series(fractile_values[column].to_numpy()[keep], dtype='Float32')
+
+    fss_file = FaultSystemSolutionFile()
+    fss_file.set_props(
+        composite_rates,
+        aggregate_rates,
+        solution_file.ruptures,
+        solution_file.indices,
+        solution_file.fault_sections,
+        solution_file.fault_regime,
+        solution_file.average_slips,
+    )
+    # share the archive of the original solution, it has the same rupture set
+    fss_file._archive = solution_file._archive
+    fss_file._archive_path = solution_file._archive_path
+    fss_file._rupture_set_key = solution_file.rupture_set_key
+    fss_file._fast_indices = solution_file._fast_indices
+
+    toc = time.perf_counter()
+    log.debug(
+        'update_branches() added %s, removed %s, reweighted %s branches in %2.3f seconds'
+        % (len(added), len(remove), len(weights), toc - tic)
+    )
+    return FaultSystemSolution(fss_file)
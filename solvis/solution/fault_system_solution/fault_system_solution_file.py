@@ -5,18 +5,20 @@ See notes about FaultSystemSolution and OpenSHA InversionSolution archive format
 """
 
 import logging
-import zipfile
 from functools import cache
-from typing import TYPE_CHECKING, Optional, cast
+from typing import TYPE_CHECKING, BinaryIO, Dict, Iterable, List, Optional, cast
 
-import geopandas as gpd
 import pandas as pd
 
 from solvis.dochelper import inherit_docstrings
 
-from ..inversion_solution import InversionSolutionFile, data_to_zip_direct
+from ..inversion_solution import InversionSolutionFile, dataframe_csv_chunks, file_chunks
+from ..inversion_solution.inversion_solution_file import ArchiveMember
+from .rate_fractiles import AGGREGATE_FRACTILES, fractile_column
 
 if TYPE_CHECKING:
+    import geopandas as gpd
+    import numpy as np
     from pandera.typing import DataFrame
 
     from ..dataframe_models import RuptureRateSchema
@@ -45,6 +47,9 @@ class FaultSystemSolutionFile(InversionSolutionFile):
     _composite_rates: Optional[pd.DataFrame] = None
     _aggregate_rates: Optional[pd.DataFrame] = None
     _fast_indices: Optional[pd.DataFrame] = None
+    _composite_rates_csv: Optional[BinaryIO] = None  # composite rates spooled by FaultSystemSolutionBuilder
+    _composite_rates_indexed: Optional[pd.DataFrame] = None
+    _aggregate_rates_indexed: Optional[pd.DataFrame] = None
 
     COMPOSITE_RATES_PATH = 'composite_rates.csv'
     AGGREGATE_RATES_PATH = 'aggregate_rates.csv'
@@ -94,69 +99,109 @@ class FaultSystemSolutionFile(InversionSolutionFile):
         """
         self._composite_rates = composite_rates
         self._aggregate_rates = aggregate_rates
+        self._composite_rates_indexed = None
+        self._aggregate_rates_indexed = None
 
         # Now we need a rates table, structured correctly, with weights from the aggregate_rates
-        rates = aggregate_rates.drop(columns=['rate_max', 'rate_min', 'rate_count', 'fault_system']).rename(
+        rates = aggregate_rates[['Rupture Index', 'rate_weighted_mean']].rename(
             columns={"rate_weighted_mean": "Annual Rate"}
         )
         super().set_props(rates, ruptures, indices, fault_sections, average_slips)
 
-    def _write_dataframes(self, zip_archive: zipfile.ZipFile, reindex: bool = False):
+    def _dataframe_members(self, reindex: bool = False) -> List[ArchiveMember]:
         """
-        Writes the dataframes to a zip archive.
+        Get the dataframes to write to a zip archive, as (name, CSV chunks) pairs.
 
         Args:
             self (FaultSystemSolutionFile): The instance to write dataframes for.
-            zip_archive (zipfile.ZipFile): The zip archive to write to.
             reindex (bool): Whether to reindex the dataframes before writing. Defaults to False.
 
         Returns:
-            None
+            list: the archive members.
         """
-        data_to_zip_direct(zip_archive, self.composite_rates.to_csv(index=reindex), self.COMPOSITE_RATES_PATH)
-        data_to_zip_direct(zip_archive, self.aggregate_rates.to_csv(index=reindex), self.AGGREGATE_RATES_PATH)
+        members: List[ArchiveMember] = []
+        if self._composite_rates is None and self._composite_rates_csv is not None:
+            members.append((self.COMPOSITE_RATES_PATH, file_chunks(self._composite_rates_csv)))
+        else:
+            members.append((self.COMPOSITE_RATES_PATH, dataframe_csv_chunks(self.composite_rates, index=reindex)))
+        members.append((self.AGGREGATE_RATES_PATH, dataframe_csv_chunks(self.aggregate_rates, index=reindex)))
         if self._fast_indices is not None:
-            data_to_zip_direct(zip_archive, self._fast_indices.to_csv(index=reindex), self.FAST_INDICES_PATH)
+            members.append((self.FAST_INDICES_PATH, dataframe_csv_chunks(self._fast_indices, index=reindex)))
 
-        super()._write_dataframes(zip_archive, reindex)
+        return members + super()._dataframe_members(reindex)
 
-    def to_archive(self, archive_path, base_archive_path, compat=False):
+    def to_archive(self, archive_path, base_archive_path, compat=False, compresslevel=None):
         """Writes the current solution to a new zip archive, cloning data from a base archive."""
         log.debug("%s to_archive %s" % (type(self), archive_path))
-        super().to_archive(archive_path, base_archive_path, compat=False)
+        super().to_archive(archive_path, base_archive_path, compat=False, compresslevel=compresslevel)
+
+    def _load_composite_rates(self) -> pd.DataFrame:
+        if self._composite_rates is None:
+            dtypes = {}
+            dtypes["Rupture Index"] = 'UInt32'  # pd.UInt32Dtype()
+            dtypes["fault_system"] = 'category'  # pd.CategoricalDtype()
+            dtypes["Annual Rate"] = 'Float32'  # pd.Float32Dtype()
+            self._composite_rates = self._dataframe_from_csv(self.COMPOSITE_RATES_PATH, dtypes)
+        return self._composite_rates
+
+    def _load_aggregate_rates(self) -> pd.DataFrame:
+        if self._aggregate_rates is None:
+            dtypes = {}
+            dtypes["Rupture Index"] = 'UInt32'  # pd.UInt32Dtype()
+            dtypes["fault_system"] = 'category'  # pd.CategoricalDtype()
+            dtypes["Annual Rate"] = 'Float32'  # pd.Float32Dtype()
+            for fractile in AGGREGATE_FRACTILES:
+                dtypes[fractile_column(fractile)] = 'Float32'
+            self._aggregate_rates = self._dataframe_from_csv(self.AGGREGATE_RATES_PATH, dtypes)
+        return self._aggregate_rates
 
     @property
     def composite_rates(self) -> pd.DataFrame:
         """
         Returns the composite rates dataframe.
 
+        The dataframe is indexed on `solution_id` and `Rupture Index`. It is built once and cached, so it
+        must not be modified.
+
         Returns:
             pd.DataFrame: The composite rates dataframe.
         """
-        if self._composite_rates is None:
-            dtypes = {}
-            dtypes["Rupture Index"] = 'UInt32'  # pd.UInt32Dtype()
-            dtypes["fault_system"] = 'category'  # pd.CategoricalDtype()
-            self._composite_rates = self._dataframe_from_csv(self.COMPOSITE_RATES_PATH, dtypes)
-        df0 = self._composite_rates.set_index(["solution_id", "Rupture Index"], drop=False)
-        return df0
+        if self._composite_rates_indexed is None:
+            composite_rates = self._load_composite_rates()
+            self._composite_rates_indexed = composite_rates.set_index(["solution_id", "Rupture Index"], drop=False)
+        return self._composite_rates_indexed
 
     @property
-    def aggregate_rates(self) -> gpd.GeoDataFrame:
+    def aggregate_rates(self) -> 'gpd.GeoDataFrame':
         """
         Returns the aggregate rates GeoDataFrame.
 
+        The dataframe is indexed on `fault_system` and `Rupture Index`. It is built once and cached, so it
+        must not be modified.
+
         Returns:
             gpd.GeoDataFrame: The aggregate rates GeoDataFrame.
         """
-        if self._aggregate_rates is None:
-            dtypes = {}
-            dtypes["Rupture Index"] = 'UInt32'  # pd.UInt32Dtype()
-            dtypes["fault_system"] = 'category'  # pd.CategoricalDtype()
-            dtypes["Annual Rate"] = 'Float32'  # pd.Float32Dtype()
-            self._aggregate_rates = self._dataframe_from_csv(self.AGGREGATE_RATES_PATH, dtypes)
-        df0 = self._aggregate_rates.set_index(["fault_system", "Rupture Index"], drop=False)
-        return df0
+        if self._aggregate_rates_indexed is None:
+            aggregate_rates = self._load_aggregate_rates()
+            self._aggregate_rates_indexed = aggregate_rates.set_index(["fault_system", "Rupture Index"], drop=False)
+        return self._aggregate_rates_indexed
+
+    def rate_columns(self, columns: Optional[Iterable[str]] = None, composite: bool = False) -> Dict[str, 'np.ndarray']:
+        """
+        Get columns of the aggregate (or composite) rates as numpy arrays, without building an index.
+
+        Missing values of nullable float columns are returned as `nan`.
+
+        Args:
+            columns: the column names (default: all columns).
+            composite: if True, get columns of the composite rates, rather than the aggregate rates.
+
+        Returns:
+            a dictionary of arrays, by column name.
+        """
+        table = self._load_composite_rates() if composite else self._load_aggregate_rates()
+        return {column: table[column].to_numpy() for column in (columns or table.columns)}
 
     @property
     def rupture_rates(self) -> 'DataFrame[RuptureRateSchema]':
@@ -174,7 +219,7 @@ class FaultSystemSolutionFile(InversionSolutionFile):
 
     @property
     @cache
-    def fast_indices(self) -> gpd.GeoDataFrame:
+    def fast_indices(self) -> 'gpd.GeoDataFrame':
         """
         Retrieves the fast indices as a GeoDataFrame.
 
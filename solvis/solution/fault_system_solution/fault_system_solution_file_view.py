@@ -0,0 +1,65 @@
+"""
+A filtered view of a FaultSystemSolutionFile.
+
+As for the [`InversionSolutionFileView`][solvis.solution.inversion_solution.inversion_solution_file_view],
+the composite and aggregate rates and the fast indices are filtered from the parent on first access.
+
+Classes:
+    FaultSystemSolutionFileView: a FaultSystemSolutionFile showing only some ruptures of a parent.
+"""
+
+from typing import TYPE_CHECKING, Iterable, cast
+
+import pandas as pd
+
+from solvis.dochelper import inherit_docstrings
+
+from ..inversion_solution.inversion_solution_file_view import InversionSolutionFileView
+from .fault_system_solution_file import FaultSystemSolutionFile
+
+if TYPE_CHECKING:
+    import geopandas as gpd
+    from pandera.typing import DataFrame
+
+    from ..dataframe_models import RuptureRateSchema
+
+
+@inherit_docstrings
+class FaultSystemSolutionFileView(InversionSolutionFileView, FaultSystemSolutionFile):
+    """A FaultSystemSolutionFile showing only some ruptures of a parent solution file."""
+
+    _parent: FaultSystemSolutionFile
+
+    SKIPPED_MEMBERS = FaultSystemSolutionFile.OPENSHA_ONLY  # drop bulky, opensha-only artefacts
+
+    def __init__(self, parent: FaultSystemSolutionFile, rupture_ids: Iterable[int]) -> None:
+        """Instantiate a new view.
+
+        Args:
+            parent: the solution file to filter.
+            rupture_ids: the ids of the ruptures to keep.
+        """
+        super().__init__(parent, rupture_ids)
+
+    def _load_composite_rates(self) -> pd.DataFrame:
+        if self._composite_rates is None:
+            self._composite_rates = self._filter(self._parent._load_composite_rates())
+        return self._composite_rates
+
+    def _load_aggregate_rates(self) -> pd.DataFrame:
+        if self._aggregate_rates is None:
+            self._aggregate_rates = self._filter(self._parent._load_aggregate_rates())
+        return self._aggregate_rates
+
+    @property
+    def rupture_rates(self) -> 'DataFrame[RuptureRateSchema]':
+        return cast('DataFrame[RuptureRateSchema]', self.aggregate_rates)
+
+    @property
+    def fast_indices(self) -> 'gpd.GeoDataFrame':
+        if self._fast_indices is None:
+            parent_fast_indices = self._parent._fast_indices
+            if parent_fast_indices is None:
+                parent_fast_indices = self._parent.fast_indices
+            self._fast_indices = self._filter(parent_fast_indices, 'rupture')
+        return self._fast_indices
@@ -8,9 +8,6 @@ from the raw dataframes available via the `InversionSolutionFile` class.
 import logging
 from typing import TYPE_CHECKING, Optional, cast
 
-from pandera.typing import DataFrame
-
-from ..dataframe_models import RuptureSectionSchema
 from ..inversion_solution import InversionSolutionModel
 from .fault_system_solution_file import FaultSystemSolutionFile
 
@@ -21,6 +18,7 @@ log = logging.getLogger(__name__)
 if TYPE_CHECKING:
     # from numpy.typing import NDArray
     import pandas as pd
+    from pandera.typing import DataFrame
 
     from solvis.solution import dataframe_models
 
@@ -42,7 +40,7 @@ class FaultSystemSolutionModel(InversionSolutionModel):
         return self._solution_file.aggregate_rates
 
     @property
-    def rupture_sections(self) -> 'DataFrame[RuptureSectionSchema]':
+    def rupture_sections(self) -> 'DataFrame[dataframe_models.RuptureSectionSchema]':
         if self._fast_indices is None:
             try:
                 self._fast_indices = self._solution_file.fast_indices
@@ -0,0 +1,126 @@
+"""
+Weighted fractiles of rupture rates across logic tree branches.
+
+Each rupture's rate is treated as a discrete distribution over the branches of its fault system, with the
+branch weights as probabilities. Branches where the rupture has no rate (and so no `composite_rates` row)
+contribute their weight at rate zero, as they do to `rate_weighted_mean`. `rate_min` and `rate_max` are over the
+branches with a rate only, so a fractile is either zero or between `rate_min` and `rate_max`.
+
+The fractiles of all ruptures are computed together: the rates are sorted within rupture groups, and each
+fractile is found with one `numpy.searchsorted` over the cumulative weights.
+
+Functions:
+    fractile_column: the aggregate rates column name of a fractile.
+    weighted_fractiles: weighted fractiles of grouped values.
+    rupture_rate_fractiles: weighted fractiles of each rupture's rate across branches.
+
+Attributes:
+    AGGREGATE_FRACTILES: the fractiles stored in `aggregate_rates` by default.
+"""
+
+from typing import Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+
+AGGREGATE_FRACTILES = (0.1, 0.5, 0.9)
+
+
+def fractile_column(fractile: float) -> str:
+    """Get the aggregate rates column name of a fractile.
+
+    Examples:
+        ```py
+        >>> fractile_column(0.1)
+        'rate_p10'
+        ```
+    """
+    return f"rate_p{fractile * 100:g}"
+
+
+def weighted_fractiles(
+    groups: np.ndarray,
+    values: np.ndarray,
+    weights: np.ndarray,
+    total_weights: np.ndarray,
+    fractiles: Sequence[float],
+) -> np.ndarray:
+    """Get weighted fractiles of grouped values.
+
+    The fractile `q` of a group is the smallest value at which the cumulative weight reaches `q` times
+    the group's total weight (i.e. the inverse of the weighted empirical CDF). Any weight missing from a
+    group (`total_weights` less the sum of its `weights`) is taken to be at value zero.
+
+    Args:
+        groups: the group code (0 to n_groups - 1) of each value.
+        values: the values, all positive.
+        weights: the weight of each value.
+        total_weights: the total weight of each group.
+        fractiles: the fractiles to compute, each in [0, 1].
+
+    Returns:
+        an array of shape (n_groups, n_fractiles).
+    """
+    total_weights = np.asarray(total_weights, dtype='float64')
+    result = np.zeros((len(total_weights), len(fractiles)), dtype='float64')
+    if not len(values):
+        return result
+
+    order = np.lexsort((values, groups))
+    groups, values = groups[order], values[order]
+    cumulative_weights = np.cumsum(weights[order], dtype='float64')
+
+    counts = np.bincount(groups, minlength=len(total_weights))
+    group_end = np.cumsum(counts)
+    group_start = group_end - counts
+    weight_before = np.concatenate([[0.0], cumulative_weights])[group_start]
+    zero_weight = total_weights - (np.concatenate([[0.0], cumulative_weights])[group_end] - weight_before)
+
+    tolerance = 1e-9 * total_weights  # absorbs rounding in the cumulative sum
+    for column, fractile in enumerate(fractiles):
+        target = fractile * total_weights - zero_weight
+        position = np.searchsorted(cumulative_weights, weight_before + target - tolerance, side='left')
+        position = np.clip(position, group_start, np.maximum(group_end - 1, group_start))
+        position = np.minimum(position, len(values) - 1)
+        at_zero = ((target <= tolerance) & (zero_weight > tolerance)) | (counts == 0)
+        result[:, column] = np.where(at_zero, 0.0, values[position])
+    return result
+
+
+def rupture_rate_fractiles(
+    composite_rates: pd.DataFrame,
+    total_weights: Mapping[str, float],
+    fractiles: Sequence[float] = AGGREGATE_FRACTILES,
+) -> pd.DataFrame:
+    """Get weighted fractiles of each rupture's rate across the branches of its fault system.
+
+    Args:
+        composite_rates: a dataframe with `fault_system`, `Rupture Index`, `weight` and `Annual Rate` columns.
+        total_weights: the total branch weight, by fault system.
+        fractiles: the fractiles to compute.
+
+    Returns:
+        a dataframe with columns `fault_system`, `Rupture Index` and one `Float32` column per fractile
+            (see `fractile_column`), sorted by fault system and rupture.
+    """
+    keys = pd.DataFrame(
+        {
+            'fault_system': composite_rates['fault_system'].astype(str).to_numpy(),
+            'Rupture Index': composite_rates['Rupture Index'].to_numpy(dtype='int64'),
+        }
+    )
+    codes, uniques = pd.factorize(pd.MultiIndex.from_frame(keys), sort=True)
+    unique_keys = uniques.to_frame(index=False, name=list(keys.columns))
+    group_totals = unique_keys['fault_system'].map(total_weights).to_numpy(dtype='float64')
+
+    values = weighted_fractiles(
+        codes,
+        composite_rates['Annual Rate'].to_numpy(dtype='float64', na_value=0.0),
+        composite_rates['weight'].to_numpy(dtype='float64'),
+        group_totals,
+        fractiles,
+    )
+    unique_keys['Rupture Index'] = unique_keys['Rupture Index'].astype('UInt32')
+    for column, fractile in enumerate(fractiles):
+        unique_keys[fractile_column(fractile)] = pd.Series(values[:, column], dtype='Float32')
+    return unique_keys
@@ -5,9 +5,24 @@ These are the zip archives produced as the output of an OpenSHA grand inversion.
 Modules:
  inversion_solution: defines the InversionSolution and BranchInversionSolution classes.
  inversion_solution_file: defines a mixin class that manages all IO for an InversionSolution archive.
+ inversion_solution_file_view: defines a filtered view of an InversionSolutionFile.
  inversion_solution_model: defines a mixin class providing anaysis of InversionSolutions.
+ rupture_id_map: maps rupture ids to the row positions of rupture tables.
+ rupture_section_view: a lazy view of the rupture sections with their rupture rates.
+ rupture_set_registry: a process-wide registry sharing rupture set tables between solutions.
 """
 
 from .inversion_solution import BranchInversionSolution, InversionSolution
-from .inversion_solution_file import InversionSolutionFile, data_to_zip_direct
+from .inversion_solution_file import (
+    InversionSolutionFile,
+    data_to_zip_direct,
+    dataframe_csv_chunks,
+    file_chunks,
+    file_to_zip_direct,
+    members_to_zip,
+)
+from .inversion_solution_file_view import InversionSolutionFileView
 from .inversion_solution_model import InversionSolutionModel
+from .rupture_id_map import RuptureIdMap
+from .rupture_section_view import RuptureSectionView
+from .rupture_set_registry import RuptureSetRegistry, rupture_set_registry
@@ -20,15 +20,19 @@ import io
 import logging
 import zipfile
 from pathlib import Path
-from typing import Iterable, Optional, Union
+from typing import TYPE_CHECKING, Iterable, Optional, Union
 
-import geopandas as gpd
+import numpy as np
+import pandas as pd
 
-from ..solution_surfaces_builder import SolutionSurfacesBuilder
 from ..typing import ModelLogicTreeBranch
 from .inversion_solution_file import InversionSolutionFile
+from .inversion_solution_file_view import InversionSolutionFileView
 from .inversion_solution_model import InversionSolutionModel
 
+if TYPE_CHECKING:
+    import geopandas as gpd
+
 log = logging.getLogger(__name__)
 
 
@@ -45,6 +49,8 @@ class InversionSolution:
      from_archive: deserialise an instance from zip archive.
      to_archive: serialise an instance to a zip archive.
      filter_solution: get a new InversionSolution instance, filtered by rupture ids.
+     scale_rupture_rates: get a new InversionSolution instance, with scaled rupture rates.
+     stacked_rupture_rates: get the rupture rates under each of a sequence of scaling factors.
      rupture_surface: get a geopandas dataframe representing a rutpure surface.
      fault_surfaces: get a geopandas dataframe representing the fault surfaces.
     """
@@ -82,7 +88,7 @@ class InversionSolution:
         """Get the fault regime label."""
         return self._solution_file.fault_regime
 
-    def to_archive(self, archive_path, base_archive_path=None, compat=False):
+    def to_archive(self, archive_path, base_archive_path=None, compat=False, compresslevel=None):
         """Write the current solution to a new zip archive.
 
         Optionally cloning data from a base archive.
@@ -95,18 +101,21 @@ class InversionSolution:
             archive_path: path or buffrer to write.
             base_archive_path: path to an InversionSolution archive to clone data from.
             compat: if True reindex the dataframes so that the archive remains compatible with opensha.
+            compresslevel: the zlib compression level (0-9) of the dataframes, or None for the zlib default.
         """
-        return self._solution_file.to_archive(archive_path, base_archive_path, compat)
+        return self._solution_file.to_archive(archive_path, base_archive_path, compat, compresslevel)
 
-    def fault_surfaces(self) -> gpd.GeoDataFrame:
+    def fault_surfaces(self) -> 'gpd.GeoDataFrame':
         """Get the geometry of the solution fault surfaces projected onto the earth surface.
 
         Returns:
             A geopandas dataframe with fault surface information.
         """
+        from ..solution_surfaces_builder import SolutionSurfacesBuilder
+
         return SolutionSurfacesBuilder(self).fault_surfaces()
 
-    def rupture_surface(self, rupture_id: int) -> gpd.GeoDataFrame:
+    def rupture_surface(self, rupture_id: int) -> 'gpd.GeoDataFrame':
         """Get the geometry of the rupture surface projected onto the earth surface.
 
         Args:
@@ -115,6 +124,8 @@ class InversionSolution:
         Returns:
             A geopandas dataframe with the rupture surface information.
         """
+        from ..solution_surfaces_builder import SolutionSurfacesBuilder
+
         return SolutionSurfacesBuilder(self).rupture_surface(rupture_id)
 
     @staticmethod
@@ -148,6 +159,10 @@ class InversionSolution:
 
         This method doesn't modify any other parts of the solution (e.g trimming fault section tables or geojsons).
 
+        The new solution is a view of the original: see
+        [`InversionSolutionFileView`][solvis.solution.inversion_solution.inversion_solution_file_view].
+        Rupture tables are filtered on first access, other tables are shared with the original solution.
+
         Args:
             solution (InversionSolution): The input inversion solution to be filtered.
             rupture_ids (Iterable[int]): A collection of rupture ids to include in the filtered solution.
@@ -155,25 +170,7 @@ class InversionSolution:
         Returns:
             InversionSolution: A new instance of InversionSolution containing only the ruptures with the given ids.
         """
-        rr = solution.solution_file.ruptures
-        ra = solution.solution_file.rupture_rates
-        ri = solution.solution_file.indices
-        avs = solution.solution_file.average_slips
-
-        ruptures = rr[rr["Rupture Index"].isin(rupture_ids)].copy()
-        rates = ra[ra["Rupture Index"].isin(rupture_ids)].copy()
-        indices = ri[ri["Rupture Index"].isin(rupture_ids)].copy()
-        average_slips = avs[avs["Rupture Index"].isin(rupture_ids)].copy()
-
-        new_solution = InversionSolution()
-
-        new_solution.solution_file.set_props(
-            rates, ruptures, indices, solution.solution_file.fault_sections.copy(), average_slips
-        )
-
-        # TODO:  there should be a new in-memory archive ??
-        new_solution.solution_file._archive_path = solution.solution_file.archive_path
-        return new_solution
+        return InversionSolution(InversionSolutionFileView(solution.solution_file, rupture_ids))
 
     @staticmethod
     def scale_rupture_rates(
@@ -184,6 +181,10 @@ class InversionSolution:
         """
         Scale the rupture rates by a given factor.
 
+        Only the rupture rates are copied: the new solution is a view of the original (see
+        [`InversionSolutionFileView`][solvis.solution.inversion_solution.inversion_solution_file_view]),
+        sharing all other tables and the archive with it.
+
         Args:
             solution (InversionSolution): The input inversion solution.
             scale (float): The scaling factor to apply to the rupture rates.
@@ -193,7 +194,6 @@ class InversionSolution:
         Returns:
             InversionSolution: A new instance of InversionSolution with the scaled rupture rates.
         """
-        # Retrieve the current rupture rates
         rr = solution.solution_file.rupture_rates.copy()
 
         # If specific rupture ids are provided, filter the data before scaling
@@ -203,22 +203,47 @@ class InversionSolution:
         else:
             rr['Annual Rate'] = rr['Annual Rate'] * scale
 
-        # Create a new InversionSolution instance
-        new_solution = InversionSolution()
+        # the new solution shares all other tables (and the archive) with the original
+        solution_file = InversionSolutionFileView(solution.solution_file)
+        solution_file._rates = rr
+        return InversionSolution(solution_file)
 
-        # Update the rupture rates in the new solution
-        new_solution.solution_file.set_props(
-            rates=rr,
-            ruptures=solution.solution_file.ruptures.copy(),
-            indices=solution.solution_file.indices.copy(),
-            fault_sections=solution.solution_file.fault_sections.copy(),
-            average_slips=solution.solution_file.average_slips.copy(),
-        )
+    @staticmethod
+    def stacked_rupture_rates(
+        solution: 'InversionSolution',
+        scales: Iterable[float],
+        rupture_ids: Optional[Iterable[int]] = None,
+    ) -> pd.DataFrame:
+        """
+        Get the rupture rates under each of a sequence of scaling factors.
+
+        Row `i` holds the rates of `scale_rupture_rates(solution, scales[i], rupture_ids)`, without building any
+        solutions, ready for vectorised calculations over all the scenarios (e.g. `stacked @ incidence`).
+
+        Args:
+            solution (InversionSolution): The input inversion solution.
+            scales (Iterable[float]): The scaling factors, one per scenario.
+            rupture_ids (Optional[Iterable[int]], optional): Optional collection of specific rupture ids to scale.
+                If provided, only these ruptures will be scaled. Defaults to None.
 
-        # Set the archive path for the new solution
-        new_solution.solution_file._archive_path = solution.solution_file.archive_path
+        Returns:
+            pd.DataFrame: a scales x ruptures rates matrix, indexed by `scale` with a column per `Rupture Index`.
+        """
+        rr = solution.solution_file.rupture_rates
+        scales = np.fromiter(scales, dtype='float64')
+        rates = rr['Annual Rate'].to_numpy(dtype='float64', na_value=0.0)
 
-        return new_solution
+        if rupture_ids is not None:
+            rr_filter = rr["Rupture Index"].isin(rupture_ids).to_numpy()
+            stacked = np.where(rr_filter, np.multiply.outer(scales, rates), rates)
+        else:
+            stacked = np.multiply.outer(scales, rates)
+
+        return pd.DataFrame(
+            stacked,
+            index=pd.Index(scales, name='scale'),
+            columns=pd.Index(rr['Rupture Index'].to_numpy(), name='Rupture Index'),
+        )
 
 
 class BranchInversionSolution(InversionSolution):
@@ -254,21 +279,22 @@ class BranchInversionSolution(InversionSolution):
             fault_system: a string representing the fault system (e.g `CRU`, 'HIK`).
             rupture_set_id: id for the rupture_set_id.
         """
-        ruptures = solution.solution_file.ruptures.copy()
-        rates = solution.solution_file.rupture_rates.copy()
-        indices = solution.solution_file.indices.copy()
-
-        # print(solution.solution_file.fault_sections)
-        # assert 0
+        solution_file = solution.solution_file
 
         bis = BranchInversionSolution()
         bis.branch = branch
         bis.fault_system = fault_system
         bis.rupture_set_id = rupture_set_id
+        # the rupture set tables are shared read-only with all solutions of the same rupture set (no copies)
         bis.solution_file.set_props(
-            rates, ruptures, indices, solution.solution_file.fault_sections.copy(), solution.solution_file.average_slips
+            solution_file.rupture_rates,
+            solution_file.ruptures,
+            solution_file.indices,
+            solution_file.fault_sections,
+            solution_file.average_slips,
         )
-        bis.solution_file._archive_path = solution.solution_file._archive_path
+        bis.solution_file._archive_path = solution_file._archive_path
+        bis.solution_file._rupture_set_key = solution_file.rupture_set_key
         return bis
 
     def __repr__(self):
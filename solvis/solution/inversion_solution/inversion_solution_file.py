@@ -7,22 +7,30 @@ It provides conversions from the original file formats to pandas dataframe insta
 with caching and some error handling.
 """
 
+import copy
 import io
 import json
 import logging
+import shutil
+import struct
+import tempfile
 import time
 import zipfile
+import zlib
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from functools import cache
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, List, Optional, Union, cast
+from typing import IO, TYPE_CHECKING, Any, BinaryIO, Iterable, Iterator, List, Optional, Tuple, Union, cast
 
-import geopandas as gpd
 import pandas as pd
 
 from solvis.dochelper import inherit_docstrings
 
+from .rupture_set_registry import rupture_set_content_hash, rupture_set_registry
+
 if TYPE_CHECKING:
+    import geopandas as gpd
     from pandera.typing import DataFrame
 
     from ..dataframe_models import FaultSectionSchema, RuptureRateSchema, RuptureSchema
@@ -31,6 +39,18 @@ log = logging.getLogger(__name__)
 
 ZIP_METHOD = zipfile.ZIP_STORED
 
+# zip local file header layout, see APPNOTE.TXT section 4.3.7
+ZIP_LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")
+ZIP_LOCAL_HEADER_SIGNATURE = b"PK\003\004"
+ZIP_EXTRA_HEADER = struct.Struct("<2H")
+ZIP64_EXTRA_ID = 1
+ZIP_COPY_CHUNK_SIZE = 1024 * 1024
+CSV_CHUNK_ROWS = 100_000
+# compressed members larger than this are spooled to disk until they are written to the archive
+ZIP_SPOOL_MAX_SIZE = 64 * 1024 * 1024
+
+ArchiveMember = Tuple[str, Iterable[bytes]]
+
 WARNING = """
 # Attention
 
@@ -47,13 +67,145 @@ Inversion Solution archive file:
 """  # warning added to archives that have been modified by Solvis.
 
 
-def data_to_zip_direct(z, data, name):
+def data_to_zip_direct(z, data, name, compress_type=zipfile.ZIP_DEFLATED):
     log.debug('data_to_zip_direct %s' % name)
     zinfo = zipfile.ZipInfo(name, time.localtime()[:6])
-    zinfo.compress_type = zipfile.ZIP_DEFLATED
+    zinfo.compress_type = compress_type
     z.writestr(zinfo, data)
 
 
+def file_to_zip_direct(z, source: BinaryIO, name, compress_type=zipfile.ZIP_DEFLATED):
+    """Stream the contents of a binary file object into a new zip archive member."""
+    log.debug('file_to_zip_direct %s' % name)
+    zinfo = zipfile.ZipInfo(name, time.localtime()[:6])
+    zinfo.compress_type = compress_type
+    source.seek(0)
+    with z.open(zinfo, 'w', force_zip64=True) as target:
+        shutil.copyfileobj(source, target)
+
+
+def zip_member_data_offset(source: IO[bytes], info: zipfile.ZipInfo) -> int:
+    """Return the offset of the (compressed) data of a zip archive member, from its local file header."""
+    source.seek(info.header_offset)
+    header = ZIP_LOCAL_HEADER.unpack(source.read(ZIP_LOCAL_HEADER.size))
+    if header[0] != ZIP_LOCAL_HEADER_SIGNATURE:  # pragma: no cover
+        raise zipfile.BadZipFile(f"bad local file header for {info.filename}")
+    filename_length, extra_length = header[-2:]
+    return info.header_offset + ZIP_LOCAL_HEADER.size + filename_length + extra_length
+
+
+def _strip_zip64_extra(extra: bytes) -> bytes:
+    """Remove any zip64 records from a zip extra field, `ZipInfo.FileHeader()` adds its own as needed."""
+    records = []
+    position = 0
+    while position + ZIP_EXTRA_HEADER.size <= len(extra):
+        record_id, record_size = ZIP_EXTRA_HEADER.unpack_from(extra, position)
+        end = position + ZIP_EXTRA_HEADER.size + record_size
+        if record_id != ZIP64_EXTRA_ID:
+            records.append(extra[position:end])
+        position = end
+    return b''.join(records)
+
+
+def _write_raw_member(z: zipfile.ZipFile, zinfo: zipfile.ZipInfo, source: IO[bytes], offset: int = 0):
+    """Write a member whose compressed data (`zinfo.compress_size` bytes at `offset` in `source`) is ready."""
+    assert z.fp is not None
+    zinfo.flag_bits &= ~0x08  # the CRC and sizes are known, so go in the local header (no data descriptor)
+    zinfo.extra = _strip_zip64_extra(zinfo.extra)
+    zinfo.header_offset = z.fp.tell()
+    z.fp.write(zinfo.FileHeader())
+
+    source.seek(offset)
+    remaining = zinfo.compress_size
+    while remaining > 0:
+        chunk = source.read(min(remaining, ZIP_COPY_CHUNK_SIZE))
+        if not chunk:  # pragma: no cover
+            raise zipfile.BadZipFile(f"truncated data for {zinfo.filename}")
+        z.fp.write(chunk)
+        remaining -= len(chunk)
+
+    z.filelist.append(zinfo)
+    z.NameToInfo[zinfo.filename] = zinfo
+    z.start_dir = z.fp.tell()
+
+
+def member_to_zip_raw(z: zipfile.ZipFile, source: zipfile.ZipFile, info: zipfile.ZipInfo):
+    """Copy a member of the `source` archive into a new zip archive, without decompressing it.
+
+    The compressed bytes are streamed as they are, so the member is neither inflated nor compressed again.
+    Encrypted members are copied with `ZipFile.read()` and `ZipFile.writestr()` instead.
+    """
+    if info.flag_bits & 0x1 or source.fp is None or z.fp is None:  # pragma: no cover
+        z.writestr(info, source.read(info))
+        return
+    log.debug('member_to_zip_raw %s' % info.filename)
+    offset = zip_member_data_offset(source.fp, info)
+    _write_raw_member(z, copy.copy(info), source.fp, offset)
+
+
+def dataframe_csv_chunks(dataframe: pd.DataFrame, index: bool = False, chunk_rows: int = CSV_CHUNK_ROWS):
+    """Serialise a dataframe to CSV, `chunk_rows` rows at a time.
+
+    The chunks join up to `dataframe.to_csv(index=index)`, without building that (possibly huge) string.
+    """
+    for start in range(0, max(len(dataframe), 1), chunk_rows):
+        yield dataframe.iloc[start : start + chunk_rows].to_csv(index=index, header=start == 0).encode()
+
+
+def file_chunks(source: BinaryIO) -> Iterator[bytes]:
+    """Read a binary file object from the start, in chunks."""
+    source.seek(0)
+    return iter(lambda: source.read(ZIP_COPY_CHUNK_SIZE), b'')
+
+
+def _deflate_member(
+    name: str, chunks: Iterable[bytes], compresslevel: Optional[int]
+) -> Tuple[zipfile.ZipInfo, IO[bytes]]:
+    """Compress the chunks of a new archive member into a (spooled) temporary file."""
+    tic = time.perf_counter()
+    zinfo = zipfile.ZipInfo(name, time.localtime()[:6])
+    zinfo.compress_type = zipfile.ZIP_DEFLATED
+    compressor = zlib.compressobj(
+        zlib.Z_DEFAULT_COMPRESSION if compresslevel is None else compresslevel, zlib.DEFLATED, -15
+    )
+    target = cast(IO[bytes], tempfile.SpooledTemporaryFile(max_size=ZIP_SPOOL_MAX_SIZE))
+    crc = file_size = 0
+    for chunk in chunks:
+        crc = zlib.crc32(chunk, crc)
+        file_size += len(chunk)
+        target.write(compressor.compress(chunk))
+    target.write(compressor.flush())
+    zinfo.CRC, zinfo.file_size, zinfo.compress_size = crc, file_size, target.tell()
+    toc = time.perf_counter()
+    log.debug('deflated %s (%s bytes) in %2.3f seconds' % (name, file_size, toc - tic))
+    return zinfo, target
+
+
+def members_to_zip(
+    z: zipfile.ZipFile,
+    members: Iterable[ArchiveMember],
+    compresslevel: Optional[int] = None,
+    max_workers: Optional[int] = None,
+):
+    """Compress new archive members in parallel, and write them in order.
+
+    Each member is compressed (in a thread, zlib releases the GIL) as its chunks are produced, so neither
+    the whole uncompressed member nor all the compressed members need to be held in memory.
+
+    Args:
+        z: the zip archive to write to.
+        members: (name, chunks) pairs, e.g. from `dataframe_csv_chunks()`.
+        compresslevel: the zlib compression level (0-9), or None for the zlib default.
+        max_workers: the maximum number of threads.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_deflate_member, name, chunks, compresslevel) for name, chunks in members]
+        for future in futures:
+            zinfo, compressed = future.result()
+            with compressed:
+                _write_raw_member(z, zinfo, compressed)
+
+
 def reindex_dataframe(dataframe: pd.DataFrame) -> pd.DataFrame:
     new_df = dataframe.copy().reset_index(drop=True).drop(columns=['Rupture Index'])  # , errors='ignore')
     new_df.index = new_df.index.rename('Rupture Index')
@@ -82,6 +234,8 @@ class InversionSolutionFile:
     SECT_SLIP_RATES_PATH = 'ruptures/sect_slip_rates.csv'
 
     DATAFRAMES = [RATES_PATH, RUPTS_PATH, INDICES_PATH, AVG_SLIPS_PATH]
+    RUPTURE_SET_PATHS = [RUPTS_PATH, INDICES_PATH, AVG_SLIPS_PATH, FAULTS_PATH, SECT_SLIP_RATES_PATH]
+    SKIPPED_MEMBERS: List[str] = []  # other archive members that to_archive() does not copy
 
     def __init__(self) -> None:
         """Initializes the InversionSolutionFile object."""
@@ -91,13 +245,13 @@ class InversionSolutionFile:
         self._section_target_slip_rates: Optional[pd.DataFrame] = None
         self._average_slips: Optional[pd.DataFrame] = None
         self._archive_path: Optional[Path] = None
-        self._archive: Optional[io.BytesIO] = None
+        self._archive: Optional[BinaryIO] = None
+        self._rupture_set_key: Optional[str] = None
 
-    def _write_dataframes(self, zip_archive: zipfile.ZipFile, reindex: bool = False):
+    def _dataframe_members(self, reindex: bool = False) -> List[ArchiveMember]:
         """
-        Writes the dataframes to a zip archive.
+        Get the dataframes to write to a zip archive, as (name, CSV chunks) pairs.
 
-        :param zip_archive: The zip archive to write to.
         :param reindex: Whether or not to reindex the dataframes before writing them.
         """
         rates = reindex_dataframe(self.rupture_rates) if reindex else self.rupture_rates
@@ -105,12 +259,30 @@ class InversionSolutionFile:
         indices = reindex_dataframe(self.indices) if reindex else self.indices
         slips = reindex_dataframe(self.average_slips) if reindex else self.average_slips
 
-        data_to_zip_direct(zip_archive, rates.to_csv(index=reindex), self.RATES_PATH)
-        data_to_zip_direct(zip_archive, rupts.to_csv(index=reindex), self.RUPTS_PATH)
-        data_to_zip_direct(zip_archive, indices.to_csv(index=reindex), self.INDICES_PATH)
-        data_to_zip_direct(zip_archive, slips.to_csv(index=reindex), self.AVG_SLIPS_PATH)
+        return [
+            (self.RATES_PATH, dataframe_csv_chunks(rates, index=reindex)),
+            (self.RUPTS_PATH, dataframe_csv_chunks(rupts, index=reindex)),
+            (self.INDICES_PATH, dataframe_csv_chunks(indices, index=reindex)),
+            (self.AVG_SLIPS_PATH, dataframe_csv_chunks(slips, index=reindex)),
+        ]
+
+    def _write_dataframes(self, zip_archive: zipfile.ZipFile, reindex: bool = False, compresslevel=None):
+        """
+        Writes the dataframes to a zip archive.
+
+        :param zip_archive: The zip archive to write to.
+        :param reindex: Whether or not to reindex the dataframes before writing them.
+        :param compresslevel: The zlib compression level, or None for the default.
+        """
+        members_to_zip(zip_archive, self._dataframe_members(reindex), compresslevel)
 
-    def to_archive(self, archive_path_or_buffer: Union[Path, str, io.BytesIO], base_archive_path=None, compat=False):
+    def to_archive(
+        self,
+        archive_path_or_buffer: Union[Path, str, io.BytesIO],
+        base_archive_path=None,
+        compat=False,
+        compresslevel=None,
+    ):
         """Write the current solution file to a new zip archive.
 
         Optionally cloning data from a base archive.
@@ -123,6 +295,7 @@ class InversionSolutionFile:
             archive_path_or_buffer: path or buffrer to write.
             base_archive_path: path to an InversionSolution archive to clone data from.
             compat: if True reindex the dataframes so that the archive remains compatible with opensha.
+            compresslevel: the zlib compression level (0-9) of the dataframes, or None for the zlib default.
         """
         if base_archive_path is None:
             # try to use this archive, rather than a base archive
@@ -133,21 +306,24 @@ class InversionSolutionFile:
         log.debug('create zipfile %s with method %s' % (archive_path_or_buffer, ZIP_METHOD))
         zout = zipfile.ZipFile(archive_path_or_buffer, 'w', ZIP_METHOD)
 
-        log.debug('to_archive: skipping files: %s' % self.DATAFRAMES)
-        # this copies in memory, skipping the dataframe files we'll want to overwrite
+        log.debug('to_archive: skipping files: %s' % (self.DATAFRAMES + self.SKIPPED_MEMBERS))
+        # this copies the raw (compressed) members, skipping the dataframe files we'll want to overwrite
         for item in zin.infolist():
-            if item.filename in self.DATAFRAMES:
+            if (
+                item.filename in self.DATAFRAMES
+                or item.filename in self.SKIPPED_MEMBERS
+                or item.filename == "WARNING.md"
+            ):
                 continue
-            log.debug("writing to zipfile: %s" % item.filename)
-            buffer = zin.read(item.filename)
-            zout.writestr(item, buffer)
+            member_to_zip_raw(zout, zin, item)
 
         if compat:
-            self._write_dataframes(zout, reindex=True)
+            self._write_dataframes(zout, reindex=True, compresslevel=compresslevel)
         else:
-            self._write_dataframes(zout, reindex=False)
+            self._write_dataframes(zout, reindex=False, compresslevel=compresslevel)
 
         data_to_zip_direct(zout, WARNING, "WARNING.md")
+        zout.close()
 
         if isinstance(archive_path_or_buffer, io.BytesIO):
             self._archive = archive_path_or_buffer
@@ -212,6 +388,36 @@ class InversionSolutionFile:
         log.debug('dataframe_from_csv() time to load dataframe %s %2.3f seconds' % (path, toc - tic))
         return df0
 
+    @property
+    def rupture_set_key(self) -> Optional[str]:
+        """
+        Get the content hash identifying the rupture set of the archive.
+
+        Solutions with the same rupture set key share their rupture set tables
+        (`ruptures`, `indices`, `average_slips` and `fault_sections`), see
+        [`rupture_set_registry`][solvis.solution.inversion_solution.rupture_set_registry].
+
+        Returns:
+            the rupture set key, or None if there is no archive.
+        """
+        if self._rupture_set_key is None:
+            if self._archive is not None:
+                archive = zipfile.ZipFile(self._archive)
+            elif self._archive_path is not None:
+                archive = zipfile.ZipFile(self._archive_path)
+            else:
+                return None
+            with archive:
+                self._rupture_set_key = rupture_set_content_hash(archive, self.RUPTURE_SET_PATHS)
+        return self._rupture_set_key
+
+    def _rupture_set_table(self, name: str, loader):
+        """Load a rupture set table, shared with other solutions having the same rupture set."""
+        key = self.rupture_set_key
+        if key is None:
+            return loader()
+        return rupture_set_registry.get_table(key, name, loader)
+
     @property
     @cache
     def fault_sections(self) -> 'DataFrame[FaultSectionSchema]':
@@ -221,6 +427,11 @@ class InversionSolutionFile:
         Returns:
             A DataFrame containing fault section data with target slip rates.
         """
+        return self._rupture_set_table('fault_sections', self._load_fault_sections)
+
+    def _load_fault_sections(self) -> 'DataFrame[FaultSectionSchema]':
+        import geopandas as gpd
+
         tic = time.perf_counter()
         fault_sections = gpd.read_file(self.archive.open(self.FAULTS_PATH))
         fault_sections = fault_sections.join(self.section_target_slip_rates)
@@ -302,12 +513,14 @@ class InversionSolutionFile:
         if self._ruptures is None:
             dtypes: defaultdict = defaultdict(lambda: 'Float32')
             dtypes["Rupture Index"] = 'UInt32'
-            self._ruptures = self._dataframe_from_csv(self.RUPTS_PATH, dtypes)
+            self._ruptures = self._rupture_set_table(
+                'ruptures', lambda: self._dataframe_from_csv(self.RUPTS_PATH, dtypes)
+            )
         return cast('DataFrame[RuptureSchema]', self._ruptures)
 
     @property
     @cache
-    def indices(self) -> gpd.GeoDataFrame:
+    def indices(self) -> 'gpd.GeoDataFrame':
         """
         Get the rupture indices from the archive.
 
@@ -316,12 +529,14 @@ class InversionSolutionFile:
         """
         if self._indices is None:
             dtypes: defaultdict = defaultdict(lambda: 'Int32')
-            self._indices = self._dataframe_from_csv(self.INDICES_PATH, dtypes)
+            self._indices = self._rupture_set_table(
+                'indices', lambda: self._dataframe_from_csv(self.INDICES_PATH, dtypes)
+            )
         return self._indices
 
     @property
     @cache
-    def average_slips(self) -> gpd.GeoDataFrame:
+    def average_slips(self) -> 'gpd.GeoDataFrame':
         """
         Get the average slips from the archive.
 
@@ -332,11 +547,13 @@ class InversionSolutionFile:
         if self._average_slips is None:
             dtypes = {}
             dtypes["Rupture Index"] = 'UInt32'
-            self._average_slips = self._dataframe_from_csv(self.AVG_SLIPS_PATH, dtypes)
+            self._average_slips = self._rupture_set_table(
+                'average_slips', lambda: self._dataframe_from_csv(self.AVG_SLIPS_PATH, dtypes)
+            )
         return self._average_slips
 
     @property
-    def section_target_slip_rates(self) -> gpd.GeoDataFrame:
+    def section_target_slip_rates(self) -> 'gpd.GeoDataFrame':
         """
         Get the section target slip rates from the archive.
 
@@ -0,0 +1,117 @@
+"""
+A filtered view of an InversionSolutionFile.
+
+The view holds its parent solution file and the rupture ids to keep. The rupture tables
+(`rupture_rates`, `ruptures`, `indices` and `average_slips`) are filtered from the parent on first
+access, and the tables that are not filtered (e.g. `fault_sections`) and the archive are shared with
+the parent, so creating many views of one solution costs (almost) nothing.
+
+A view of all the parent's ruptures (`rupture_ids=None`) shares every table with the parent until one is
+replaced, e.g. the rates of a scaled solution (see `InversionSolution.scale_rupture_rates`).
+
+A view behaves like any other solution file: `set_props()` replaces its tables, and `to_archive()`
+writes the filtered tables.
+
+Classes:
+    InversionSolutionFileView: an InversionSolutionFile showing only some ruptures of a parent.
+"""
+
+import zipfile
+from typing import TYPE_CHECKING, Any, Iterable, List, Optional, TypeVar, cast
+
+import numpy as np
+import pandas as pd
+
+from solvis.dochelper import inherit_docstrings
+
+from .inversion_solution_file import InversionSolutionFile
+
+if TYPE_CHECKING:
+    import geopandas as gpd
+    from pandera.typing import DataFrame
+
+    from ..dataframe_models import FaultSectionSchema, RuptureRateSchema, RuptureSchema
+
+TableType = TypeVar('TableType', bound=pd.DataFrame)
+
+
+@inherit_docstrings
+class InversionSolutionFileView(InversionSolutionFile):
+    """An InversionSolutionFile showing only some ruptures of a parent solution file."""
+
+    def __init__(self, parent: InversionSolutionFile, rupture_ids: Optional[Iterable[int]] = None) -> None:
+        """Instantiate a new view.
+
+        Args:
+            parent: the solution file to filter.
+            rupture_ids: the ids of the ruptures to keep, or None to keep them all.
+        """
+        super().__init__()
+        self._parent = parent
+        self._rupture_ids = None if rupture_ids is None else np.unique(np.fromiter(rupture_ids, dtype='int64'))
+        self._archive_path = parent.archive_path
+
+    @property
+    def parent(self) -> InversionSolutionFile:
+        """Get the parent solution file."""
+        return self._parent
+
+    @property
+    def rupture_ids(self) -> Optional[np.ndarray]:
+        """Get the (sorted) ids of the ruptures in the view, or None if the view keeps them all."""
+        return self._rupture_ids
+
+    def _filter(self, table: TableType, column: str = 'Rupture Index') -> TableType:
+        if self._rupture_ids is None:
+            return table
+        return cast(TableType, table[table[column].isin(self._rupture_ids)])
+
+    @property
+    def archive(self) -> zipfile.ZipFile:
+        if self._archive is None:
+            return self._parent.archive
+        return super().archive
+
+    @property
+    def rupture_set_key(self) -> Optional[str]:
+        return self._parent.rupture_set_key
+
+    @property
+    def fault_sections(self) -> 'DataFrame[FaultSectionSchema]':
+        return self._parent.fault_sections
+
+    @property
+    def logic_tree_branch(self) -> List[Any]:
+        return self._parent.logic_tree_branch
+
+    @property
+    def fault_regime(self) -> str:
+        return self._parent.fault_regime
+
+    @property
+    def section_target_slip_rates(self) -> 'gpd.GeoDataFrame':
+        return self._parent.section_target_slip_rates
+
+    @property
+    def rupture_rates(self) -> 'DataFrame[RuptureRateSchema]':
+        if self._rates is None:
+            self._rates = self._filter(self._parent.rupture_rates)
+        return cast('DataFrame[RuptureRateSchema]', self._rates)
+
+    @property
+    def ruptures(self) -> 'DataFrame[RuptureSchema]':
+        if self._ruptures is None:
+            self._ruptures = self._filter(self._parent.ruptures)
+        return cast('DataFrame[RuptureSchema]', self._ruptures)
+
+    @property
+    def indices(self) -> 'gpd.GeoDataFrame':
+        if self._indices is None:
+            self._indices = self._filter(self._parent.indices)
+        return self._indices
+
+    @property
+    def average_slips(self) -> 'gpd.GeoDataFrame':
+        if self._average_slips is None:
+            self._average_slips = self._filter(self._parent.average_slips)
+        return self._average_slips
@@ -7,15 +7,20 @@ from the raw dataframes available via the `InversionSolutionFile` class.
 
 import logging
 import time
+import weakref
 from functools import cache
-from typing import TYPE_CHECKING, List, Optional, cast
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple, cast
 
-import geopandas as gpd
+import numpy as np
 import pandas as pd
 
+from .. import named_fault
 from .inversion_solution_file import InversionSolutionFile
+from .rupture_id_map import RuptureIdMap
+from .rupture_section_view import RuptureSectionView
 
 if TYPE_CHECKING:
+    import geopandas as gpd
     from pandera.typing import DataFrame
 
     from solvis.solution import dataframe_models
@@ -36,10 +41,14 @@ class InversionSolutionModel:
         self._solution_file = solution_file
         self._rs_with_rupture_rates: Optional[pd.DataFrame] = None
         self._ruptures_with_rupture_rates: Optional[pd.DataFrame] = None
-        self._rupture_sections: Optional[gpd.GeoDataFrame] = None
+        self._rupture_sections: Optional['gpd.GeoDataFrame'] = None
         self._fs_with_rates: Optional[pd.DataFrame] = None
         self._fs_with_soln_rates: Optional[pd.DataFrame] = None
         self._fault_sections: Optional[pd.DataFrame] = None
+        self._rupture_id_maps: Dict[str, RuptureIdMap] = {}
+        self._named_fault_incidences: weakref.WeakKeyDictionary[named_fault.NamedFaultIndex, pd.DataFrame] = (
+            weakref.WeakKeyDictionary()
+        )
 
     @property
     def solution_file(self) -> InversionSolutionFile:
@@ -51,6 +60,23 @@ class InversionSolutionModel:
         """
         return self._solution_file
 
+    def rupture_id_map(self, table: str = 'ruptures') -> RuptureIdMap:
+        """
+        Get the map of rupture ids to the row positions of a rupture table, built on first use.
+
+        Args:
+            table: the solution file rupture table, one of `ruptures`, `rupture_rates` or `average_slips`.
+
+        Returns:
+            RuptureIdMap: the map for the table's `Rupture Index` column.
+        """
+        if table not in self._rupture_id_maps:
+            if table not in ('ruptures', 'rupture_rates', 'average_slips'):
+                raise ValueError(f"unknown rupture table: {table}")
+            rupture_ids = getattr(self.solution_file, table)['Rupture Index'].to_numpy(dtype='int64')
+            self._rupture_id_maps[table] = RuptureIdMap(rupture_ids)
+        return self._rupture_id_maps[table]
+
     def rate_column_name(self) -> str:
         """Get the appropriate rate column name.
 
@@ -108,18 +134,19 @@ class InversionSolutionModel:
         """
         Get the fault sections with rupture rates.
 
+        This materialises the whole of `rupture_section_view`, geometry included; prefer the view to get just
+        some rows or columns.
+
         Returns:
             pd.DataFrame: A pandas dataframe conforming to the FaultSectionRuptureRateSchema.
         """
         tic = time.perf_counter()
-        print(self.rs_with_rupture_rates)
-        assert self.rs_with_rupture_rates is not None
-        fs_with_rates = self.rs_with_rupture_rates.join(self.solution_file.fault_sections, 'section', how='inner')
+        fs_with_rates = self.rupture_section_view.to_frame()
         toc = time.perf_counter()
         log.debug(
             (
-                'fault_sections_with_rupture_rates: time to load rs_with_rupture_rates '
-                'and join with fault_sections: %2.3f seconds'
+                'fault_sections_with_rupture_rates: time to join rupture sections '
+                'with rupture rates and fault_sections: %2.3f seconds'
             )
             % (toc - tic)
         )
@@ -157,19 +184,26 @@ class InversionSolutionModel:
         Returns:
             a gpd.GeoDataFrame
         """
-        average_slips = self.solution_file.average_slips
-        # for every subsection, find the ruptures on it
-        fault_sections_wr = self.solution_file.fault_sections.copy()
-        for idx, fault_section in self.solution_file.fault_sections.iterrows():
-            fault_id = fault_section['FaultID']
-            fswr_gt0 = self.fault_sections_with_rupture_rates[
-                (self.fault_sections_with_rupture_rates['FaultID'] == fault_id)
-                & (self.fault_sections_with_rupture_rates['Annual Rate'] > 0.0)
-            ]
-            fault_sections_wr.loc[idx, 'Solution Slip Rate'] = sum(  # type: ignore
-                fswr_gt0['Annual Rate'] * average_slips.loc[fswr_gt0['Rupture Index']]['Average Slip (m)']
-            )
+        fault_sections = self.solution_file.fault_sections
+        rupture_ids = self.rupture_sections['rupture'].to_numpy(dtype='int64')
+        section_ids = self.rupture_sections['section'].to_numpy(dtype='int64')
+
+        # the rate and average slip of the rupture of every (rupture, section) pair
+        rates = self.rupture_id_map('rupture_rates').take(
+            rupture_ids, self.solution_file.rupture_rates['Annual Rate'].to_numpy(dtype='float64', na_value=np.nan)
+        )
+        slips = self.rupture_id_map('average_slips').take(
+            rupture_ids,
+            self.solution_file.average_slips['Average Slip (m)'].to_numpy(dtype='float64', na_value=np.nan),
+        )
+
+        # for every subsection, sum over the ruptures on it
+        gt0 = rates > 0.0
+        fault_ids = fault_sections['FaultID'].reindex(section_ids[gt0]).to_numpy()
+        slip_rates = pd.Series(rates[gt0] * slips[gt0], index=fault_ids).groupby(level=0).sum()
 
+        fault_sections_wr = fault_sections.copy()
+        fault_sections_wr['Solution Slip Rate'] = fault_sections['FaultID'].map(slip_rates).fillna(0.0)
         return cast('DataFrame[dataframe_models.FaultSectionWithSolutionSlipRate]', fault_sections_wr)
 
     @property
@@ -197,6 +231,26 @@ class InversionSolutionModel:
         )
         return cast('DataFrame[dataframe_models.RuptureSectionsWithRuptureRatesSchema]', rs_with_rupture_rates)
 
+    def _join_ruptures(self, rupture_rates: pd.DataFrame) -> pd.DataFrame:
+        """Join the rupture properties to (some rows of) the rupture rates, by row position.
+
+        Ruptures missing from the ruptures table get NaN properties (as in a left join).
+        """
+        positions = self.rupture_id_map('ruptures').positions(rupture_rates["Rupture Index"].to_numpy(dtype='int64'))
+        ruptures = self.solution_file.ruptures.drop(columns="Rupture Index").reset_index(drop=True).reindex(positions)
+        ruptures.index = rupture_rates.index
+        return pd.concat([rupture_rates, ruptures], axis=1)
+
+    @property
+    def rupture_section_view(self) -> RuptureSectionView:
+        """
+        Get a lazy view of `fault_sections_with_rupture_rates`.
+
+        Returns:
+            RuptureSectionView: a view resolving just the requested rows and columns.
+        """
+        return RuptureSectionView(self)
+
     @property
     @cache
     def ruptures_with_rupture_rates(self) -> 'DataFrame[dataframe_models.RupturesWithRuptureRatesSchema]':
@@ -208,14 +262,300 @@ class InversionSolutionModel:
         """
         tic = time.perf_counter()
         # print(self.rupture_rates.drop(self.rupture_rates.iloc[:, :1], axis=1))
-        ruptures_with_rupture_rates = self.solution_file.rupture_rates.join(
-            self.solution_file.ruptures.drop(columns="Rupture Index"),
-            on=self.solution_file.rupture_rates["Rupture Index"],  # type: ignore
-        )
-        if 'key_0' in ruptures_with_rupture_rates.columns:  # pragma: no cover (can this be dropped?)
-            ruptures_with_rupture_rates.drop(columns=['key_0'], inplace=True)
+        ruptures_with_rupture_rates = self._join_ruptures(self.solution_file.rupture_rates)
         toc = time.perf_counter()
         log.debug(
             'ruptures_with_rupture_rates(): time to load rates and join with ruptures: %2.3f seconds' % (toc - tic)
         )
         return cast('DataFrame[dataframe_models.RupturesWithRuptureRatesSchema]', ruptures_with_rupture_rates)
+
+    @property
+    @cache
+    def rupture_section_rates(self) -> 'DataFrame[dataframe_models.RuptureSectionRateSchema]':
+        """
+        Get a compact form of `rs_with_rupture_rates`.
+
+        Only the ids, the rupture rates and the magnitude of each (rupture, section) pair are kept, as
+        `int32`, `float32` and categorical columns. Other rupture or fault section columns can be gathered
+        when needed, with `with_rupture_columns()` and `with_section_columns()`.
+
+        Unlike `rs_with_rupture_rates`, ruptures without sections are not included.
+
+        Returns:
+            pd.DataFrame: A pandas dataframe conforming to the RuptureSectionRateSchema.
+        """
+        tic = time.perf_counter()
+        rupture_rates = self.solution_file.rupture_rates
+        rupture_ids = self.rupture_sections['rupture'].to_numpy(dtype='int64')
+        section_ids = self.rupture_sections['section'].to_numpy(dtype='int64')
+
+        # keep the pairs of ruptures with rates, in the row order of the rates
+        positions = self.rupture_id_map('rupture_rates').positions(rupture_ids)
+        order = np.argsort(positions, kind='stable')
+        order = order[positions[order] >= 0]
+        rupture_ids, section_ids, positions = rupture_ids[order], section_ids[order], positions[order]
+
+        columns: Dict[str, Any] = {'Rupture Index': rupture_ids.astype('int32'), 'section': section_ids.astype('int32')}
+        if 'fault_system' in rupture_rates.columns:
+            columns['fault_system'] = pd.Categorical(rupture_rates['fault_system'].to_numpy()[positions])
+        for column in rupture_rates.columns:
+            if column in columns:
+                continue
+            dtype = 'int32' if pd.api.types.is_integer_dtype(rupture_rates[column]) else 'float32'
+            columns[column] = rupture_rates[column].to_numpy(dtype=dtype, na_value=np.nan)[positions]
+        columns['Magnitude'] = self.rupture_id_map('ruptures').take(
+            rupture_ids, self.solution_file.ruptures['Magnitude'].to_numpy(dtype='float32', na_value=np.nan)
+        )
+
+        rupture_section_rates = pd.DataFrame(columns)
+        toc = time.perf_counter()
+        log.debug('rupture_section_rates: time to gather %s pairs: %2.3f seconds' % (len(order), toc - tic))
+        return cast('DataFrame[dataframe_models.RuptureSectionRateSchema]', rupture_section_rates)
+
+    @property
+    @cache
+    def parent_fault_incidence(self) -> pd.DataFrame:
+        """
+        Get the rupture x parent fault incidence, as (rupture, parent fault) pairs.
+
+        Each rupture is paired once with each parent fault of its sections.
+
+        Returns:
+            pd.DataFrame: the unique `Rupture Index` and `ParentID` pairs, as `int32` columns.
+        """
+        tic = time.perf_counter()
+        rupture_sections = self.rupture_sections
+        parent_ids = self.solution_file.fault_sections['ParentID'].reindex(
+            rupture_sections['section'].to_numpy(dtype='int64')
+        )
+        known = parent_ids.notna().to_numpy()
+        incidence = pd.DataFrame(
+            {
+                'Rupture Index': rupture_sections['rupture'].to_numpy(dtype='int32')[known],
+                'ParentID': parent_ids.to_numpy()[known].astype('int32'),
+            }
+        ).drop_duplicates(ignore_index=True)
+        toc = time.perf_counter()
+        log.debug('parent_fault_incidence: time to build %s pairs: %2.3f seconds' % (len(incidence), toc - tic))
+        return incidence
+
+    def named_fault_incidence(self, grouping: 'named_fault.NamedFaultGrouping' = None) -> pd.DataFrame:
+        """
+        Get the rupture x named fault incidence, as (rupture, named fault) pairs, built once per grouping.
+
+        Each rupture is paired once with each named fault of its parent faults.
+
+        Args:
+            grouping: a registered named fault scheme name, or a compiled index (default: the CFM 1.0A grouping).
+
+        Returns:
+            pd.DataFrame: the unique `Rupture Index` and `named_fault_name` pairs.
+        """
+        index = named_fault.named_fault_index(grouping)
+        if index in self._named_fault_incidences:
+            return self._named_fault_incidences[index]
+        parent_fault_incidence = self.parent_fault_incidence
+        positions, name_codes = index.parent_pairs(parent_fault_incidence['ParentID'].to_numpy())
+        incidence = pd.DataFrame(
+            {
+                'Rupture Index': parent_fault_incidence['Rupture Index'].to_numpy()[positions],
+                'named_fault_name': index.names[name_codes],
+            }
+        )
+        incidence = incidence.drop_duplicates(ignore_index=True)
+        self._named_fault_incidences[index] = incidence
+        return incidence
+
+    def with_rupture_columns(self, table: pd.DataFrame, columns: Iterable[str]) -> pd.DataFrame:
+        """
+        Gather rupture columns for the `Rupture Index` of each row of a table.
+
+        Args:
+            table: a table with a `Rupture Index` column, e.g. `rupture_section_rates`.
+            columns: the `ruptures` columns to add (columns already in the table are skipped).
+
+        Returns:
+            pd.DataFrame: a copy of the table with the rupture columns.
+        """
+        ruptures = self.solution_file.ruptures
+        positions = self.rupture_id_map('ruptures').positions(table['Rupture Index'].to_numpy(dtype='int64'))
+        gathered = ruptures[[c for c in columns if c not in table.columns]].reset_index(drop=True).reindex(positions)
+        gathered.index = table.index
+        return pd.concat([table, gathered], axis=1)
+
+    def with_section_columns(self, table: pd.DataFrame, columns: Iterable[str]) -> pd.DataFrame:
+        """
+        Gather fault section columns for the `section` of each row of a table.
+
+        Args:
+            table: a table with a `section` column, e.g. `rupture_section_rates`.
+            columns: the `fault_sections` columns to add (columns already in the table are skipped).
+
+        Returns:
+            pd.DataFrame: a copy of the table with the fault section columns.
+        """
+        fault_sections = self.solution_file.fault_sections
+        gathered = fault_sections[[c for c in columns if c not in table.columns]].reindex(
+            table['section'].to_numpy(dtype='int64')
+        )
+        gathered.index = table.index
+        return pd.concat([table, gathered], axis=1)
+
+    def memory_report(self, full: bool = False) -> pd.DataFrame:
+        """
+        Report the memory used by the long (rupture, section) tables, and by their compact form.
+
+        Args:
+            full: if True build `rs_with_rupture_rates` and `fault_sections_with_rupture_rates` and measure them,
+                otherwise estimate their size from the per row size of the tables they join.
+
+        Returns:
+            pd.DataFrame: rows, columns, `full_bytes`, `compact_bytes` and `saving` (the fraction of `full_bytes`
+                saved) for each table, indexed by table name.
+        """
+        compact = self.rupture_section_rates
+        compact_bytes = int(compact.memory_usage(deep=True).sum())
+
+        def row_bytes(table: pd.DataFrame) -> float:
+            return table.memory_usage(deep=True, index=False).sum() / max(len(table), 1)
+
+        rupture_bytes = row_bytes(self.solution_file.rupture_rates) + row_bytes(self.solution_file.ruptures)
+        section_bytes = row_bytes(self.solution_file.fault_sections)
+        # the index, and the `key_0` and `section` columns added by the joins
+        join_bytes = 8 + 4 + 5
+
+        report = []
+        for name, estimate in [
+            ('rs_with_rupture_rates', rupture_bytes + join_bytes),
+            ('fault_sections_with_rupture_rates', rupture_bytes + section_bytes + join_bytes),
+        ]:
+            if full:
+                table = getattr(self, name)
+                rows, width = table.shape
+                full_bytes = int(table.memory_usage(deep=True).sum())
+            else:
+                rows, width = len(compact), None
+                full_bytes = int(estimate * len(compact))
+            report.append(
+                dict(
+                    table=name,
+                    rows=rows,
+                    columns=width,
+                    full_bytes=full_bytes,
+                    compact_bytes=compact_bytes,
+                    saving=1 - compact_bytes / full_bytes if full_bytes else 0.0,
+                )
+            )
+        return pd.DataFrame(report).set_index('table')
+
+    def section_distances(
+        self, sites: Iterable[Tuple[float, float]], section_ids: Optional[Iterable[int]] = None
+    ) -> pd.DataFrame:
+        """
+        Calculate the distance from each site to each fault section surface.
+
+        Distances are calculated with [`section_distance`][solvis.geometry.section_distance], so the
+        optional `pyvista` dependency is required.
+
+        Args:
+            sites: a sequence of `(lat, lon)` tuples.
+            section_ids: calculate distances only for these sections (default: all sections).
+
+        Returns:
+            pd.DataFrame: a sites x sections table of distances in km, indexed by site position.
+        """
+        from solvis import geometry
+
+        from ..solution_surfaces_builder import build_fault_surfaces
+
+        tic = time.perf_counter()
+        fault_sections = self.solution_file.fault_sections
+        if section_ids is not None:
+            fault_sections = fault_sections.loc[list(section_ids)]
+        surfaces = build_fault_surfaces(fault_sections, self.solution_file.fault_regime)
+
+        distances = []
+        for lat, lon in sites:
+            transformer = geometry.azimuthal_transformer(lat, lon)
+            distances.append(
+                [
+                    geometry.section_distance(transformer, section.geometry, section.UpDepth, section.LowDepth)
+                    for section in surfaces.itertuples()
+                ]
+            )
+
+        df0 = pd.DataFrame(
+            np.asarray(distances, dtype='float32').reshape(len(distances), len(surfaces)),
+            columns=pd.Index(surfaces.index, name='section'),
+        )
+        df0.index.name = 'site'
+        toc = time.perf_counter()
+        log.debug('section_distances(): time to calculate %s distances: %2.3f seconds' % (df0.size, toc - tic))
+        return df0
+
+    def rupture_distances(
+        self, sites: Iterable[Tuple[float, float]], max_distance: Optional[float] = None
+    ) -> 'DataFrame[dataframe_models.RuptureDistanceSchema]':
+        """
+        Calculate the minimum distance from each site to each rupture.
+
+        The distance to a rupture is the minimum of the distances to its fault sections. Section
+        distances are reduced over the rupture-section incidence with numpy, and (site, rupture) pairs
+        further away than `max_distance` are dropped, so the result is a sparse form of the
+        sites x ruptures distance matrix.
+
+        Args:
+            sites: a sequence of `(lat, lon)` tuples.
+            max_distance: if given, only include ruptures within this distance (km) of a site.
+
+        Returns:
+            pd.DataFrame: A pandas dataframe conforming to the RuptureDistanceSchema.
+
+        Examples:
+            ```py
+            >>> sites = [(-41.3, 174.78), (-43.53, 172.63)]
+            >>> df = solution.model.rupture_distances(sites, max_distance=100)
+            >>> dense = df.pivot(index='site', columns='Rupture Index', values='distance')
+            ```
+        """
+        rupture_sections = self.rupture_sections
+        ruptures = rupture_sections['rupture'].to_numpy(dtype='int64')
+        sections = rupture_sections['section'].to_numpy(dtype='int64')
+
+        # sort by rupture so that each rupture's sections are contiguous for reduceat
+        order = np.argsort(ruptures, kind='stable')
+        ruptures, sections = ruptures[order], sections[order]
+
+        section_ids = np.unique(sections)
+        section_distances = self.section_distances(sites, section_ids).to_numpy()
+        section_positions = np.searchsorted(section_ids, sections)
+
+        tic = time.perf_counter()
+        frames = []
+        for site, site_distances in enumerate(section_distances):
+            distances = site_distances[section_positions]
+            site_ruptures = ruptures
+            if max_distance is not None:
+                within = distances <= max_distance
+                distances, site_ruptures = distances[within], site_ruptures[within]
+            if not len(site_ruptures):
+                continue
+            starts = np.flatnonzero(np.r_[True, site_ruptures[1:] != site_ruptures[:-1]])
+            frames.append(
+                pd.DataFrame(
+                    {
+                        'site': np.full(len(starts), site, dtype='int32'),
+                        'Rupture Index': site_ruptures[starts],
+                        'distance': np.minimum.reduceat(distances, starts),
+                    }
+                )
+            )
+
+        if frames:
+            df0 = pd.concat(frames, ignore_index=True)
+        else:
+            df0 = pd.DataFrame({'site': [], 'Rupture Index': [], 'distance': []})
+        df0 = df0.astype({'site': 'Int32', 'Rupture Index': 'UInt32', 'distance': 'Float32'})
+        toc = time.perf_counter()
+        log.debug('rupture_distances(): time to reduce section distances: %2.3f seconds' % (toc - tic))
+        return cast('DataFrame[dataframe_models.RuptureDistanceSchema]', df0)
@@ -0,0 +1,104 @@
+"""
+Map rupture ids to the row positions of a rupture table.
+
+Rupture ids are not always a contiguous, 0-based sequence (e.g. in filtered solutions, written in
+non-compatible mode). A `RuptureIdMap` is built once from a table's `Rupture Index` column, and turns
+rupture ids into row positions with numpy fancy indexing, instead of a pandas join or `isin` per lookup.
+
+Classes:
+    RuptureIdMap: map rupture ids to row positions.
+
+Examples:
+    ```py
+    >>> id_map = RuptureIdMap([7, 3, 11])
+    >>> id_map.positions([11, 7, 5])
+    array([ 2,  0, -1])
+    ```
+"""
+
+from typing import Iterable, Union
+
+import numpy as np
+
+# a lookup array is used while the ids are at least this dense (ids per array element)
+MIN_LOOKUP_DENSITY = 0.25
+
+RuptureIds = Union[np.ndarray, Iterable[int]]
+
+
+class RuptureIdMap:
+    """Map (possibly sparse) rupture ids to the row positions of a rupture table.
+
+    Dense ids use a lookup array indexed by id; sparse ids use a binary search of the sorted ids.
+    """
+
+    def __init__(self, rupture_ids: RuptureIds) -> None:
+        """Instantiate a new map.
+
+        Args:
+            rupture_ids: the rupture id of each row, all unique.
+
+        Raises:
+            ValueError: if the rupture ids are not unique, or any are negative.
+        """
+        ids = np.asarray(rupture_ids if isinstance(rupture_ids, np.ndarray) else list(rupture_ids), dtype='int64')
+        if len(ids) and ids.min() < 0:
+            raise ValueError("rupture ids must not be negative")
+        self._size = len(ids)
+        self._max_id = int(ids.max(initial=-1))
+
+        self._lookup = None
+        if self._max_id < 0 or self._size / (self._max_id + 1) >= MIN_LOOKUP_DENSITY:
+            self._lookup = np.full(self._max_id + 1, -1, dtype='int64')
+            self._lookup[ids] = np.arange(self._size)
+            unique = int((self._lookup >= 0).sum()) == self._size
+        else:
+            self._order = np.argsort(ids, kind='stable')
+            self._sorted_ids = ids[self._order]
+            unique = not (self._sorted_ids[1:] == self._sorted_ids[:-1]).any()
+        if not unique:
+            raise ValueError("rupture ids must be unique")
+
+    def __len__(self) -> int:
+        return self._size
+
+    def positions(self, rupture_ids: RuptureIds) -> np.ndarray:
+        """Get the row positions of some rupture ids.
+
+        Args:
+            rupture_ids: the rupture ids to look up.
+
+        Returns:
+            an int64 array of row positions, -1 where an id is not in the table.
+        """
+        ids = np.asarray(rupture_ids if isinstance(rupture_ids, np.ndarray) else list(rupture_ids), dtype='int64')
+        known = (ids >= 0) & (ids <= self._max_id)
+        positions = np.full(len(ids), -1, dtype='int64')
+        if self._lookup is not None:
+            positions[known] = self._lookup[ids[known]]
+        elif self._size:
+            found = np.searchsorted(self._sorted_ids, ids[known])
+            found = np.minimum(found, self._size - 1)
+            matched = self._sorted_ids[found] == ids[known]
+            positions[np.flatnonzero(known)[matched]] = self._order[found[matched]]
+        return positions
+
+    def take(self, rupture_ids: RuptureIds, values: np.ndarray, fill_value=np.nan) -> np.ndarray:
+        """Get the row values of some rupture ids.
+
+        Args:
+            rupture_ids: the rupture ids to look up.
+            values: an array with one value per row of the table.
+            fill_value: the value for ids not in the table.
+
+        Returns:
+            an array of the values of the rupture ids.
+        """
+        positions = self.positions(rupture_ids)
+        values = np.asarray(values)
+        missing = positions < 0
+        if not missing.any():
+            return values[positions]
+        result = np.full(len(positions), fill_value, dtype=np.result_type(values.dtype, np.asarray(fill_value).dtype))
+        result[~missing] = values[positions[~missing]]
+        return result
@@ -0,0 +1,140 @@
+"""
+A lazy relational view of the rupture sections of a solution, with their rupture rates.
+
+The view stands for the `fault_sections_with_rupture_rates` table (the rupture rates and properties,
+joined to each rupture's fault sections) without building it. Rows are selected by rupture or section id
+through the rupture-section index, and only the requested columns are joined, so e.g. the `ParentID` of
+some ruptures never touches the fault section geometries.
+
+Classes:
+    RuptureSectionView: a lazy view of `fault_sections_with_rupture_rates`.
+
+Examples:
+    ```py
+    >>> view = solution.model.rupture_section_view
+    >>> view.for_rupture_ids([0, 1]).to_frame(['Rupture Index', 'ParentID'])
+    ```
+"""
+
+from typing import TYPE_CHECKING, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    from .inversion_solution_model import InversionSolutionModel
+
+
+class RuptureSectionView:
+    """A lazy view of `fault_sections_with_rupture_rates`, resolved on demand.
+
+    Views are immutable: `for_rupture_ids()` and `for_section_ids()` return new, narrower views.
+    """
+
+    def __init__(
+        self,
+        model: 'InversionSolutionModel',
+        rupture_ids: Optional[np.ndarray] = None,
+        section_ids: Optional[np.ndarray] = None,
+    ) -> None:
+        """Instantiate a new view.
+
+        Args:
+            model: the model of the solution.
+            rupture_ids: only include these ruptures (default: all ruptures).
+            section_ids: only include these fault sections (default: all sections).
+        """
+        self._model = model
+        self._rupture_ids = rupture_ids
+        self._section_ids = section_ids
+
+    @staticmethod
+    def _narrow(ids: Optional[np.ndarray], new_ids: Iterable[int]) -> np.ndarray:
+        new_ids = np.unique(np.fromiter(new_ids, dtype='int64'))
+        return new_ids if ids is None else np.intersect1d(ids, new_ids)
+
+    def for_rupture_ids(self, rupture_ids: Iterable[int]) -> 'RuptureSectionView':
+        """Get a view of just some ruptures.
+
+        Args:
+            rupture_ids: the rupture ids to include.
+
+        Returns:
+            a new view.
+        """
+        return RuptureSectionView(self._model, self._narrow(self._rupture_ids, rupture_ids), self._section_ids)
+
+    def for_section_ids(self, section_ids: Iterable[int]) -> 'RuptureSectionView':
+        """Get a view of just some fault sections.
+
+        Args:
+            section_ids: the fault section ids to include.
+
+        Returns:
+            a new view.
+        """
+        return RuptureSectionView(self._model, self._rupture_ids, self._narrow(self._section_ids, section_ids))
+
+    def _rupture_sections(self) -> pd.DataFrame:
+        """Get the rupture-section pairs of the view (not yet matched to rates or fault sections)."""
+        rupture_sections = self._model.rupture_sections
+        pairs = np.ones(len(rupture_sections), dtype=bool)
+        if self._rupture_ids is not None:
+            pairs &= rupture_sections['rupture'].isin(self._rupture_ids).to_numpy()
+        if self._section_ids is not None:
+            pairs &= rupture_sections['section'].isin(self._section_ids).to_numpy()
+        return rupture_sections[pairs]
+
+    @property
+    def columns(self) -> List[str]:
+        """Get the names of all the columns of the view (in table order), without resolving any rows."""
+        solution_file = self._model.solution_file
+        rupture_columns = solution_file.rupture_rates.columns.tolist() + [
+            column for column in solution_file.ruptures.columns if column != "Rupture Index"
+        ]
+        return ['key_0'] + rupture_columns + ['section'] + solution_file.fault_sections.columns.tolist()
+
+    def to_frame(self, columns: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """Resolve the rows of the view.
+
+        Args:
+            columns: the columns to include (default: all columns). Fault section columns are only joined
+                if they are requested.
+
+        Returns:
+            pd.DataFrame: the view rows, as in `fault_sections_with_rupture_rates`.
+        """
+        model = self._model
+        fault_sections = model.solution_file.fault_sections
+        rupture_sections = self._rupture_sections()
+
+        # the rates and properties of the ruptures with sections in the view, in rate table order
+        rupture_ids = np.unique(rupture_sections['rupture'].to_numpy(dtype='int64'))
+        positions = model.rupture_id_map('rupture_rates').positions(rupture_ids)
+        rupture_rates = model.solution_file.rupture_rates.iloc[np.sort(positions[positions >= 0])]
+        ruptures_with_rupture_rates = model._join_ruptures(rupture_rates)
+
+        rs_with_rupture_rates = ruptures_with_rupture_rates.join(
+            rupture_sections.set_index("rupture"),
+            on=ruptures_with_rupture_rates["Rupture Index"],  # type: ignore
+        )
+        section_columns = fault_sections.columns.tolist()
+        if columns is not None:
+            columns = list(columns)
+            section_columns = [column for column in section_columns if column in columns]
+        result = rs_with_rupture_rates.join(fault_sections[section_columns], 'section', how='inner')
+        return result if columns is None else result[columns]
+
+    def __getitem__(self, columns: Union[str, List[str]]) -> Union[pd.Series, pd.DataFrame]:
+        """Resolve one column (as a Series), or a list of columns of the view."""
+        if isinstance(columns, str):
+            return self.to_frame([columns])[columns]
+        return self.to_frame(columns)
+
+    def __len__(self) -> int:
+        """Count the rows of the view from the rupture-section pairs, without joining any tables."""
+        rupture_sections = self._rupture_sections()
+        rupture_ids = rupture_sections['rupture'].to_numpy(dtype='int64')
+        has_rates = self._model.rupture_id_map('rupture_rates').positions(rupture_ids) >= 0
+        has_section = rupture_sections['section'].isin(self._model.solution_file.fault_sections.index).to_numpy()
+        return int(np.count_nonzero(has_rates & has_section))
@@ -0,0 +1,96 @@
+"""
+A process-wide registry of rupture set tables.
+
+All the branch solutions of a fault system share one OpenSHA rupture set, so their `ruptures`,
+`indices`, `average_slips` and `fault_sections` tables are identical. The registry lets every
+`InversionSolutionFile` with the same rupture set share one read-only copy of each table.
+
+Rupture sets are identified by a content hash of their archive members, built from the zip metadata
+(CRC-32 and size) alone, so no member is read to compute it. Tables are held by weak reference,
+and are released when no solution uses them.
+
+Classes:
+    RuptureSetRegistry: a registry of rupture set tables.
+
+Attributes:
+    rupture_set_registry: the process-wide registry instance.
+"""
+
+import hashlib
+import logging
+import threading
+import weakref
+import zipfile
+from typing import TYPE_CHECKING, Callable, Iterable, Tuple, TypeVar
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+log = logging.getLogger(__name__)
+
+TableType = TypeVar('TableType', bound='pd.DataFrame')
+
+
+def rupture_set_content_hash(archive: zipfile.ZipFile, paths: Iterable[str]) -> str:
+    """Hash the rupture set members of an archive from their zip metadata.
+
+    Args:
+        archive: the open archive.
+        paths: the archive paths of the rupture set members.
+
+    Returns:
+        a hex digest identifying the rupture set content.
+    """
+    digest = hashlib.sha1()
+    members = {info.filename: info for info in archive.infolist()}
+    for path in paths:
+        info = members.get(path)
+        digest.update(f"{path}:{info.CRC}:{info.file_size};".encode() if info else f"{path}:-;".encode())
+    return digest.hexdigest()
+
+
+class RuptureSetRegistry:
+    """A thread-safe registry of shared, read-only rupture set tables.
+
+    Tables are keyed by rupture set key and table name, and are held by weak reference.
+    """
+
+    def __init__(self) -> None:
+        self._tables: weakref.WeakValueDictionary[Tuple[str, str], 'pd.DataFrame'] = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+
+    def get_table(self, key: str, name: str, loader: Callable[[], TableType]) -> TableType:
+        """Get a shared table, loading it if it is not registered.
+
+        Args:
+            key: the rupture set key.
+            name: the table name.
+            loader: a function loading the table.
+
+        Returns:
+            the shared table. It must not be modified.
+        """
+        with self._lock:
+            table = self._tables.get((key, name))
+        if table is not None:
+            log.debug('get_table() shared %s for rupture set %s' % (name, key))
+            return table  # type: ignore[return-value]
+
+        table = loader()
+        with self._lock:
+            # if another thread registered the table meanwhile, share theirs
+            return self._tables.setdefault((key, name), table)  # type: ignore[return-value]
+
+    def __contains__(self, key_name: Tuple[str, str]) -> bool:
+        return key_name in self._tables
+
+    def __len__(self) -> int:
+        return len(self._tables)
+
+    def clear(self) -> None:
+        """Remove all tables from the registry."""
+        with self._lock:
+            self._tables.clear()
+
+
+rupture_set_registry = RuptureSetRegistry()
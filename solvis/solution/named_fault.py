@@ -1,12 +1,45 @@
 """A module to produce a named_fault for use with filtering crustal ruptures.
 
 for NSHM_V1.* the Crustal Rupture Sets all use the same Fault Model (form the NZ CFM)
+
+A named fault grouping (e.g. the CFM 1.0A crustal named faults, or regional or subduction segment groups) is
+compiled once per process into a `NamedFaultIndex`: the parent fault ids of each named fault, and the named faults
+of each parent fault id, as CSR arrays. Named fault queries are then vectorised array lookups.
+
+Groupings are registered by scheme name in the `named_fault_registry`, from a file or a dataframe. The filters and
+`SolutionParticipation` take a `grouping` argument: a registered scheme name or a `NamedFaultIndex` (by default,
+the CFM 1.0A grouping, shipped as package data in `solvis/solution/resources/named_faults`).
+
+Classes:
+    NamedFaultIndex: a named fault <-> parent fault ids mapping, compiled to arrays.
+    NamedFaultRegistry: a registry of named fault groupings, compiled on first use.
+
+Attributes:
+    named_fault_registry: the process-wide registry instance.
+
+Examples:
+    ```py
+    >>> index = named_fault.named_fault_index()
+    >>> index.parent_fault_ids(['Ostler', 'Wairarapa'])
+    array([334, 335, 506, 507, 508], dtype=int32)
+    >>> index.named_fault_names([334, 10507])
+    array(['Ostler', None], dtype=object)
+
+    >>> named_fault_registry.register('regions', 'regions.txt')
+    >>> FilterRuptureIds(solution).for_named_fault_names(['Canterbury'], grouping='regions')
+    ```
 """
 
 import csv
+import importlib.resources
+import logging
+import os
+import pathlib
+import threading
 from functools import lru_cache
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 
+import numpy as np
 import pandas as pd
 
 if TYPE_CHECKING:
@@ -14,19 +47,256 @@ if TYPE_CHECKING:
 
     from solvis.solution import dataframe_models  # noqa
 
+log = logging.getLogger(__name__)
+
+CFM_1_0A_DOM_SANSTVZ = 'CFM_1_0A_DOM_SANSTVZ'
 CFM_1_0A_DOM_SANSTVZ_MAP = 'resources/named_faults/cfm_1_0A_no_tvz.xml.FaultsByNameAlt.txt'
 
 
+def _csr_gather(indptr: np.ndarray, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Get the (position in rows, value position) of every value of some rows of a CSR mapping."""
+    starts = indptr[rows]
+    counts = indptr[rows + 1] - starts
+    row_positions = np.repeat(np.arange(len(rows)), counts)
+    value_positions = np.repeat(starts - (np.cumsum(counts) - counts), counts) + np.arange(counts.sum())
+    return row_positions, value_positions
+
+
+class NamedFaultIndex:
+    """A named fault <-> parent fault ids mapping, compiled to arrays.
+
+    The parent fault ids of named fault `i` are `parent_ids[indptr[i]:indptr[i + 1]]` (CSR), and the
+    named faults of parent fault `p` are `parent_name_codes[parent_indptr[p]:parent_indptr[p + 1]]`.
+    """
+
+    def __init__(self, named_fault_names: Sequence[str], parent_fault_ids: Sequence[Sequence[int]]) -> None:
+        """Compile a new index.
+
+        Args:
+            named_fault_names: the unique named fault names.
+            parent_fault_ids: the parent fault ids of each named fault.
+
+        Raises:
+            ValueError: if the named fault names are not unique, or a parent fault id is negative.
+        """
+        self.names = np.asarray(named_fault_names, dtype=object)
+        self._codes = pd.Index(self.names)
+        if not self._codes.is_unique:
+            raise ValueError("named fault names must be unique")
+
+        counts = np.array([len(ids) for ids in parent_fault_ids], dtype='int64')
+        self.indptr = np.concatenate([[0], np.cumsum(counts)])
+        self.parent_ids = np.fromiter(
+            (pid for ids in parent_fault_ids for pid in ids), dtype='int32', count=counts.sum()
+        )
+        if len(self.parent_ids) and self.parent_ids.min() < 0:
+            raise ValueError("parent fault ids must not be negative")
+
+        # the inverse mapping, as CSR arrays indexed by parent fault id
+        name_codes = np.repeat(np.arange(len(self.names), dtype='int32'), counts)
+        order = np.argsort(self.parent_ids, kind='stable')
+        self.parent_name_codes = name_codes[order]
+        parent_counts = np.bincount(self.parent_ids, minlength=int(self.parent_ids.max(initial=-1)) + 1)
+        self.parent_indptr = np.concatenate([[0], np.cumsum(parent_counts)])
+
+    @classmethod
+    def from_file(cls, path) -> 'NamedFaultIndex':
+        """Compile the index of a tab separated file, with a named fault name and its parent fault ids per row.
+
+        Args:
+            path: the file path, or a `Traversable` resource.
+
+        Returns:
+            NamedFaultIndex: the compiled index.
+        """
+        source = path if hasattr(path, 'open') else pathlib.Path(path)
+        with source.open(mode='r', encoding='utf-8-sig') as named_faults:
+            rows = [row for row in csv.reader(named_faults, delimiter='\t') if row]
+        return cls([row[0] for row in rows], [[int(x) for x in row[1:]] for row in rows])
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame) -> 'NamedFaultIndex':
+        """Compile the index of a dataframe.
+
+        Args:
+            frame: either a frame like `named_fault_table()`, indexed by named fault name with a list of
+                `parent_fault_ids` per row, or a frame with `named_fault_name` and `parent_fault_id` columns and
+                a row per (named fault, parent fault) pair.
+
+        Returns:
+            NamedFaultIndex: the compiled index.
+        """
+        if 'parent_fault_ids' in frame.columns:
+            return cls(frame.index.tolist(), frame['parent_fault_ids'].tolist())
+        grouped = frame.groupby('named_fault_name', sort=False)['parent_fault_id'].agg(list)
+        return cls(grouped.index.tolist(), grouped.tolist())
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def name_codes(self, named_fault_names: Iterable[str]) -> np.ndarray:
+        """Get the positions of some named faults in the index.
+
+        Raises:
+            KeyError: if any name is not a known named fault.
+        """
+        names = list(named_fault_names)
+        codes = self._codes.get_indexer(names)
+        if (codes < 0).any():
+            raise KeyError([name for name, code in zip(names, codes) if code < 0])
+        return codes
+
+    def parent_fault_ids(self, named_fault_names: Iterable[str]) -> np.ndarray:
+        """Get the parent fault ids of some named faults.
+
+        Args:
+            named_fault_names: the named fault names.
+
+        Returns:
+            the parent fault ids, in index order (with repeats, for parent faults shared by named faults).
+
+        Raises:
+            KeyError: if any name is not a known named fault.
+        """
+        _, values = _csr_gather(self.indptr, self.name_codes(named_fault_names))
+        return self.parent_ids[values]
+
+    def parent_pairs(self, parent_fault_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Expand some parent fault ids into (position, named fault code) pairs, one per named fault of each.
+
+        Args:
+            parent_fault_ids: the parent fault ids.
+
+        Returns:
+            the position in `parent_fault_ids` and the named fault code of each pair.
+        """
+        parent_fault_ids = np.asarray(parent_fault_ids, dtype='int64')
+        known = np.flatnonzero((parent_fault_ids >= 0) & (parent_fault_ids < len(self.parent_indptr) - 1))
+        rows, values = _csr_gather(self.parent_indptr, parent_fault_ids[known])
+        return known[rows], self.parent_name_codes[values]
+
+    def named_fault_names(self, parent_fault_ids: Iterable[int]) -> np.ndarray:
+        """Get the (first) named fault of some parent fault ids.
+
+        Args:
+            parent_fault_ids: the parent fault ids.
+
+        Returns:
+            an object array of named fault names, None where a parent fault has no named fault.
+        """
+        parent_fault_ids = np.fromiter(parent_fault_ids, dtype='int64')
+        positions, codes = self.parent_pairs(parent_fault_ids)
+        first = np.ones(len(positions), dtype=bool)
+        first[1:] = positions[1:] != positions[:-1]
+        names = np.full(len(parent_fault_ids), None, dtype=object)
+        names[positions[first]] = self.names[codes[first]]
+        return names
+
+
+NamedFaultSource = Union[str, os.PathLike, pd.DataFrame, NamedFaultIndex, 'importlib.resources.abc.Traversable']
+NamedFaultGrouping = Union[str, NamedFaultIndex, None]
+
+
+class NamedFaultRegistry:
+    """A thread-safe registry of named fault groupings, by scheme name.
+
+    Each grouping is compiled into a `NamedFaultIndex` on first use, and kept, so switching between
+    schemes does not compile them again.
+    """
+
+    def __init__(self) -> None:
+        self._sources: Dict[str, NamedFaultSource] = {}
+        self._indexes: Dict[str, NamedFaultIndex] = {}
+        self._lock = threading.Lock()
+
+    def register(self, scheme: str, source: NamedFaultSource, replace: bool = False) -> None:
+        """Register a named fault grouping.
+
+        Args:
+            scheme: the scheme name.
+            source: a tab separated file (see `NamedFaultIndex.from_file()`), a dataframe (see
+                `NamedFaultIndex.from_frame()`) or a compiled index.
+            replace: replace an existing scheme of the same name.
+
+        Raises:
+            ValueError: if the scheme is already registered, and `replace` is False.
+        """
+        with self._lock:
+            if scheme in self._sources and not replace:
+                raise ValueError(f"named fault grouping {scheme!r} is already registered")
+            self._sources[scheme] = source
+            self._indexes.pop(scheme, None)
+
+    def get(self, grouping: NamedFaultGrouping = None) -> NamedFaultIndex:
+        """Get a compiled grouping, compiling it if this is its first use.
+
+        Args:
+            grouping: a registered scheme name, or a compiled index (default: the CFM 1.0A grouping).
+
+        Returns:
+            NamedFaultIndex: the compiled grouping.
+
+        Raises:
+            KeyError: if the scheme is not registered.
+        """
+        if isinstance(grouping, NamedFaultIndex):
+            return grouping
+        scheme = CFM_1_0A_DOM_SANSTVZ if grouping is None else grouping
+        with self._lock:
+            index = self._indexes.get(scheme)
+            if index is not None:
+                return index
+            if scheme not in self._sources:
+                raise KeyError(f"unknown named fault grouping: {scheme!r}")
+            source = self._sources[scheme]
+
+        if isinstance(source, NamedFaultIndex):
+            index = source
+        elif isinstance(source, pd.DataFrame):
+            index = NamedFaultIndex.from_frame(source)
+        else:
+            index = NamedFaultIndex.from_file(source)
+        log.debug('compiled named fault grouping %s: %s named faults' % (scheme, len(index)))
+        with self._lock:
+            # if another thread compiled the grouping meanwhile, share theirs
+            return self._indexes.setdefault(scheme, index)
+
+    def __contains__(self, scheme: str) -> bool:
+        return scheme in self._sources
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._sources))
+
+    def __len__(self) -> int:
+        return len(self._sources)
+
+
+named_fault_registry = NamedFaultRegistry()
+named_fault_registry.register(
+    CFM_1_0A_DOM_SANSTVZ, importlib.resources.files(__package__).joinpath(CFM_1_0A_DOM_SANSTVZ_MAP)
+)
+
+
+def named_fault_index(grouping: NamedFaultGrouping = None) -> NamedFaultIndex:
+    """Get a compiled named fault grouping.
+
+    Args:
+        grouping: a registered scheme name, or a compiled index (default: the CFM 1.0A grouping).
+
+    Returns:
+        NamedFaultIndex: the compiled grouping, from the `named_fault_registry`.
+    """
+    return named_fault_registry.get(grouping)
+
+
 @lru_cache
 def named_fault_table() -> pd.DataFrame:
     """Build a dataframe from the resoource file."""
-    csv_rows = csv.reader(open(CFM_1_0A_DOM_SANSTVZ_MAP, mode='r', encoding='utf-8-sig'), delimiter='\t')
-
-    def reform(row):
-        return (row[0], [int(x) for x in row[1:]])
-
-    reformed = [reform(row) for row in csv_rows]
-    return pd.DataFrame(reformed, columns=['named_fault_name', 'parent_fault_ids']).set_index('named_fault_name')
+    index = named_fault_index()
+    parent_fault_ids: List[List[int]] = [
+        index.parent_ids[start:end].tolist() for start, end in zip(index.indptr[:-1], index.indptr[1:])
+    ]
+    return pd.DataFrame({'parent_fault_ids': parent_fault_ids}, index=pd.Index(index.names, name='named_fault_name'))
 
 
 @lru_cache
@@ -34,19 +304,14 @@ def named_fault_for_parent_ids_table():
     return named_fault_table().explode('parent_fault_ids').reset_index().set_index('parent_fault_ids')
 
 
-@lru_cache
-def get_named_fault_for_parent(parent_fault_id: int) -> Optional[str]:
+def get_named_fault_for_parent(parent_fault_id: int, grouping: NamedFaultGrouping = None) -> Optional[str]:
     """Get a named fault name, given a parent_fault_id.
 
     Args:
         parent_fault_id: the id of the parent fault,
+        grouping: a registered scheme name, or a compiled index (default: the CFM 1.0A grouping).
 
     Returns:
         named_fault_name: the named fault name.
     """
-    df0 = named_fault_for_parent_ids_table()
-    try:
-        res = df0.loc[parent_fault_id]
-        return res.named_fault_name
-    except KeyError:
-        return None
+    return named_fault_index(grouping).named_fault_names([parent_fault_id])[0]
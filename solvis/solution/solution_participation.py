@@ -1,23 +1,26 @@
-"""Module providing the SolutionParticipation helper class."""
+"""Module providing the SolutionParticipation and BranchParticipation helper classes."""
 
 import logging
 import time
 from typing import TYPE_CHECKING, Iterable, Optional, cast
 
+import numpy as np
 import pandas as pd
 
-from solvis.filter import FilterParentFaultIds, FilterSubsectionIds
-from solvis.solution import named_fault
+from solvis.filter import FilterSubsectionIds
 
 if TYPE_CHECKING:
     from pandera.typing import DataFrame
 
     from solvis.solution import dataframe_models
+    from solvis.solution.named_fault import NamedFaultGrouping
 
 log = logging.getLogger(__name__)
 
+MAX_CHUNK_PAIRS = 4_000_000
+
 if TYPE_CHECKING:
-    from solvis import InversionSolution
+    from solvis import FaultSystemSolution, InversionSolution
 
 
 class SolutionParticipation:
@@ -97,6 +100,29 @@ class SolutionParticipation:
         result = result.rename(columns={rate_column: 'participation_rate'})
         return cast('DataFrame[dataframe_models.SectionParticipationSchema]', result)
 
+    def _participation(
+        self, incidence: pd.DataFrame, target: str, rupture_ids: Optional[Iterable[int]]
+    ) -> pd.DataFrame:
+        """Sum the rupture rates over the (rupture, target) incidence pairs, as one weighted bincount."""
+        t0 = time.perf_counter()
+        model = self._solution.model
+        rates = self._solution.solution_file.rupture_rates[model.rate_column_name()]
+        pair_ruptures = incidence['Rupture Index'].to_numpy(dtype='int64')
+
+        # only the ruptures with rates (and in rupture_ids) participate
+        positions = model.rupture_id_map('rupture_rates').positions(pair_ruptures)
+        pairs = positions >= 0
+        if rupture_ids:
+            pairs &= np.isin(pair_ruptures, np.fromiter(rupture_ids, dtype='int64'))
+
+        target_codes, targets = pd.factorize(incidence[target].to_numpy()[pairs], sort=True)
+        pair_rates = rates.to_numpy(dtype='float64', na_value=0.0)[positions[pairs]]
+        participation = np.bincount(target_codes, weights=pair_rates, minlength=len(targets))
+        t1 = time.perf_counter()
+        log.debug(f'{target} participation over {int(pairs.sum())} pairs took : {t1 - t0} seconds')
+        result = pd.DataFrame({'participation_rate': participation}, index=pd.Index(targets, name=target))
+        return result.astype({'participation_rate': rates.dtype})
+
     def fault_participation_rates(
         self, parent_fault_ids: Optional[Iterable[int]] = None, rupture_ids: Optional[Iterable[int]] = None
     ) -> 'DataFrame[dataframe_models.ParentFaultParticipationSchema]':
@@ -120,32 +146,19 @@ class SolutionParticipation:
         Returns:
             pd.DataFrame: a participation rates dataframe
         """
-        subsection_ids = (
-            FilterSubsectionIds(self._solution).for_parent_fault_ids(parent_fault_ids) if parent_fault_ids else None
-        )
-
-        df0 = cast(pd.DataFrame, self._solution.model.rs_with_rupture_rates)
-        if subsection_ids:
-            df0 = df0[df0["section"].isin(subsection_ids)]
-
-        if rupture_ids:
-            df0 = df0[df0["Rupture Index"].isin(rupture_ids)]
-
-        df1 = df0.join(self._solution.solution_file.fault_sections[['ParentID']], on='section')
-        rate_column = self._solution.model.rate_column_name()
-        result = (
-            df1[["ParentID", "Rupture Index", rate_column]]
-            .rename(columns={rate_column: 'participation_rate'})
-            .reset_index(drop=True)
-            .groupby(["ParentID", "Rupture Index"])
-            .agg('first')
-            .groupby("ParentID")
-            .agg('sum')
-        )
+        result = self._participation(self._solution.model.parent_fault_incidence, 'ParentID', rupture_ids)
+        if parent_fault_ids:
+            parent_fault_ids = list(parent_fault_ids)
+            # as before, parent fault ids matching no fault sections do not filter the result
+            if FilterSubsectionIds(self._solution).for_parent_fault_ids(parent_fault_ids):
+                result = result[result.index.isin(parent_fault_ids)]
         return cast('DataFrame[dataframe_models.ParentFaultParticipationSchema]', result)
 
     def named_fault_participation_rates(
-        self, named_fault_names: Optional[Iterable[str]] = None, rupture_ids: Optional[Iterable[int]] = None
+        self,
+        named_fault_names: Optional[Iterable[str]] = None,
+        rupture_ids: Optional[Iterable[int]] = None,
+        grouping: 'NamedFaultGrouping' = None,
     ) -> 'DataFrame[dataframe_models.NamedFaultParticipationSchema]':
         """Calculate the 'participation rate' for parent faults.
 
@@ -155,6 +168,7 @@ class SolutionParticipation:
         Args:
             named_fault_names: the list of named_fault_names to include.
             rupture_ids: calculate participation using only these ruptures (aka Conditional Participation).
+            grouping: a registered named fault scheme name, or a compiled index (default: the CFM 1.0A grouping).
 
         Notes:
          - Passing `named_fault_names` does not affect the rate calculation, only the faults
@@ -167,34 +181,146 @@ class SolutionParticipation:
         Returns:
             pd.DataFrame: a participation rates dataframe
         """
-        parent_fault_ids = (
-            FilterParentFaultIds(self._solution).for_named_fault_names(named_fault_names) if named_fault_names else None
+        result = self._participation(
+            self._solution.model.named_fault_incidence(grouping), 'named_fault_name', rupture_ids
         )
+        if named_fault_names:
+            result = result[result.index.isin(list(named_fault_names))]
+        return cast('DataFrame[dataframe_models.NamedFaultParticipationSchema]', result)
+
+
+class BranchParticipation:
+    r"""Calculate the participation rates of every branch of a FaultSystemSolution.
+
+    The branches x ruptures rate matrix (from `composite_rates`) is multiplied by the ruptures x sections
+    (or parent faults) incidence, giving the participation rate of every section under every branch, without
+    building a solution per branch. The product is a sparse one: each composite rates row is expanded to the
+    incidence pairs of its rupture, a bounded chunk of rows at a time, and summed by (branch, target) code.
+
+    Examples:
+        ```py
+        >>> fss = solvis.FaultSystemSolution.from_archive(filename)
+        >>> rates = BranchParticipation(fss).section_participation_rates()
+        >>> rates.quantile([0.1, 0.9])  # spread of section participation across branches
+        ```
+
+    Methods:
+        section_participation_rates: get rates for fault sections, by branch.
+        fault_participation_rates: get rates for parent faults, by branch.
+    """
+
+    def __init__(self, solution: 'FaultSystemSolution', max_chunk_pairs: int = MAX_CHUNK_PAIRS):
+        """Instantiate a new instance.
 
-        subsection_ids = (
-            FilterSubsectionIds(self._solution).for_parent_fault_ids(parent_fault_ids) if parent_fault_ids else None
+        Args:
+            solution: the subject solution instance.
+            max_chunk_pairs: the most (composite rates row, incidence pair) products expanded at a time.
+        """
+        self._solution = solution
+        self._max_chunk_pairs = max_chunk_pairs
+
+    @property
+    def branch_weights(self) -> pd.Series:
+        """Get the branch weights, indexed by branch solution id (in the row order of the rates)."""
+        columns = self._solution.solution_file.rate_columns(['solution_id', 'weight'], composite=True)
+        weights = pd.Series(columns['weight'], index=pd.Index(columns['solution_id'], name='solution_id'))
+        return weights[~weights.index.duplicated()].rename('weight')
+
+    def _participation(
+        self, pair_ruptures: np.ndarray, pair_targets: np.ndarray, rupture_ids: Optional[Iterable[int]]
+    ) -> pd.DataFrame:
+        """Sum the branch rates over the incidence pairs (rupture, target), by (branch, target) code."""
+        t0 = time.perf_counter()
+        columns = self._solution.solution_file.rate_columns(
+            ['solution_id', 'Rupture Index', 'Annual Rate'], composite=True
+        )
+        branch_codes, branch_ids = pd.factorize(columns['solution_id'])
+        rate_ruptures = columns['Rupture Index'].astype('int64')
+        rates = columns['Annual Rate'].astype('float64')
+        if rupture_ids:
+            keep = np.isin(rate_ruptures, np.fromiter(rupture_ids, dtype='int64'))
+            branch_codes, rate_ruptures, rates = branch_codes[keep], rate_ruptures[keep], rates[keep]
+
+        # the incidence pairs of each rupture are pair_order[indptr[rupture]:indptr[rupture + 1]]
+        target_codes, targets = pd.factorize(pair_targets, sort=True)
+        pair_order = np.argsort(pair_ruptures, kind='stable')
+        size = max(int(pair_ruptures.max(initial=-1)), int(rate_ruptures.max(initial=-1))) + 1
+        indptr = np.concatenate([[0], np.cumsum(np.bincount(pair_ruptures, minlength=size))])
+
+        # expand each branch rate to the incidence pairs of its rupture, a chunk of rows at a time
+        row_ends = np.cumsum(indptr[rate_ruptures + 1] - indptr[rate_ruptures])
+        result = np.zeros(len(branch_ids) * len(targets), dtype='float64')
+        start = 0
+        while start < len(rates):
+            chunk_pairs = row_ends[start - 1] + self._max_chunk_pairs if start else self._max_chunk_pairs
+            stop = max(int(np.searchsorted(row_ends, chunk_pairs, side='right')), start + 1)
+            starts = indptr[rate_ruptures[start:stop]]
+            counts = indptr[rate_ruptures[start:stop] + 1] - starts
+            rows = np.repeat(np.arange(start, stop), counts)
+            pairs = pair_order[np.repeat(starts - (np.cumsum(counts) - counts), counts) + np.arange(counts.sum())]
+            codes = branch_codes[rows] * len(targets) + target_codes[pairs]
+            result += np.bincount(codes, weights=rates[rows], minlength=len(result))
+            start = stop
+        t1 = time.perf_counter()
+        log.debug(f'branch participation for {len(branch_ids)} branches took : {t1 - t0} seconds')
+        return pd.DataFrame(
+            result.reshape(len(branch_ids), len(targets)).astype('float32'),
+            index=pd.Index(branch_ids, name='solution_id'),
+            columns=targets,
         )
 
-        df0 = cast(pd.DataFrame, self._solution.model.rs_with_rupture_rates)
+    def section_participation_rates(
+        self, subsection_ids: Optional[Iterable[int]] = None, rupture_ids: Optional[Iterable[int]] = None
+    ) -> pd.DataFrame:
+        """Calculate the 'participation rate' for fault subsections, under every branch.
+
+        Args:
+            subsection_ids: the list of subsection_ids to include.
+            rupture_ids: calculate participation using only these ruptures (aka `Conditional Participation`).
+
+        Notes:
+         - As for `SolutionParticipation.section_participation_rates`, `subsection_ids` only selects the
+           sections returned, while `rupture_ids` affects the rates.
+         - The `branch_weights` weighted sum of the rows is the participation of the aggregate
+           `rate_weighted_mean`.
+
+        Returns:
+            pd.DataFrame: a branches x sections participation rates matrix, indexed by `solution_id`
+                with a column per `section`.
+        """
+        rupture_sections = self._solution.model.rupture_sections
+        result = self._participation(
+            rupture_sections['rupture'].to_numpy(dtype='int64'),
+            rupture_sections['section'].to_numpy(dtype='int64'),
+            rupture_ids,
+        )
+        result.columns.name = 'section'
         if subsection_ids:
-            df0 = df0[df0["section"].isin(subsection_ids)]
+            result = result[result.columns[result.columns.isin(list(subsection_ids))]]
+        return result
 
-        if rupture_ids:
-            df0 = df0[df0["Rupture Index"].isin(rupture_ids)]
+    def fault_participation_rates(
+        self, parent_fault_ids: Optional[Iterable[int]] = None, rupture_ids: Optional[Iterable[int]] = None
+    ) -> pd.DataFrame:
+        """Calculate the 'participation rate' for parent faults, under every branch.
 
-        df1 = df0.join(self._solution.solution_file.fault_sections[['ParentID']], on='section')
-        df2 = df1.join(named_fault.named_fault_for_parent_ids_table(), 'ParentID', how='outer')
-        df2 = df2.drop(columns=['ParentID'])
+        Each rupture counts once for each parent fault it involves.
 
-        rate_column = self._solution.model.rate_column_name()
+        Args:
+            parent_fault_ids: the list of parent_fault_ids to include.
+            rupture_ids: calculate participation using only these ruptures (aka Conditional Participation).
 
-        result = (
-            df2[["named_fault_name", "Rupture Index", rate_column]]
-            .rename(columns={rate_column: 'participation_rate'})
-            .reset_index(drop=True)
-            .groupby(["named_fault_name", "Rupture Index"])
-            .agg('first')
-            .groupby("named_fault_name")
-            .agg('sum')
+        Returns:
+            pd.DataFrame: a branches x parent faults participation rates matrix, indexed by `solution_id`
+                with a column per `ParentID`.
+        """
+        incidence = self._solution.model.parent_fault_incidence
+        result = self._participation(
+            incidence['Rupture Index'].to_numpy(dtype='int64'),
+            incidence['ParentID'].to_numpy(dtype='int64'),
+            rupture_ids,
         )
-        return cast('DataFrame[dataframe_models.NamedFaultParticipationSchema]', result)
+        result.columns.name = 'ParentID'
+        if parent_fault_ids:
+            result = result[result.columns[result.columns.isin(list(parent_fault_ids))]]
+        return result
@@ -40,6 +40,29 @@ def create_crustal_section_surface(section: gpd.GeoDataFrame) -> gpd.GeoDataFram
     )
 
 
+def build_fault_surfaces(fault_sections: gpd.GeoDataFrame, fault_regime: str) -> gpd.GeoDataFrame:
+    """Calculate the geometry of fault section surfaces projected onto the earth surface.
+
+    Args:
+        fault_sections: the fault sections to build surfaces for.
+        fault_regime: the fault regime of the solution (`CRUSTAL` or `SUBDUCTION`).
+
+    Returns:
+        a gpd.GeoDataFrame
+    """
+    new_geometry_df: gpd.GeoDataFrame = fault_sections.copy()
+    if fault_regime == 'SUBDUCTION':
+        return new_geometry_df.set_geometry(
+            [create_subduction_section_surface(section) for i, section in new_geometry_df.iterrows()]
+        )
+    elif fault_regime == 'CRUSTAL':
+        return new_geometry_df.set_geometry(
+            [create_crustal_section_surface(section) for i, section in new_geometry_df.iterrows()]
+        )
+    else:  # pragma: no cover
+        raise RuntimeError(f'Unable to render fault_surfaces for fault regime {fault_regime}')
+
+
 class SolutionSurfacesBuilder:
     """A class to build solution surfaces."""
 
@@ -53,19 +76,10 @@ class SolutionSurfacesBuilder:
             a gpd.GeoDataFrame
         """
         tic = time.perf_counter()
-        new_geometry_df: gpd.GeoDataFrame = self._solution.solution_file.fault_sections.copy()
+        fault_sections = self._solution.solution_file.fault_sections
         toc = time.perf_counter()
         log.debug('time to load fault_sections: %2.3f seconds' % (toc - tic))
-        if self._solution.fault_regime == 'SUBDUCTION':
-            return new_geometry_df.set_geometry(
-                [create_subduction_section_surface(section) for i, section in new_geometry_df.iterrows()]
-            )
-        elif self._solution.fault_regime == 'CRUSTAL':
-            return new_geometry_df.set_geometry(
-                [create_crustal_section_surface(section) for i, section in new_geometry_df.iterrows()]
-            )
-        else:  # pragma: no cover
-            raise RuntimeError(f'Unable to render fault_surfaces for fault regime {self._solution.fault_regime}')
+        return build_fault_surfaces(fault_sections, self._solution.fault_regime)
 
     def rupture_surface(self, rupture_id: int) -> gpd.GeoDataFrame:
         """Calculate the geometry of the rupture surfaces projected onto the earth surface.
@@ -77,10 +91,9 @@ class SolutionSurfacesBuilder:
             a gpd.GeoDataFrame
         """
         tic = time.perf_counter()
-        df0 = self._solution.model.fault_sections_with_rupture_rates.copy()
+        rupt: gpd.DataFrame = self._solution.model.rupture_section_view.for_rupture_ids([rupture_id]).to_frame()
         toc = time.perf_counter()
-        log.debug('time to load fault_sections_with_rupture_rates: %2.3f seconds' % (toc - tic))
-        rupt: gpd.DataFrame = df0[df0["Rupture Index"] == rupture_id]
+        log.debug('time to load rupture %s sections with rupture rates: %2.3f seconds' % (rupture_id, toc - tic))
         if self._solution.fault_regime == 'SUBDUCTION':
             return rupt.set_geometry([create_subduction_section_surface(section) for i, section in rupt.iterrows()])
         elif self._solution.fault_regime == 'CRUSTAL':
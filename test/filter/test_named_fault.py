@@ -1,3 +1,8 @@
+import importlib.resources
+
+import pandas as pd
+import pytest
+
 from solvis.solution import named_fault
 
 
@@ -22,3 +27,61 @@ def test_named_fault_for_parent_ids_table():
     assert df0.loc[334].named_fault_name == 'Ostler'
     assert df0.loc[335].named_fault_name == 'Ostler'
     assert df0.loc[507].named_fault_name == 'Wairarapa'
+
+
+def test_named_fault_index_is_package_data(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # not relative to the working directory
+    registry = named_fault.NamedFaultRegistry()
+    source = importlib.resources.files('solvis.solution').joinpath(named_fault.CFM_1_0A_DOM_SANSTVZ_MAP)
+    registry.register(named_fault.CFM_1_0A_DOM_SANSTVZ, source)
+    index = registry.get()
+    assert len(index) == len(named_fault.named_fault_table())
+    assert index is registry.get()  # compiled once
+
+
+def test_named_fault_index_lookups():
+    index = named_fault.named_fault_index()
+    assert index.parent_fault_ids(['Ostler', 'Wairarapa']).tolist() == [334, 335, 506, 507, 508]
+    assert index.named_fault_names([507, 10507, 334]).tolist() == ['Wairarapa', None, 'Ostler']
+    with pytest.raises(KeyError):
+        index.parent_fault_ids(['Ostler', 'Not a fault'])
+
+
+def test_named_fault_index_shared_parents(tmp_path):
+    path = tmp_path / 'named_faults.txt'
+    path.write_text('North\t1\t2\nSouth\t2\t5\n')
+    index = named_fault.NamedFaultIndex.from_file(path)
+    positions, name_codes = index.parent_pairs([5, 2, 9, 1])
+    assert list(zip(positions.tolist(), index.names[name_codes].tolist())) == [
+        (0, 'South'),
+        (1, 'North'),
+        (1, 'South'),
+        (3, 'North'),
+    ]
+    assert index.named_fault_names([2, 9]).tolist() == ['North', None]
+
+    with pytest.raises(ValueError):
+        named_fault.NamedFaultIndex(['North', 'North'], [[1], [2]])
+
+
+def test_named_fault_registry(tmp_path):
+    registry = named_fault.NamedFaultRegistry()
+    path = tmp_path / 'regions.txt'
+    path.write_text('North\t1\t2\nSouth\t5\n')
+    registry.register('regions', path)
+    registry.register('segments', pd.DataFrame({'named_fault_name': ['A', 'A', 'B'], 'parent_fault_id': [1, 5, 9]}))
+    assert sorted(registry) == ['regions', 'segments'] and 'regions' in registry
+
+    regions = registry.get('regions')
+    assert regions.parent_fault_ids(['North']).tolist() == [1, 2]
+    assert registry.get('segments').parent_fault_ids(['A']).tolist() == [1, 5]
+    assert registry.get('regions') is regions  # not compiled again
+    assert registry.get(regions) is regions
+
+    with pytest.raises(ValueError):
+        registry.register('regions', path)
+    registry.register('regions', named_fault.named_fault_table(), replace=True)
+    assert registry.get('regions').parent_fault_ids(['Ostler']).tolist() == [334, 335]
+
+    with pytest.raises(KeyError):
+        registry.get('nope')
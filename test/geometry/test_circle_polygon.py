@@ -3,9 +3,10 @@
 import unittest
 
 import numpy as np
+import pytest
 from shapely.geometry import LineString
 
-from solvis.geometry import circle_polygon
+from solvis.geometry import circle_polygon, circle_polygons
 
 
 class TestCirclePoly(unittest.TestCase):
@@ -45,3 +46,66 @@ class TestCirclePolyIntersections(unittest.TestCase):
         self.assertFalse(line.intersects(polygon))
         self.assertFalse(line.within(polygon))
         self.assertFalse(polygon.contains(line))
+
+
+# vertices 0, 8, 20, 37 and 50 of circles built with the original per-call pyproj AEQD implementation
+AEQD_CIRCLE_VERTICES = [
+    (
+        (2e5, -38.662334, 178.017654),  # Gisborne, crossing the antimeridian
+        [
+            (180.320638348, -38.639751993),
+            (179.67599376, -39.922562081),
+            (177.114985472, -40.320635441),
+            (176.010116613, -37.79720579),
+            (178.456366721, -36.897422713),
+        ],
+    ),
+    (
+        (1e5, -45.0, -179.5),  # centred west of the antimeridian
+        [
+            (181.771728386, -44.992942648),
+            (181.409414206, -45.632334633),
+            (180.006099942, -45.829810874),
+            (179.386631275, -44.570627177),
+            (180.744378743, -44.117695391),
+        ],
+    ),
+    (
+        (5e4, -77.85, 166.67),  # high latitude
+        [
+            (168.805496918, -77.841807087),
+            (168.220316975, -78.163750973),
+            (165.823968346, -78.264189751),
+            (164.818263666, -77.6317678),
+            (167.072413458, -77.408678305),
+        ],
+    ),
+]
+
+
+class TestCirclePolygons(unittest.TestCase):
+    def test_circle_polygons_match_aeqd_reference(self):
+        radii, lats, lons = zip(*(circle for circle, _ in AEQD_CIRCLE_VERTICES))
+        polygons = circle_polygons(lats, lons, radii)
+
+        assert len(polygons) == len(AEQD_CIRCLE_VERTICES)
+        for polygon, (circle, expected) in zip(polygons, AEQD_CIRCLE_VERTICES):
+            coords = np.asarray(polygon.exterior.coords)
+            assert len(coords) == 65
+            assert np.allclose(coords[[0, 8, 20, 37, 50]], expected, rtol=0, atol=1e-8)
+            single = np.asarray(circle_polygon(*circle).exterior.coords)
+            assert np.allclose(single[[0, 8, 20, 37, 50]], expected, rtol=0, atol=1e-8)
+
+    def test_circle_polygons_broadcast_radius(self):
+        polygons = circle_polygons([-38.662334, -41.276825], [178.017654, 174.777969], 2e5)
+        assert len(polygons) == 2
+        assert polygons[0].bounds == pytest.approx(
+            (175.7146696515645, -40.46097721183747, 180.32063834843552, -36.86369078816255)
+        )
+
+    def test_circle_polygons_wrap_negative_longitudes(self):
+        polygons = circle_polygons(-45.0, -179.5, [1e5, 2e5])
+        for polygon in polygons:
+            lon, lat = np.hsplit(np.asarray(polygon.exterior.coords), 2)
+            assert min(lon) >= 0
+            assert polygon.is_valid
@@ -104,3 +104,29 @@ def test_scale_rupture_rates_for_no_rupture_ids(puysegur_small_fixture):
     assert (new_sol.solution_file.rupture_rates["Annual Rate"]).sum() == sol.solution_file.rupture_rates[
         "Annual Rate"
     ].sum()
+
+
+def test_scale_rupture_rates_shares_tables(puysegur_small_fixture):
+    sol = puysegur_small_fixture
+    new_sol = InversionSolution.scale_rupture_rates(solution=sol, scale=0.5)
+
+    assert new_sol.solution_file.ruptures is sol.solution_file.ruptures
+    assert new_sol.solution_file.indices is sol.solution_file.indices
+    assert new_sol.solution_file.average_slips is sol.solution_file.average_slips
+    assert new_sol.solution_file.fault_sections is sol.solution_file.fault_sections
+    assert new_sol.solution_file.rupture_rates is not sol.solution_file.rupture_rates
+
+
+def test_stacked_rupture_rates(puysegur_small_fixture):
+    sol = puysegur_small_fixture
+    scales = [0.5, 1.0, 2.0]
+    rupture_ids = list(FilterRuptureIds(sol, drop_zero_rates=True).for_magnitude(max_mag=7.5))
+
+    stacked = InversionSolution.stacked_rupture_rates(sol, scales, rupture_ids)
+
+    assert stacked.shape == (3, sol.solution_file.rupture_rates.shape[0])
+    assert stacked.index.tolist() == scales
+    for scale, rates in stacked.iterrows():
+        new_sol = InversionSolution.scale_rupture_rates(solution=sol, scale=scale, rupture_ids=rupture_ids)
+        expected = new_sol.solution_file.rupture_rates.set_index('Rupture Index')['Annual Rate']
+        assert rates.to_numpy() == pytest.approx(expected[stacked.columns].to_numpy())
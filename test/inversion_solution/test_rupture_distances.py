@@ -0,0 +1,53 @@
+#! test_rupture_distances.py
+import pytest
+from pytest import approx
+
+from solvis.solution.dataframe_models import RuptureDistanceSchema
+
+pyvista = pytest.importorskip("pyvista")
+
+SITES = [(-41.276825, 174.777969), (-43.525650, 172.639847)]  # WLG, CHC
+
+
+@pytest.fixture(scope='module')
+def rupture_distances(tiny_crustal_solution_fixture):
+    return tiny_crustal_solution_fixture.model.rupture_distances(SITES)
+
+
+def test_rupture_distances_model(rupture_distances):
+    RuptureDistanceSchema.validate(rupture_distances)
+
+
+def test_rupture_distances_covers_all_ruptures(tiny_crustal_solution_fixture, rupture_distances):
+    ruptures = set(tiny_crustal_solution_fixture.model.rupture_sections['rupture'])
+    for site in range(len(SITES)):
+        assert set(rupture_distances[rupture_distances.site == site]['Rupture Index']) == ruptures
+
+
+def test_rupture_distances_are_section_minimum(tiny_crustal_solution_fixture, rupture_distances):
+    model = tiny_crustal_solution_fixture.model
+    section_distances = model.section_distances(SITES[:1])
+    df0 = model.rupture_sections.join(section_distances.iloc[0].rename('distance'), on='section')
+    expected = df0.groupby('rupture')['distance'].min()
+
+    actual = rupture_distances[rupture_distances.site == 0].set_index('Rupture Index')['distance']
+    assert len(actual) == len(expected)
+    for rupture_id, distance in expected.items():
+        assert actual.loc[rupture_id] == approx(distance)
+
+
+def test_rupture_distances_max_distance(tiny_crustal_solution_fixture, rupture_distances):
+    max_distance = rupture_distances.distance.median()
+    pruned = tiny_crustal_solution_fixture.model.rupture_distances(SITES, max_distance=max_distance)
+    RuptureDistanceSchema.validate(pruned)
+
+    expected = rupture_distances[rupture_distances.distance <= max_distance].reset_index(drop=True)
+    assert 0 < len(pruned) < len(rupture_distances)
+    assert pruned.distance.max() <= max_distance
+    assert pruned[['site', 'Rupture Index']].values.tolist() == expected[['site', 'Rupture Index']].values.tolist()
+
+
+def test_rupture_distances_none_within_max_distance(tiny_crustal_solution_fixture):
+    pruned = tiny_crustal_solution_fixture.model.rupture_distances(SITES, max_distance=0)
+    assert len(pruned) == 0
+    RuptureDistanceSchema.validate(pruned)
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from solvis import InversionSolution
+from solvis.solution.inversion_solution import RuptureIdMap
+
+RUPTURE_IDS = {
+    'dense': [3, 0, 2, 1],
+    'sparse': [7, 3, 1000, 11],
+}
+
+
+@pytest.mark.parametrize("ids", RUPTURE_IDS.values(), ids=RUPTURE_IDS.keys())
+def test_positions(ids):
+    id_map = RuptureIdMap(ids)
+    assert len(id_map) == 4
+    assert id_map.positions(ids).tolist() == [0, 1, 2, 3]
+    assert id_map.positions([ids[2], 5, -1, 100_000]).tolist() == [2, -1, -1, -1]
+    assert id_map.positions(np.array([], dtype='int64')).tolist() == []
+
+
+@pytest.mark.parametrize("ids", RUPTURE_IDS.values(), ids=RUPTURE_IDS.keys())
+def test_take(ids):
+    id_map = RuptureIdMap(ids)
+    values = np.array([10, 11, 12, 13])
+    assert id_map.take(ids[::-1], values).tolist() == [13, 12, 11, 10]
+    taken = id_map.take([ids[1], 5], values)
+    assert taken[0] == 11 and np.isnan(taken[1])
+
+
+def test_empty():
+    id_map = RuptureIdMap([])
+    assert id_map.positions([0, 1]).tolist() == [-1, -1]
+    assert np.isnan(id_map.take([0], np.array([]))).all()
+
+
+@pytest.mark.parametrize("ids", [[1, 2, 1], [5, 1000, 5], [-1, 2]])
+def test_invalid_ids(ids):
+    with pytest.raises(ValueError):
+        RuptureIdMap(ids)
+
+
+def test_model_rupture_id_map(puysegur_small_fixture):
+    sol = InversionSolution.filter_solution(puysegur_small_fixture, [9, 3, 5])
+    id_map = sol.model.rupture_id_map('average_slips')
+    assert sol.model.rupture_id_map('average_slips') is id_map
+    assert id_map.positions([3, 5, 9, 4]).tolist() == [0, 1, 2, -1]
+    with pytest.raises(ValueError):
+        sol.model.rupture_id_map('fault_sections')
+
+
+def test_solution_slip_rates_of_filtered_solution(crustal_solution_fixture):
+    sol = crustal_solution_fixture
+    rupture_ids = sol.solution_file.rupture_rates['Rupture Index'].tolist()[::2]
+    filtered = InversionSolution.filter_solution(sol, rupture_ids)
+
+    # only the filtered ruptures contribute
+    expected = InversionSolution.scale_rupture_rates(
+        sol, 0.0, sorted(set(range(len(sol.solution_file.ruptures))) - set(rupture_ids))
+    )
+    assert filtered.model.fault_sections_with_solution_slip_rates['Solution Slip Rate'].tolist() == pytest.approx(
+        expected.model.fault_sections_with_solution_slip_rates['Solution Slip Rate'].tolist()
+    )
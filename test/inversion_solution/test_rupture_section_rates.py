@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from solvis.solution.dataframe_models import RuptureSectionRateSchema
+
+
+@pytest.fixture(params=['crustal_solution_fixture', 'crustal_small_fss_fixture'])
+def solution(request):
+    return request.getfixturevalue(request.param)
+
+
+def test_rupture_section_rates(solution):
+    model = solution.model
+    compact = model.rupture_section_rates
+    RuptureSectionRateSchema.validate(compact)
+
+    full = model.rs_with_rupture_rates.dropna(subset=['section'])
+    assert compact['Rupture Index'].tolist() == full['Rupture Index'].tolist()
+    assert compact['section'].tolist() == full['section'].tolist()
+    rate_column = model.rate_column_name()
+    assert compact[rate_column].dtype == 'float32'
+    assert np.allclose(compact[rate_column], full[rate_column].astype('float64'))
+    assert np.allclose(compact['Magnitude'], full['Magnitude'].astype('float64'))
+
+
+def test_with_columns(solution):
+    model = solution.model
+    compact = model.rupture_section_rates
+    full = model.fault_sections_with_rupture_rates
+
+    gathered = model.with_section_columns(compact, ['ParentName', 'section', 'geometry'])
+    gathered = model.with_rupture_columns(gathered, ['Area (m^2)'])
+    assert gathered.columns[-3:].tolist() == ['ParentName', 'geometry', 'Area (m^2)']
+    assert gathered['ParentName'].tolist() == full['ParentName'].tolist()
+    assert gathered['geometry'].tolist() == full['geometry'].tolist()
+    assert gathered['Area (m^2)'].tolist() == full['Area (m^2)'].tolist()
+
+
+def test_memory_report(solution):
+    estimate = solution.model.memory_report()
+    measured = solution.model.memory_report(full=True)
+    assert measured['rows'].tolist() == estimate['rows'].tolist()
+    assert (measured['compact_bytes'] < measured['full_bytes']).all()
+    assert estimate['saving'].to_numpy() == pytest.approx(measured['saving'].to_numpy(), abs=0.1)
@@ -0,0 +1,54 @@
+import pytest
+
+from solvis.solution.inversion_solution import RuptureSectionView
+
+
+@pytest.fixture(params=['crustal_solution_fixture', 'crustal_small_fss_fixture'])
+def solution(request):
+    return request.getfixturevalue(request.param)
+
+
+@pytest.fixture
+def materialised(solution):
+    # the fault_sections_with_rupture_rates table, as it was built before the view
+    model = solution.model
+    return model.rs_with_rupture_rates.join(solution.solution_file.fault_sections, 'section', how='inner')
+
+
+def test_view_of_everything(solution, materialised):
+    view = solution.model.rupture_section_view
+    assert isinstance(view, RuptureSectionView)
+    assert view.columns == materialised.columns.tolist()
+    assert len(view) == len(materialised)
+    assert solution.model.fault_sections_with_rupture_rates.equals(materialised)
+
+
+def test_view_rows_and_columns(solution, materialised):
+    rupture_ids = materialised['Rupture Index'].unique().tolist()[:5]
+    section_ids = materialised['section'].unique().tolist()[:20]
+    view = solution.model.rupture_section_view.for_rupture_ids(rupture_ids)
+
+    expected = materialised[materialised['Rupture Index'].isin(rupture_ids)]
+    assert view.to_frame().equals(expected)
+    assert view['ParentID'].tolist() == expected['ParentID'].tolist()
+
+    narrower = view.for_section_ids(section_ids)
+    expected = expected[expected['section'].isin(section_ids)]
+    assert narrower[['Rupture Index', 'section']].equals(expected[['Rupture Index', 'section']])
+
+    assert len(view.for_rupture_ids([-1])) == 0
+
+
+def test_view_len_and_columns_do_not_join(solution, materialised, monkeypatch):
+    rupture_ids = materialised['Rupture Index'].unique().tolist()[:5]
+    section_ids = materialised['section'].unique().tolist()[:20]
+    view = solution.model.rupture_section_view
+    expected = [len(view.to_frame()), len(view.for_rupture_ids(rupture_ids).for_section_ids(section_ids).to_frame())]
+
+    def fail(*args, **kwargs):
+        raise AssertionError("the view was resolved")
+
+    monkeypatch.setattr(RuptureSectionView, 'to_frame', fail)
+    monkeypatch.setattr(type(solution.model), '_join_ruptures', fail)
+    assert view.columns == materialised.columns.tolist()
+    assert [len(view), len(view.for_rupture_ids(rupture_ids).for_section_ids(section_ids))] == expected
@@ -0,0 +1,66 @@
+import io
+import pathlib
+from test.conftest import MINI_ARCHIVES, branch_solutions, folder, fslt
+
+import pandas as pd
+import pytest
+
+from solvis import InversionSolution
+from solvis.solution.inversion_solution import RuptureSetRegistry, rupture_set_registry
+
+RUPTURE_SET_TABLES = ['ruptures', 'indices', 'average_slips', 'fault_sections']
+
+
+def small_archive(code: str) -> pathlib.Path:
+    return pathlib.Path(folder, 'fixtures', MINI_ARCHIVES[code])
+
+
+@pytest.mark.parametrize("table", RUPTURE_SET_TABLES)
+def test_solutions_share_rupture_set_tables(table):
+    sol_a = InversionSolution.from_archive(small_archive('PUY'))
+    sol_b = InversionSolution.from_archive(small_archive('PUY'))
+    assert sol_a.solution_file.rupture_set_key == sol_b.solution_file.rupture_set_key
+    assert getattr(sol_a.solution_file, table) is getattr(sol_b.solution_file, table)
+
+
+def test_solution_from_buffer_shares_rupture_set_tables():
+    sol_a = InversionSolution.from_archive(small_archive('PUY'))
+    sol_b = InversionSolution.from_archive(io.BytesIO(small_archive('PUY').read_bytes()))
+    assert sol_a.solution_file.ruptures is sol_b.solution_file.ruptures
+
+
+def test_different_rupture_sets_are_not_shared():
+    puy = InversionSolution.from_archive(small_archive('PUY'))
+    hik = InversionSolution.from_archive(small_archive('HIK'))
+    assert puy.solution_file.rupture_set_key != hik.solution_file.rupture_set_key
+    assert puy.solution_file.ruptures is not hik.solution_file.ruptures
+
+
+def test_branch_solutions_share_rupture_set_tables():
+    solutions = list(branch_solutions(fslt, archive=MINI_ARCHIVES['PUY']))
+    assert len(solutions) > 1
+    for table in RUPTURE_SET_TABLES:
+        assert all(getattr(sol.solution_file, table) is getattr(solutions[0].solution_file, table) for sol in solutions)
+
+
+def test_in_memory_solution_has_no_rupture_set_key():
+    assert InversionSolution().solution_file.rupture_set_key is None
+
+
+def test_registry_releases_unused_tables():
+    registry = RuptureSetRegistry()
+    table = registry.get_table('key', 'ruptures', lambda: pd.DataFrame({'a': [1]}))
+    assert ('key', 'ruptures') in registry
+    assert registry.get_table('key', 'ruptures', pd.DataFrame) is table
+    del table
+    assert ('key', 'ruptures') not in registry
+    assert len(registry) == 0
+
+
+def test_module_registry_clear():
+    sol = InversionSolution.from_archive(small_archive('CRU'))
+    ruptures = sol.solution_file.ruptures
+    assert (sol.solution_file.rupture_set_key, 'ruptures') in rupture_set_registry
+    rupture_set_registry.clear()
+    assert (sol.solution_file.rupture_set_key, 'ruptures') not in rupture_set_registry
+    assert InversionSolution.from_archive(small_archive('CRU')).solution_file.ruptures is not ruptures
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from solvis.filter import FilterRuptureIds
+from solvis.solution import BranchParticipation, SolutionParticipation
+
+
+def test_branch_section_participation_shape(crustal_small_fss_fixture):
+    solution = crustal_small_fss_fixture
+    rates = BranchParticipation(solution).section_participation_rates()
+    branch_ids = solution.model.composite_rates['solution_id'].unique()
+    assert sorted(rates.index) == sorted(branch_ids)
+    assert rates.index.name == 'solution_id'
+    assert rates.columns.name == 'section'
+    assert set(rates.columns) == set(solution.model.rupture_sections['section'])
+
+
+@pytest.mark.parametrize("conditional", [False, True])
+def test_branch_section_participation_matches_branch_rates(crustal_small_fss_fixture, conditional):
+    solution = crustal_small_fss_fixture
+    rupture_ids = list(FilterRuptureIds(solution).for_magnitude(min_mag=7.0)) if conditional else None
+    rates = BranchParticipation(solution).section_participation_rates(rupture_ids=rupture_ids)
+    composite_rates = solution.model.composite_rates.reset_index(drop=True)
+    if conditional:
+        composite_rates = composite_rates[composite_rates['Rupture Index'].isin(rupture_ids)]
+    rupture_sections = solution.model.rupture_sections
+    for solution_id in rates.index:
+        branch_rates = composite_rates[composite_rates.solution_id == solution_id]
+        df = rupture_sections.merge(branch_rates, left_on='rupture', right_on='Rupture Index')
+        expected = df.groupby('section')['Annual Rate'].sum()
+        assert rates.loc[solution_id, expected.index].tolist() == pytest.approx(expected.tolist(), rel=1e-6)
+
+
+def test_weighted_branch_participation_is_aggregate_participation(crustal_small_fss_fixture):
+    solution = crustal_small_fss_fixture
+    participation = BranchParticipation(solution)
+    rates = participation.section_participation_rates()
+    weighted = participation.branch_weights.loc[rates.index] @ rates
+    expected = SolutionParticipation(solution).section_participation_rates().participation_rate
+    assert weighted[expected.index].tolist() == pytest.approx(expected.tolist(), rel=1e-5)
+
+
+def test_branch_section_participation_filters(crustal_small_fss_fixture):
+    solution = crustal_small_fss_fixture
+    rupture_ids = list(FilterRuptureIds(solution).for_magnitude(min_mag=7.0))
+    all_rates = BranchParticipation(solution).section_participation_rates()
+    rates = BranchParticipation(solution).section_participation_rates(subsection_ids=[5, 6], rupture_ids=rupture_ids)
+    assert list(rates.columns) == [5, 6]
+    assert (rates.to_numpy() <= all_rates[[5, 6]].to_numpy() + 1e-12).all()
+
+
+def test_branch_fault_participation(crustal_small_fss_fixture):
+    solution = crustal_small_fss_fixture
+    participation = BranchParticipation(solution)
+    rates = participation.fault_participation_rates()
+    assert rates.columns.name == 'ParentID'
+
+    # rupture rates count once per parent fault
+    weighted = participation.branch_weights.loc[rates.index] @ rates
+    expected = SolutionParticipation(solution).fault_participation_rates().participation_rate
+    assert weighted[expected.index].tolist() == pytest.approx(expected.tolist(), rel=1e-5)
+
+    parent_id = int(rates.columns[0])
+    assert list(participation.fault_participation_rates(parent_fault_ids=[parent_id]).columns) == [parent_id]
+    assert np.all(rates.to_numpy() >= 0)
+
+
+@pytest.mark.parametrize("max_chunk_pairs", [1, 100])
+def test_branch_participation_in_chunks(crustal_small_fss_fixture, max_chunk_pairs):
+    solution = crustal_small_fss_fixture
+    expected = BranchParticipation(solution).section_participation_rates()
+    rates = BranchParticipation(solution, max_chunk_pairs=max_chunk_pairs).section_participation_rates()
+    assert rates.index.tolist() == expected.index.tolist()
+    assert rates.to_numpy() == pytest.approx(expected.to_numpy(), rel=1e-6)
@@ -0,0 +1,105 @@
+import pandas as pd
+import pytest
+
+from solvis.filter import FilterParentFaultIds, FilterRuptureIds, FilterSubsectionIds
+from solvis.solution import SolutionParticipation, named_fault
+
+
+def groupby_fault_rates(solution, rupture_ids=None):
+    # the participation, as the double groupby of the long rupture sections table
+    rate_column = solution.model.rate_column_name()
+    df = solution.model.rs_with_rupture_rates
+    if rupture_ids:
+        df = df[df['Rupture Index'].isin(rupture_ids)]
+    df = df.join(solution.solution_file.fault_sections[['ParentID']], on='section').reset_index(drop=True)
+    return df.groupby(['ParentID', 'Rupture Index'])[rate_column].first().groupby('ParentID').sum()
+
+
+def test_parent_fault_incidence(tiny_crustal_solution_fixture):
+    model = tiny_crustal_solution_fixture.model
+    incidence = model.parent_fault_incidence
+    assert incidence.columns.tolist() == ['Rupture Index', 'ParentID']
+    assert not incidence.duplicated().any()
+
+    parent_ids = tiny_crustal_solution_fixture.solution_file.fault_sections['ParentID']
+    expected = set(zip(model.rupture_sections['rupture'], parent_ids.loc[model.rupture_sections['section']]))
+    assert set(zip(incidence['Rupture Index'], incidence['ParentID'])) == expected
+
+
+def test_named_fault_incidence(tiny_crustal_solution_fixture):
+    model = tiny_crustal_solution_fixture.model
+    incidence = model.named_fault_incidence()
+    assert incidence.columns.tolist() == ['Rupture Index', 'named_fault_name']
+    assert not incidence.duplicated().any()
+
+    ohariu_ids = set(named_fault.named_fault_table().loc['Ohariu'].parent_fault_ids)
+    parent_incidence = model.parent_fault_incidence
+    expected = set(parent_incidence[parent_incidence['ParentID'].isin(ohariu_ids)]['Rupture Index'])
+    assert set(incidence[incidence['named_fault_name'] == 'Ohariu']['Rupture Index']) == expected
+
+
+@pytest.mark.parametrize("conditional", [False, True])
+def test_fault_participation_matches_groupby(tiny_crustal_solution_fixture, conditional):
+    solution = tiny_crustal_solution_fixture
+    rupture_ids = solution.solution_file.rupture_rates['Rupture Index'].tolist()[::3] if conditional else None
+    rates = SolutionParticipation(solution).fault_participation_rates(rupture_ids=rupture_ids)
+    expected = groupby_fault_rates(solution, rupture_ids)
+
+    assert rates.index.name == 'ParentID'
+    assert rates.index.tolist() == expected.index.tolist()
+    assert rates.participation_rate.tolist() == pytest.approx(expected.tolist(), rel=1e-6)
+    assert rates.participation_rate.dtype == solution.solution_file.rupture_rates['Annual Rate'].dtype
+
+
+def test_named_fault_participation_only_returns_named_faults(tiny_crustal_solution_fixture):
+    solution = tiny_crustal_solution_fixture
+    all_rates = SolutionParticipation(solution).named_fault_participation_rates()
+    rates = SolutionParticipation(solution).named_fault_participation_rates(['Ohariu'])
+    assert rates.index.tolist() == ['Ohariu']
+    assert rates.loc['Ohariu'].participation_rate == all_rates.loc['Ohariu'].participation_rate
+
+
+def test_fss_fault_participation_matches_groupby(crustal_small_fss_fixture):
+    solution = crustal_small_fss_fixture
+    rates = SolutionParticipation(solution).fault_participation_rates()
+    expected = groupby_fault_rates(solution)
+    assert rates.index.tolist() == expected.index.tolist()
+    assert rates.participation_rate.tolist() == pytest.approx(expected.tolist(), rel=1e-6)
+
+
+@pytest.fixture
+def wellington_grouping():
+    parent_ids = named_fault.named_fault_index().parent_fault_ids(['Ohariu', 'Wairarapa']).tolist()
+    table = pd.DataFrame(
+        {'named_fault_name': ['Wellington'] * len(parent_ids) + ['Ohariu'], 'parent_fault_id': parent_ids + [313]}
+    )
+    return named_fault.NamedFaultIndex.from_frame(table)
+
+
+def test_named_fault_participation_grouping(tiny_crustal_solution_fixture, wellington_grouping):
+    solution = tiny_crustal_solution_fixture
+    participation = SolutionParticipation(solution)
+    cfm_rates = participation.named_fault_participation_rates(['Ohariu', 'Wairarapa'])
+    rates = participation.named_fault_participation_rates(grouping=wellington_grouping)
+
+    assert rates.index.tolist() == ['Ohariu', 'Wellington']
+    assert rates.loc['Ohariu'].participation_rate == cfm_rates.loc['Ohariu'].participation_rate
+    assert rates.loc['Wellington'].participation_rate >= cfm_rates.participation_rate.max()
+    assert rates.loc['Wellington'].participation_rate <= cfm_rates.participation_rate.sum()
+    # the incidence is built once per grouping
+    assert solution.model.named_fault_incidence(wellington_grouping) is solution.model.named_fault_incidence(
+        wellington_grouping
+    )
+
+
+def test_named_fault_filters_grouping(tiny_crustal_solution_fixture, wellington_grouping):
+    solution = tiny_crustal_solution_fixture
+    rupture_ids = FilterRuptureIds(solution).for_named_fault_names(['Wellington'], grouping=wellington_grouping)
+    expected = FilterRuptureIds(solution).for_named_fault_names(['Ohariu', 'Wairarapa'])
+    assert set(rupture_ids) == set(expected)
+
+    parent_ids = FilterParentFaultIds(solution).for_named_fault_names(['Wellington'], grouping=wellington_grouping)
+    assert set(parent_ids) == set(FilterParentFaultIds(solution).for_named_fault_names(['Ohariu', 'Wairarapa']))
+
+    section_ids = FilterSubsectionIds(solution).for_named_fault_names(['Wellington'], grouping=wellington_grouping)
+    assert set(section_ids) == set(FilterSubsectionIds(solution).for_parent_fault_ids(parent_ids))
@@ -6,6 +6,7 @@ from test.conftest import branch_solutions
 
 import geopandas as gpd
 import nzshm_model as nm
+import pandas as pd
 import pytest
 
 # import solvis
@@ -16,9 +17,10 @@ slt = current_model.source_logic_tree
 fslt = slt.branch_sets[0]  # PUY is used always , just for the 3 solution_ids
 
 
-FSR_COLUMNS_A = 26
-FSR_COLUMNS_B = 25  # HIK
-RATE_COLUMNS_A = 6
+FSR_COLUMNS_A = 29
+FSR_COLUMNS_B = 28  # HIK
+RATE_COLUMNS_A = 9  # includes the rate_p10, rate_p50 and rate_p90 fractiles
+COMPOSITE_RATE_COLUMNS = 6
 
 
 @pytest.mark.slow
@@ -30,7 +32,7 @@ class TestThreeFaultSystems(object):
             4211,
             RATE_COLUMNS_A,
         )  # 3101 + 15800 + 23675 was before removing 0 rated
-        assert composite_fixture.composite_rates.shape == (3 * 4211, RATE_COLUMNS_A)
+        assert composite_fixture.composite_rates.shape == (3 * 4211, COMPOSITE_RATE_COLUMNS)
 
     @pytest.mark.TODO_check_values
     def test_rupture_surface(self, composite_fixture):
@@ -61,7 +63,7 @@ class TestThreeSmallFaultSystems(object):
             7 + 3 + 5,  # PUY, HIK, CRU
             RATE_COLUMNS_A,
         )  # 3101 + 15800 + 23675 was before removing 0 rated
-        assert small_composite_fixture.composite_rates.shape == (3 * (7 + 3 + 5), RATE_COLUMNS_A)
+        assert small_composite_fixture.composite_rates.shape == (3 * (7 + 3 + 5), COMPOSITE_RATE_COLUMNS)
 
     @pytest.mark.TODO_check_values
     def test_rupture_surface(self, small_composite_fixture):
@@ -84,6 +86,33 @@ class TestThreeSmallFaultSystems(object):
         assert surfaces.shape == (809, 15)
 
 
+def test_composite_tables_are_cached(small_composite_fixture):
+    assert small_composite_fixture.rupture_rates is small_composite_fixture.rupture_rates
+    assert small_composite_fixture.composite_rates is small_composite_fixture.composite_rates
+
+
+@pytest.mark.parametrize("table", ['rupture_rates', 'composite_rates'])
+def test_composite_tables_fault_system_key(small_composite_fixture, table):
+    df = getattr(small_composite_fixture, table)
+    assert isinstance(df.fault_system.dtype, pd.CategoricalDtype)
+    assert list(df.fault_system.cat.categories) == list(small_composite_fixture.get_fault_system_codes())
+    for code in small_composite_fixture.get_fault_system_codes():
+        fss = small_composite_fixture.get_fault_system_solution(code)
+        expected = fss.solution_file.rupture_rates if table == 'rupture_rates' else fss.model.composite_rates
+        assert (df.fault_system == code).sum() == len(expected)
+
+
+def test_add_fault_system_solution_invalidates_cache(small_composite_fixture):
+    composite = CompositeSolution(small_composite_fixture.source_logic_tree)
+    composite.add_fault_system_solution('PUY', small_composite_fixture.get_fault_system_solution('PUY'))
+    puy_rates = composite.rupture_rates
+    assert list(puy_rates.fault_system.unique()) == ['PUY']
+
+    composite.add_fault_system_solution('HIK', small_composite_fixture.get_fault_system_solution('HIK'))
+    assert composite.rupture_rates is not puy_rates
+    assert list(composite.rupture_rates.fault_system.unique()) == ['PUY', 'HIK']
+
+
 # @pytest.mark.skip('consider how this works again')
 def test_composite_serialisation(small_archives):
     folder = tempfile.TemporaryDirectory()
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+
+@pytest.fixture(scope='module')
+def composite(small_composite_fixture):
+    return small_composite_fixture
+
+
+def test_rupture_id_offsets(composite):
+    offsets = composite.rupture_id_offsets
+    assert list(offsets.index) == list(composite.get_fault_system_codes())
+    expected = 0
+    for code in composite.get_fault_system_codes():
+        assert offsets[code] == expected
+        expected += int(composite.get_fault_system_solution(code).solution_file.ruptures['Rupture Index'].max()) + 1
+
+
+def test_global_rupture_rates(composite):
+    df = composite.global_rupture_rates
+    assert df['Global Rupture Index'].is_unique
+    assert len(df) == len(composite.rupture_rates)
+    for code in composite.get_fault_system_codes():
+        fs_rates = df[df.fault_system == code]
+        assert (fs_rates['Global Rupture Index'] - fs_rates['Rupture Index']).unique().tolist() == [
+            composite.rupture_id_offsets[code]
+        ]
+
+
+def test_global_rupture_id_round_trip(composite):
+    df = composite.global_rupture_rates
+    local = composite.local_rupture_ids(df['Global Rupture Index'])
+    assert local['fault_system'].tolist() == df['fault_system'].tolist()
+    assert local['Rupture Index'].tolist() == df['Rupture Index'].tolist()
+
+
+def test_local_rupture_ids_out_of_range(composite):
+    last = composite.get_fault_system_codes()[-1]
+    max_id = int(composite.get_fault_system_solution(last).solution_file.ruptures['Rupture Index'].max())
+    total = composite.rupture_id_offsets[last] + max_id + 1
+    assert composite.local_rupture_ids([total - 1])['Rupture Index'].tolist() == [max_id]
+    for global_id in [-1, total]:
+        with pytest.raises(ValueError, match="range"):
+            composite.local_rupture_ids([0, global_id])
+
+
+def test_global_rupture_ids(composite):
+    offset = composite.rupture_id_offsets['HIK']
+    assert composite.global_rupture_ids('HIK', [0, 5]).tolist() == [offset, offset + 5]
+
+
+def test_global_rupture_sections(composite):
+    df = composite.global_rupture_sections
+    assert list(df.columns) == ['global_rupture', 'global_section', 'fault_system', 'rupture', 'section']
+    assert len(df) == sum(
+        len(composite.get_fault_system_solution(code).model.rupture_sections)
+        for code in composite.get_fault_system_codes()
+    )
+    # incidence is unique across the whole model
+    assert not df.duplicated(['global_rupture', 'global_section']).any()
+    for code in composite.get_fault_system_codes():
+        fs_sections = df[df.fault_system == code]
+        assert np.all(fs_sections.global_section - fs_sections.section == composite.section_id_offsets[code])
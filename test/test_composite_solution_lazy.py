@@ -0,0 +1,127 @@
+import io
+import os
+import pathlib
+import zipfile
+
+import nzshm_model as nm
+import pytest
+
+from solvis import CompositeSolution, FaultSystemSolution
+from solvis.solution.composite_solution import _ArchiveMemberIO, _warm
+from solvis.solution.fault_system_solution.fault_system_solution_file import FaultSystemSolutionFile
+
+TINY_COMPOSITE = pathlib.PurePath(os.path.realpath(__file__)).parent / "fixtures/TinyCompositeSolution.zip"
+
+
+@pytest.fixture(scope='module')
+def slt():
+    return nm.get_model_version("NSHM_v1.0.4").source_logic_tree
+
+
+@pytest.fixture(scope='module')
+def stored_archive(slt, tmp_path_factory):
+    # re-archive the (legacy, DEFLATED) fixture, nesting the fault system archives STORED.
+    path = tmp_path_factory.mktemp('composite') / 'stored_composite.zip'
+    CompositeSolution.from_archive(TINY_COMPOSITE, slt).to_archive(path)
+    return path
+
+
+def test_from_archive_is_lazy(slt):
+    composite = CompositeSolution.from_archive(TINY_COMPOSITE, slt)
+    assert sorted(composite.get_fault_system_codes()) == ['CRU', 'HIK', 'PUY']
+    assert not any(composite._solutions.is_loaded(code) for code in composite.get_fault_system_codes())
+
+    hik = composite.get_fault_system_solution('HIK')
+    assert composite._solutions.is_loaded('HIK')
+    assert not composite._solutions.is_loaded('CRU')
+    assert not composite._solutions.is_loaded('PUY')
+    assert composite.get_fault_system_solution('HIK') is hik
+
+
+def test_to_archive_stores_nested_archives(stored_archive):
+    with zipfile.ZipFile(stored_archive) as archive:
+        for info in archive.infolist():
+            assert info.compress_type == zipfile.ZIP_STORED
+
+
+@pytest.mark.parametrize("fault_system", ['CRU', 'HIK', 'PUY'])
+def test_stored_archive_reads_in_place(slt, stored_archive, fault_system):
+    legacy = CompositeSolution.from_archive(TINY_COMPOSITE, slt).get_fault_system_solution(fault_system)
+    composite = CompositeSolution.from_archive(stored_archive, slt)
+    fss = composite.get_fault_system_solution(fault_system)
+
+    assert isinstance(fss.solution_file._archive.raw, _ArchiveMemberIO)
+    assert fss.solution_file.rupture_rates.equals(legacy.solution_file.rupture_rates)
+    assert fss.model.composite_rates.equals(legacy.model.composite_rates)
+    assert fss.solution_file.fault_sections.shape == legacy.solution_file.fault_sections.shape
+
+
+@pytest.mark.parametrize("max_workers", [None, 1])
+def test_from_archive_preload(slt, stored_archive, max_workers):
+    composite = CompositeSolution.from_archive(stored_archive, slt, preload=True, max_workers=max_workers)
+    lazy = CompositeSolution.from_archive(stored_archive, slt)
+
+    for code in ['CRU', 'HIK', 'PUY']:
+        assert composite._solutions.is_loaded(code)
+        solution_file = composite._solutions[code].solution_file
+        assert solution_file._aggregate_rates is not None
+        assert solution_file._composite_rates is not None
+    assert composite.rupture_rates.equals(lazy.rupture_rates)
+    assert composite.composite_rates.equals(lazy.composite_rates)
+
+
+def test_to_archive_over_source_archive(slt, stored_archive, tmp_path):
+    path = tmp_path / 'composite.zip'
+    path.write_bytes(stored_archive.read_bytes())
+    expected = CompositeSolution.from_archive(stored_archive, slt).rupture_rates
+
+    CompositeSolution.from_archive(path, slt).to_archive(path)
+    assert zipfile.ZipFile(path).testzip() is None
+    assert CompositeSolution.from_archive(path, slt).rupture_rates.equals(expected)
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_close_releases_nested_archive_files(slt, stored_archive):
+    with CompositeSolution.from_archive(stored_archive, slt) as composite:
+        member_io = composite.get_fault_system_solution('HIK').solution_file._archive.raw
+        assert not member_io._file.closed
+    assert member_io._file.closed
+
+
+def test_to_archive_filtered_fault_system(slt, crustal_small_fss_fixture, tmp_path):
+    assert set(FaultSystemSolutionFile.OPENSHA_ONLY) <= set(crustal_small_fss_fixture.solution_file.archive.namelist())
+    rupture_ids = crustal_small_fss_fixture.solution_file.rupture_rates['Rupture Index'].tolist()[::10]
+    filtered = FaultSystemSolution.filter_solution(crustal_small_fss_fixture, rupture_ids)
+    assert filtered.solution_file._archive is None
+
+    tiny = CompositeSolution.from_archive(TINY_COMPOSITE, slt)
+    composite = CompositeSolution(slt)
+    composite.add_fault_system_solution('CRU', filtered)
+    for code in ['HIK', 'PUY']:
+        composite.add_fault_system_solution(code, tiny.get_fault_system_solution(code))
+    path = tmp_path / 'filtered_composite.zip'
+    composite.to_archive(path)
+
+    fss = CompositeSolution.from_archive(path, slt).get_fault_system_solution('CRU')
+    assert fss.solution_file.rupture_rates['Rupture Index'].tolist() == rupture_ids
+    assert fss.solution_file.composite_rates.shape == filtered.solution_file.composite_rates.shape
+    assert not set(FaultSystemSolutionFile.OPENSHA_ONLY) & set(fss.solution_file.archive.namelist())
+
+
+def test_warm_skips_tables_not_in_archive(slt, stored_archive):
+    fss = CompositeSolution.from_archive(stored_archive, slt).get_fault_system_solution('PUY')
+    fss.solution_file._archive.seek(0)
+    source = zipfile.ZipFile(io.BytesIO(fss.solution_file._archive.read()))
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        for info in source.infolist():
+            if info.filename != FaultSystemSolutionFile.FAST_INDICES_PATH:
+                archive.writestr(info, source.read(info))
+
+    # from_archive() insists on fast indices, so open the archive directly
+    solution_file = FaultSystemSolutionFile()
+    solution_file._archive = buffer
+    solution = _warm(FaultSystemSolution(solution_file))
+    assert solution.solution_file._aggregate_rates is not None
+    assert solution.model._fast_indices is None
+    assert len(solution.model.rupture_sections)  # built on demand
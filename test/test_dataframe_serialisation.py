@@ -1,5 +1,6 @@
 #!python3
 
+import io
 import os
 import pathlib
 import tempfile
@@ -10,6 +11,7 @@ import pandas as pd
 import pytest
 
 import solvis
+from solvis.solution.inversion_solution import dataframe_csv_chunks, members_to_zip
 
 
 class TestRates(unittest.TestCase):
@@ -122,3 +124,39 @@ class TestSerialisation(object):
         )
 
         # print(crustal_fixture.solution_file._archive_path)
+
+
+@pytest.mark.parametrize("index", [True, False])
+@pytest.mark.parametrize("rows", [0, 1, 7, 10])
+def test_dataframe_csv_chunks(index, rows):
+    df = pd.DataFrame({'Rupture Index': range(rows), 'Annual Rate': [0.1 * r for r in range(rows)]})
+    chunks = list(dataframe_csv_chunks(df, index=index, chunk_rows=3))
+    assert len(chunks) == max(1, -(-rows // 3))
+    assert b''.join(chunks).decode() == df.to_csv(index=index)
+
+
+def test_members_to_zip():
+    buffer = io.BytesIO()
+    data = [b'a,b\n' + b'1,2\n' * 1000, b'', b'x' * 100]
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        archive.writestr('first.txt', 'first')
+        members_to_zip(archive, [(f'{i}.csv', [d[:50], d[50:]]) for i, d in enumerate(data)], compresslevel=1)
+        archive.writestr('last.txt', 'last')
+
+    with zipfile.ZipFile(buffer) as archive:
+        assert archive.testzip() is None
+        assert archive.namelist() == ['first.txt', '0.csv', '1.csv', '2.csv', 'last.txt']
+        assert [archive.read(f'{i}.csv') for i in range(3)] == data
+        assert archive.read('last.txt') == b'last'
+
+
+def test_write_archive_compresslevel(crustal_small_fss_fixture):
+    sizes, aggregate_rates = [], []
+    for compresslevel in [0, 9]:
+        buffer = io.BytesIO()
+        crustal_small_fss_fixture.to_archive(buffer, compresslevel=compresslevel)
+        with zipfile.ZipFile(buffer) as archive:
+            sizes.append(archive.getinfo('aggregate_rates.csv').compress_size)
+        aggregate_rates.append(solvis.FaultSystemSolution.from_archive(buffer).solution_file.aggregate_rates)
+    assert sizes[0] > sizes[1]
+    assert aggregate_rates[0].equals(aggregate_rates[1])
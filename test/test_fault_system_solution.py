@@ -11,10 +11,10 @@ from solvis.solution.fault_system_solution import FaultSystemSolution
 current_model = nm.get_model_version(nm.CURRENT_VERSION)
 fslt = current_model.source_logic_tree.branch_sets[0]  # PUY is used always , just for the 3 solution_ids
 
-FSR_COLUMNS_A = 26  # see how this flies: 26
-FSR_COLUMNS_B = 25  # HIK
+FSR_COLUMNS_A = 29  # see how this flies: 26, plus 3 rate fractiles
+FSR_COLUMNS_B = 28  # HIK
 
-RATE_COLUMNS_A = 6  # see how this flies:6
+RATE_COLUMNS_A = 9  # see how this flies:6, plus 3 rate fractiles
 COMPOSITE_RATE_COLUMNS = 6
 
 
@@ -54,6 +54,26 @@ class TestSmallCrustal(object):
         assert sol.solution_file.indices["Num Sections"].dtype == "Int32"  # pd.UInt16Dtype()
         assert sol.solution_file.indices["# 1"].dtype == "Int32"  # pd.UInt16Dtype()
 
+    def test_indexed_rates_are_cached(self, crustal_small_fss_fixture):
+        solution_file = crustal_small_fss_fixture.solution_file
+        assert solution_file.aggregate_rates is solution_file.aggregate_rates
+        assert solution_file.rupture_rates is solution_file.aggregate_rates
+        assert solution_file.composite_rates is solution_file.composite_rates
+        assert solution_file.aggregate_rates.index.names == ['fault_system', 'Rupture Index']
+
+    def test_rate_columns(self, crustal_small_fss_fixture):
+        solution_file = crustal_small_fss_fixture.solution_file
+        columns = solution_file.rate_columns(['Rupture Index', 'rate_weighted_mean'])
+        assert list(columns) == ['Rupture Index', 'rate_weighted_mean']
+        assert columns['Rupture Index'].dtype == 'uint32'
+        assert columns['Rupture Index'].tolist() == solution_file.aggregate_rates['Rupture Index'].tolist()
+        assert columns['rate_weighted_mean'].dtype == 'float32'
+
+        composite = solution_file.rate_columns(composite=True)
+        assert list(composite) == list(solution_file.composite_rates.columns)
+        assert composite['Annual Rate'].dtype == 'float32'
+        assert len(composite['solution_id']) == len(solution_file.composite_rates)
+
     # @pytest.mark.skip('remove deprecated')
     def test_filter_solution_ruptures(self, crustal_small_fss_fixture):
         sol = crustal_small_fss_fixture
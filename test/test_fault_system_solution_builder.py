@@ -0,0 +1,227 @@
+from test.conftest import MINI_ARCHIVES, branch_solutions, folder, fslt
+
+import pandas as pd
+import pytest
+from pytest import approx
+
+from solvis import FaultSystemSolution, InversionSolution
+from solvis.solution.fault_system_solution import (
+    BranchArchive,
+    FaultSystemSolutionBuilder,
+    fault_system_solution_builder,
+    update_branches,
+)
+from solvis.solution.inversion_solution import BranchInversionSolution
+
+
+@pytest.fixture(scope='module')
+def crustal_branch_solutions():
+    return list(branch_solutions(fslt, archive=MINI_ARCHIVES['CRU']))
+
+
+@pytest.fixture(scope='module')
+def pivoted_fss(crustal_branch_solutions):
+    # the original all-in-memory build: concat all branches, then pivot
+    frames = []
+    for branch_solution in crustal_branch_solutions:
+        df = branch_solution.solution_file.rupture_rates.copy()
+        df.insert(0, 'solution_id', FaultSystemSolution.get_branch_inversion_solution_id(branch_solution.branch))
+        df.insert(0, 'rupture_set_id', branch_solution.rupture_set_id)
+        df.insert(0, 'weight', branch_solution.branch.weight)
+        df.insert(0, 'fault_system', branch_solution.fault_system)
+        frames.append(df)
+    return FaultSystemSolution.new_solution(crustal_branch_solutions[-1], pd.concat(frames, ignore_index=True))
+
+
+def test_builder_matches_pivot(crustal_branch_solutions, pivoted_fss):
+    builder = FaultSystemSolutionBuilder()
+    for branch_solution in crustal_branch_solutions:
+        builder.add_branch_solution(branch_solution)
+    assert builder.branch_count == len(crustal_branch_solutions)
+    fss = builder.build()
+
+    expected = pivoted_fss.solution_file.aggregate_rates.reset_index(drop=True)
+    actual = fss.solution_file.aggregate_rates.reset_index(drop=True)
+    assert actual.dtypes.to_dict() == expected.dtypes.to_dict()
+    assert actual.drop(columns='rate_weighted_mean').equals(expected.drop(columns='rate_weighted_mean'))
+    assert actual.rate_weighted_mean.tolist() == approx(expected.rate_weighted_mean.tolist())
+
+    # composite rates are streamed into the archive, and read back on demand
+    assert fss.solution_file._composite_rates is None
+    expected = pivoted_fss.model.composite_rates.reset_index(drop=True)
+    actual = fss.model.composite_rates.reset_index(drop=True)
+    assert actual.astype(str).values.tolist() == expected.astype(str).values.tolist()
+
+
+def test_builder_to_archive_path(crustal_branch_solutions, tmp_path):
+    builder = FaultSystemSolutionBuilder()
+    for branch_solution in crustal_branch_solutions:
+        builder.add_branch_solution(branch_solution)
+    fss = builder.build(tmp_path / 'fss.zip')
+    assert fss.solution_file.archive_path == tmp_path / 'fss.zip'
+
+    rehydrated = FaultSystemSolution.from_archive(tmp_path / 'fss.zip')
+    assert rehydrated.model.composite_rates.shape == fss.model.composite_rates.shape
+    assert rehydrated.solution_file.aggregate_rates.shape == fss.solution_file.aggregate_rates.shape
+
+
+def test_builder_requires_branches():
+    with pytest.raises(ValueError):
+        FaultSystemSolutionBuilder().build()
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_builder_from_branch_archives(pivoted_fss, max_workers):
+    branch_archives = [
+        BranchArchive(folder / 'fixtures' / MINI_ARCHIVES['CRU'], branch, fslt.short_name, 'RUPTSET_ID')
+        for branch in fslt.branches
+    ]
+    fss = FaultSystemSolutionBuilder().add_branch_archives(branch_archives, max_workers=max_workers).build()
+
+    expected = pivoted_fss.solution_file.aggregate_rates.reset_index(drop=True)
+    actual = fss.solution_file.aggregate_rates.reset_index(drop=True)
+    assert actual.drop(columns='rate_weighted_mean').equals(expected.drop(columns='rate_weighted_mean'))
+    assert actual.rate_weighted_mean.tolist() == approx(expected.rate_weighted_mean.tolist())
+
+    expected = pivoted_fss.model.composite_rates.reset_index(drop=True)
+    actual = fss.model.composite_rates.reset_index(drop=True)
+    assert actual.astype(str).values.tolist() == expected.astype(str).values.tolist()
+    assert fss.solution_file.ruptures.equals(pivoted_fss.solution_file.ruptures)
+
+
+@pytest.fixture(scope='module')
+def scaled_branch_solutions():
+    # three branches with distinct rates; only the first branch has the lowest rupture ids
+    base = InversionSolution.from_archive(folder / 'fixtures' / MINI_ARCHIVES['CRU'])
+    rupture_ids = base.solution_file.rupture_rates['Rupture Index'].tolist()
+    solutions = []
+    for idx, branch in enumerate(fslt.branches):
+        scaled = InversionSolution.scale_rupture_rates(base, scale=idx + 1)
+        if idx:
+            scaled = InversionSolution.scale_rupture_rates(scaled, scale=0, rupture_ids=rupture_ids[:3])
+        solutions.append(BranchInversionSolution.new_branch_solution(scaled, branch, fslt.short_name, 'RUPTSET_ID'))
+    return solutions
+
+
+def build_rates(branch_solutions, weights=None):
+    builder = FaultSystemSolutionBuilder()
+    for branch_solution in branch_solutions:
+        solution_id = FaultSystemSolution.get_branch_inversion_solution_id(branch_solution.branch)
+        builder.add_branch_rates(
+            branch_solution.solution_file.rupture_rates,
+            fault_system=branch_solution.fault_system,
+            weight=(weights or {}).get(solution_id, branch_solution.branch.weight),
+            rupture_set_id=branch_solution.rupture_set_id,
+            solution_id=solution_id,
+        )
+    return builder.aggregate_rates
+
+
+def assert_aggregates_equal(fss, expected):
+    actual = fss.solution_file.aggregate_rates.reset_index(drop=True)
+    assert actual.dtypes.to_dict() == expected.dtypes.to_dict()
+    assert actual.drop(columns='rate_weighted_mean').equals(expected.drop(columns='rate_weighted_mean'))
+    assert actual.rate_weighted_mean.tolist() == approx(expected.rate_weighted_mean.tolist())
+    assert len(fss.model.composite_rates) == expected.rate_count.sum()
+
+
+def solution_id(branch_solution):
+    return FaultSystemSolution.get_branch_inversion_solution_id(branch_solution.branch)
+
+
+def test_update_add_branch(scaled_branch_solutions):
+    fss = FaultSystemSolution.from_branch_solutions(scaled_branch_solutions[1:])
+    updated = FaultSystemSolution.update_branches(fss, add=scaled_branch_solutions[:1])
+    assert_aggregates_equal(updated, build_rates(scaled_branch_solutions))
+    assert updated.solution_file.ruptures is fss.solution_file.ruptures
+
+
+@pytest.mark.parametrize("removed", [[0], [1], [1, 2]])
+def test_update_remove_branches(scaled_branch_solutions, removed):
+    fss = FaultSystemSolution.from_branch_solutions(scaled_branch_solutions)
+    updated = update_branches(fss, remove=[solution_id(scaled_branch_solutions[idx]) for idx in removed])
+    remaining = [bs for idx, bs in enumerate(scaled_branch_solutions) if idx not in removed]
+    assert_aggregates_equal(updated, build_rates(remaining))
+    assert set(updated.model.composite_rates.solution_id) == {solution_id(bs) for bs in remaining}
+
+
+def test_update_reweight_branches(scaled_branch_solutions):
+    fss = FaultSystemSolution.from_branch_solutions(scaled_branch_solutions)
+    weights = {solution_id(scaled_branch_solutions[0]): 0.5, solution_id(scaled_branch_solutions[2]): 0.0}
+    updated = update_branches(fss, weights=weights)
+    assert_aggregates_equal(updated, build_rates(scaled_branch_solutions, weights))
+    composite_rates = updated.model.composite_rates
+    for sid, weight in weights.items():
+        assert (composite_rates[composite_rates.solution_id == sid].weight == weight).all()
+
+
+def test_update_to_archive(scaled_branch_solutions, tmp_path):
+    fss = FaultSystemSolution.from_branch_solutions(scaled_branch_solutions)
+    updated = update_branches(fss, remove=[solution_id(scaled_branch_solutions[1])])
+    updated.to_archive(tmp_path / 'updated.zip')
+    rehydrated = FaultSystemSolution.from_archive(tmp_path / 'updated.zip')
+    assert rehydrated.solution_file.aggregate_rates.shape == updated.solution_file.aggregate_rates.shape
+    assert rehydrated.model.composite_rates.shape == updated.model.composite_rates.shape
+
+
+def test_update_invalid_branches(scaled_branch_solutions):
+    fss = FaultSystemSolution.from_branch_solutions(scaled_branch_solutions)
+    with pytest.raises(ValueError, match="not in the solution"):
+        update_branches(fss, remove=['unknown'])
+    with pytest.raises(ValueError, match="not in the solution"):
+        update_branches(fss, weights={'unknown': 0.1})
+    with pytest.raises(ValueError, match="already in the solution"):
+        update_branches(fss, add=scaled_branch_solutions[:1])
+
+
+def test_update_replace_branch(scaled_branch_solutions):
+    # removing and adding branches with rates for the same ruptures leaves their rate count unchanged
+    fss = FaultSystemSolution.from_branch_solutions(scaled_branch_solutions[:2])
+    updated = update_branches(fss, remove=[solution_id(scaled_branch_solutions[0])], add=scaled_branch_solutions[2:])
+    assert_aggregates_equal(updated, build_rates(scaled_branch_solutions[1:]))
+
+
+def test_update_add_branch_twice(scaled_branch_solutions):
+    fss = FaultSystemSolution.from_branch_solutions(scaled_branch_solutions[:1])
+    with pytest.raises(ValueError, match="already in the solution"):
+        update_branches(fss, add=scaled_branch_solutions[1:2] * 2)
+
+
+def test_update_branches_fractiles(scaled_branch_solutions):
+    fss = FaultSystemSolution.from_branch_solutions(scaled_branch_solutions[1:])
+    updated = FaultSystemSolution.update_branches(fss, add=scaled_branch_solutions[:1], fractiles=[0.5])
+    columns = updated.solution_file.aggregate_rates.columns
+    assert 'rate_p50' in columns
+    assert 'rate_p10' not in columns
+
+
+def test_update_fractiles_of_changed_ruptures(scaled_branch_solutions, monkeypatch):
+    # the second and third branches have rates for just half of the ruptures
+    rupture_rates = scaled_branch_solutions[0].solution_file.rupture_rates
+    rupture_ids = rupture_rates[rupture_rates['Annual Rate'] > 0]['Rupture Index'].tolist()
+    branch_solutions = scaled_branch_solutions[:1] + [
+        BranchInversionSolution.new_branch_solution(
+            InversionSolution.scale_rupture_rates(bs, scale=0, rupture_ids=rupture_ids[: len(rupture_ids) // 2]),
+            bs.branch,
+            fslt.short_name,
+            'RUPTSET_ID',
+        )
+        for bs in scaled_branch_solutions[1:]
+    ]
+    fss = FaultSystemSolution.from_branch_solutions(branch_solutions)
+    composite_weights = fss.model.composite_rates.weight.tolist()
+    # swapping branch weights keeps the total weight, so just the ruptures of these branches are recomputed
+    first, second = branch_solutions[1:3]
+    weights = {solution_id(first): second.branch.weight, solution_id(second): first.branch.weight}
+
+    recomputed = []
+    fractiles = fault_system_solution_builder.rupture_rate_fractiles
+    monkeypatch.setattr(
+        fault_system_solution_builder,
+        'rupture_rate_fractiles',
+        lambda composite_rates, *args: recomputed.append(len(composite_rates)) or fractiles(composite_rates, *args),
+    )
+    updated = update_branches(fss, weights=weights)
+    assert_aggregates_equal(updated, build_rates(branch_solutions, weights))
+    assert recomputed and recomputed[0] < len(updated.model.composite_rates)
+    assert fss.model.composite_rates.weight.tolist() == composite_weights
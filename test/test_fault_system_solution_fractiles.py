@@ -0,0 +1,127 @@
+import io
+from test.conftest import MINI_ARCHIVES, branch_solutions, fslt
+
+import numpy as np
+import pandas as pd
+import pytest
+from pytest import approx
+
+from solvis import FaultSystemSolution
+from solvis.solution.fault_system_solution import FaultSystemSolutionBuilder, fault_system_solution_builder
+from solvis.solution.fault_system_solution.rate_fractiles import (
+    AGGREGATE_FRACTILES,
+    fractile_column,
+    rupture_rate_fractiles,
+    weighted_fractiles,
+)
+
+
+def reference_fractiles(values, weights, total_weight, fractiles):
+    # the weight missing from the group is at rate zero
+    values = np.concatenate([[0.0], values])
+    weights = np.concatenate([[total_weight - sum(weights)], weights])
+    keep = weights > 1e-12
+    return [np.percentile(values[keep], q * 100, method='inverted_cdf', weights=weights[keep]) for q in fractiles]
+
+
+def test_fractile_column():
+    assert [fractile_column(q) for q in AGGREGATE_FRACTILES] == ['rate_p10', 'rate_p50', 'rate_p90']
+    assert fractile_column(0.025) == 'rate_p2.5'
+
+
+def test_weighted_fractiles_random():
+    rng = np.random.default_rng(42)
+    fractiles = [0.0, 0.1, 0.5, 0.9, 1.0]
+    for _ in range(200):
+        groups = np.unique(rng.integers(0, 5, 10), return_inverse=True)[1]
+        values = rng.choice([0.5, 1.0, 2.0, rng.random()], len(groups))
+        weights = rng.choice([0.21, 0.52, 0.27, 0.1], len(groups))
+        n_groups = groups.max() + 1
+        totals = np.array([weights[groups == g].sum() for g in range(n_groups)]) + rng.choice([0, 0.4], n_groups)
+
+        result = weighted_fractiles(groups, values, weights, totals, fractiles)
+        for g in range(n_groups):
+            expected = reference_fractiles(values[groups == g], weights[groups == g], totals[g], fractiles)
+            assert result[g].tolist() == approx(expected)
+
+
+def test_weighted_fractiles_missing_weight_is_zero():
+    # one branch with weight 0.6 has no rate for this rupture
+    result = weighted_fractiles(np.array([0, 0]), np.array([1.0, 2.0]), np.array([0.2, 0.2]), np.array([1.0]), [0.5])
+    assert result.tolist() == [[0.0]]
+
+
+def test_weighted_fractiles_empty():
+    result = weighted_fractiles(np.array([], dtype=int), np.array([]), np.array([]), np.array([]), [0.5])
+    assert result.shape == (0, 1)
+
+
+def test_rupture_rate_fractiles():
+    composite_rates = pd.DataFrame(
+        {
+            'fault_system': ['CRU', 'CRU', 'CRU', 'HIK'],
+            'Rupture Index': pd.Series([7, 7, 3, 7], dtype='UInt32'),
+            'weight': [0.3, 0.7, 0.3, 1.0],
+            'Annual Rate': pd.Series([2.0, 1.0, 5.0, 4.0], dtype='Float32'),
+        }
+    )
+    df = rupture_rate_fractiles(composite_rates, {'CRU': 1.0, 'HIK': 1.0}, [0.25, 0.5, 0.75])
+    assert df['fault_system'].tolist() == ['CRU', 'CRU', 'HIK']
+    assert df['Rupture Index'].tolist() == [3, 7, 7]
+    # the branch with weight 0.7 has no rate for rupture 3, so counts as rate zero
+    assert df['rate_p25'].tolist() == [0.0, 1.0, 4.0]
+    assert df['rate_p50'].tolist() == [0.0, 1.0, 4.0]
+    assert df['rate_p75'].tolist() == [5.0, 2.0, 4.0]
+    assert df['rate_p50'].dtype == 'Float32'
+
+
+@pytest.fixture(scope='module')
+def crustal_fss():
+    return FaultSystemSolution.from_branch_solutions(branch_solutions(fslt, archive=MINI_ARCHIVES['CRU']))
+
+
+def test_aggregate_rates_fractiles(crustal_fss):
+    aggregate_rates = crustal_fss.solution_file.aggregate_rates
+    composite_rates = crustal_fss.model.composite_rates.reset_index(drop=True)
+    total_weight = sum(branch.weight for branch in fslt.branches)
+    for _, row in aggregate_rates.iterrows():
+        rates = composite_rates[composite_rates['Rupture Index'] == row['Rupture Index']]
+        expected = reference_fractiles(
+            rates['Annual Rate'].to_numpy(dtype='float64'),
+            rates['weight'].to_numpy(),
+            total_weight,
+            AGGREGATE_FRACTILES,
+        )
+        actual = [row[fractile_column(q)] for q in AGGREGATE_FRACTILES]
+        assert actual == approx(expected, rel=1e-6)
+        assert row['rate_p10'] <= row['rate_p50'] <= row['rate_p90'] <= row['rate_max']
+        # branches without a rate count as zero in fractiles, but not in rate_min
+        for value in actual:
+            assert value == 0 or row['rate_min'] <= value <= row['rate_max']
+
+
+@pytest.mark.parametrize("max_fractile_rows", [1, 50])
+def test_builder_fractiles_in_chunks(crustal_fss, max_fractile_rows, monkeypatch):
+    monkeypatch.setattr(fault_system_solution_builder, 'SPOOL_CHUNK_ROWS', 7)
+    builder = FaultSystemSolutionBuilder(max_fractile_rows=max_fractile_rows)
+    for branch_solution in branch_solutions(fslt, archive=MINI_ARCHIVES['CRU']):
+        builder.add_branch_solution(branch_solution)
+
+    spool_reads = []
+    read_spool = builder._spooled_rate_chunks
+    monkeypatch.setattr(builder, '_spooled_rate_chunks', lambda: spool_reads.append(1) or read_spool())
+    assert builder.aggregate_rates.equals(crustal_fss.solution_file.aggregate_rates.reset_index(drop=True))
+    assert len(spool_reads) == 1  # each spooled row is read once, whatever the number of rupture ranges
+
+
+def test_aggregate_rates_fractiles_from_archive(crustal_fss):
+    buffer = io.BytesIO()
+    crustal_fss.to_archive(buffer)
+    rehydrated = FaultSystemSolution.from_archive(buffer)
+    columns = [fractile_column(q) for q in AGGREGATE_FRACTILES]
+    aggregate_rates = rehydrated.solution_file.aggregate_rates
+    assert (aggregate_rates[columns].dtypes == 'Float32').all()
+    assert (
+        aggregate_rates[columns].to_numpy().tolist()
+        == crustal_fss.solution_file.aggregate_rates[columns].to_numpy().tolist()
+    )
@@ -0,0 +1,128 @@
+import io
+import zipfile
+
+import pytest
+
+from solvis import FaultSystemSolution, InversionSolution
+from solvis.solution.fault_system_solution import FaultSystemSolutionFileView
+from solvis.solution.inversion_solution import InversionSolutionFile, InversionSolutionFileView
+from solvis.solution.inversion_solution.inversion_solution_file import member_to_zip_raw
+
+RUPTURE_TABLES = ['rupture_rates', 'ruptures', 'indices', 'average_slips']
+
+
+@pytest.fixture
+def rupture_ids(puysegur_small_fixture):
+    return puysegur_small_fixture.solution_file.ruptures['Rupture Index'].tolist()[1:4]
+
+
+def test_filter_solution_is_a_lazy_view(puysegur_small_fixture, rupture_ids):
+    sol = puysegur_small_fixture
+    new_sol = InversionSolution.filter_solution(sol, rupture_ids)
+    solution_file = new_sol.solution_file
+    assert isinstance(solution_file, InversionSolutionFileView)
+    assert solution_file.parent is sol.solution_file
+    assert solution_file._ruptures is None and solution_file._rates is None
+
+    for table in RUPTURE_TABLES:
+        df = getattr(solution_file, table)
+        parent_df = getattr(sol.solution_file, table)
+        assert df.equals(parent_df[parent_df['Rupture Index'].isin(rupture_ids)])
+        assert getattr(solution_file, table) is df  # filtered once
+
+    # tables that are not filtered are shared
+    assert solution_file.fault_sections is sol.solution_file.fault_sections
+    assert solution_file.fault_regime == sol.solution_file.fault_regime
+    assert new_sol.model.ruptures_with_rupture_rates.shape[0] == len(rupture_ids)
+
+
+def test_view_of_a_view(puysegur_small_fixture, rupture_ids):
+    view = InversionSolution.filter_solution(puysegur_small_fixture, rupture_ids)
+    view_of_view = InversionSolution.filter_solution(view, rupture_ids[:2])
+    assert view_of_view.solution_file.ruptures['Rupture Index'].tolist() == rupture_ids[:2]
+
+
+def test_view_set_props(puysegur_small_fixture, rupture_ids):
+    view = InversionSolution.filter_solution(puysegur_small_fixture, rupture_ids).solution_file
+    rates = view.rupture_rates.copy()
+    rates['Annual Rate'] = rates['Annual Rate'] * 2
+    view.set_props(rates, view.ruptures, view.indices, view.fault_sections, view.average_slips)
+    assert view.rupture_rates is rates
+    assert not puysegur_small_fixture.solution_file.rupture_rates['Annual Rate'].equals(rates['Annual Rate'])
+
+
+def test_view_to_archive(puysegur_small_fixture, rupture_ids):
+    new_sol = InversionSolution.filter_solution(puysegur_small_fixture, rupture_ids)
+    buffer = io.BytesIO()
+    new_sol.to_archive(buffer)
+    rehydrated = InversionSolution.from_archive(buffer)
+    assert rehydrated.solution_file.ruptures['Rupture Index'].tolist() == rupture_ids
+    assert rehydrated.solution_file.rupture_rates.shape == (len(rupture_ids), 2)
+
+
+def test_fss_filter_solution_is_a_lazy_view(crustal_small_fss_fixture):
+    sol = crustal_small_fss_fixture
+    rupture_ids = sol.solution_file.aggregate_rates['Rupture Index'].tolist()[:3]
+    new_sol = FaultSystemSolution.filter_solution(sol, rupture_ids)
+    solution_file = new_sol.solution_file
+    assert isinstance(solution_file, FaultSystemSolutionFileView)
+    assert solution_file._composite_rates is None and solution_file._aggregate_rates is None
+
+    assert solution_file.rupture_rates['Rupture Index'].tolist() == rupture_ids
+    assert set(new_sol.model.composite_rates['Rupture Index']) == set(rupture_ids)
+    assert set(new_sol.model.rupture_sections['rupture']) == set(rupture_ids)
+    assert solution_file.fault_sections is sol.solution_file.fault_sections
+
+    buffer = io.BytesIO()
+    new_sol.to_archive(buffer)
+    rehydrated = FaultSystemSolution.from_archive(buffer)
+    assert rehydrated.solution_file.aggregate_rates['Rupture Index'].tolist() == rupture_ids
+    assert set(rehydrated.solution_file.fast_indices['rupture']) == set(rupture_ids)
+
+
+def test_view_to_archive_copies_raw_members(puysegur_small_fixture, rupture_ids, tmp_path):
+    source = puysegur_small_fixture.solution_file.archive
+    new_sol = InversionSolution.filter_solution(puysegur_small_fixture, rupture_ids)
+    new_sol.to_archive(tmp_path / 'filtered.zip')
+    # and again, from a buffer-backed solution
+    buffer = io.BytesIO()
+    InversionSolution.filter_solution(
+        InversionSolution.from_archive(tmp_path / 'filtered.zip'), rupture_ids
+    ).to_archive(buffer)
+
+    for archive in [zipfile.ZipFile(tmp_path / 'filtered.zip'), zipfile.ZipFile(buffer)]:
+        assert archive.testzip() is None
+        names = archive.namelist()
+        assert len(names) == len(set(names))  # WARNING.md is not duplicated
+        for info in source.infolist():
+            if info.filename in InversionSolutionFile.DATAFRAMES or info.filename == 'WARNING.md':
+                continue
+            copied = archive.getinfo(info.filename)
+            assert (copied.compress_type, copied.compress_size, copied.CRC) == (
+                info.compress_type,
+                info.compress_size,
+                info.CRC,
+            )
+            assert archive.read(info.filename) == source.read(info.filename)
+
+
+@pytest.mark.parametrize("force_zip64", [False, True])
+def test_member_to_zip_raw(force_zip64):
+    source_buffer = io.BytesIO()
+    data = b'some,csv\n' * 1000
+    with zipfile.ZipFile(source_buffer, 'w', zipfile.ZIP_DEFLATED) as source:
+        with source.open('deflated.csv', 'w', force_zip64=force_zip64) as member:
+            member.write(data)
+        source.writestr('stored.txt', b'stored', compress_type=zipfile.ZIP_STORED)
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(source_buffer) as source, zipfile.ZipFile(buffer, 'w') as target:
+        for info in source.infolist():
+            member_to_zip_raw(target, source, info)
+        target.writestr('new.txt', b'new')
+
+    with zipfile.ZipFile(buffer) as archive:
+        assert archive.testzip() is None
+        assert archive.read('deflated.csv') == data
+        assert archive.read('stored.txt') == b'stored'
+        assert archive.read('new.txt') == b'new'
@@ -0,0 +1,84 @@
+#! test_import_time.py
+"""Guard against slow dependencies being imported before they are needed."""
+
+import subprocess
+import sys
+
+import pytest
+
+
+def imported_modules(statement: str) -> set:
+    script = f"import sys; {statement}; print(' '.join(sys.modules))"
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    return set(result.stdout.split())
+
+
+def import_time(statement: str) -> float:
+    """Return the wall clock time (seconds) to execute an import statement in a fresh interpreter."""
+    script = f"import time; tic = time.perf_counter(); {statement}; print(time.perf_counter() - tic)"
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    return float(result.stdout.strip())
+
+
+@pytest.mark.parametrize("statement", ["import solvis", "import solvis.geometry"])
+def test_import_does_not_load_pyvista(statement):
+    modules = imported_modules(statement)
+    assert "solvis" in modules
+    assert "pyvista" not in modules
+    assert "vtk" not in modules
+
+
+def test_import_solvis_is_lazy():
+    modules = imported_modules("import solvis")
+    for heavy in ["pandas", "geopandas", "pandera", "nzshm_model", "pyproj", "shapely"]:
+        assert heavy not in modules
+
+
+@pytest.mark.parametrize(
+    "statement", ["from solvis import InversionSolution", "from solvis import FaultSystemSolution"]
+)
+def test_import_solutions_does_not_load_logic_tree_or_geo_dependencies(statement):
+    modules = imported_modules(statement)
+    for heavy in ["geopandas", "pandera", "nzshm_model", "pyproj", "shapely"]:
+        assert heavy not in modules
+
+
+@pytest.mark.parametrize(
+    "name", ["CompositeSolution", "FaultSystemSolution", "InversionSolution", "filter", "geometry", "utils"]
+)
+def test_lazy_public_api(name):
+    import solvis
+
+    assert getattr(solvis, name) is not None
+    assert name in dir(solvis)
+
+
+def test_lazy_public_api_unknown_attribute():
+    import solvis
+
+    with pytest.raises(AttributeError):
+        solvis.not_an_attribute
+
+
+def test_section_distance_loads_pyvista():
+    pytest.importorskip("pyvista")
+    modules = imported_modules("from solvis import geometry; geometry._pyvista()")
+    assert "pyvista" in modules
+
+
+@pytest.mark.performance
+def test_import_solvis_geometry_time():
+    elapsed = min(import_time("import solvis.geometry") for _ in range(3))
+    assert elapsed < 0.3  # 300msec, importing pyvista alone takes longer than this
+
+
+@pytest.mark.performance
+def test_import_solvis_time():
+    elapsed = min(import_time("import solvis") for _ in range(3))
+    assert elapsed < 0.05  # 50msec
+
+
+@pytest.mark.performance
+def test_import_inversion_solution_time():
+    elapsed = min(import_time("from solvis import InversionSolution") for _ in range(3))
+    assert elapsed < 1.0  # 1 second, this is mainly pandas